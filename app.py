@@ -1,18 +1,48 @@
 # app.py
 import tkinter as tk
+import importlib
+import threading
+import time
 from gui.main_window import MainWindow
 from gui.control_panel import ControlPanel
 from gui.parameter_window import ParameterWindow
-from simulation import simulate_seir
+from gui.comparison_window import ComparisonWindow
+import simulation
+from simulation import VirusParams
+from simulation.parameters import CHAMPS
 import utils.file_management as utils_module  # Import complet du module
-from tkinter import messagebox, simpledialog
-from matplotlib import pyplot as plt
+from tkinter import filedialog, messagebox, simpledialog
 import os
 
+# Modules lourds chargés une fois la fenêtre affichée, après la figure
+MODULES_DIFFERES = (
+    'simulation.differential_equations',
+    'matplotlib.backends.backend_tkagg',
+    'mpl_toolkits.mplot3d',
+)
+
+# Limite de population de l'interface (les moteurs n'en imposent pas)
+POPULATION_MAX = 10000
+
+# Lecture du tampon partagé par l'interface
+CAPACITE_TAMPON = 4096      # Lignes (jours) du tampon circulaire
+INTERVALLE_LECTURE = 16     # ms entre deux lectures
+
+# Animation des blocs de jours
+DELAI_FIXE = 100            # ms entre deux blocs de taille fixe
+BUDGET_IMAGE = 33           # ms visés par image (bloc + rendu) en discrétisation adaptative
+
+def precharger_modules():
+    for module in MODULES_DIFFERES:
+        importlib.import_module(module)
+
 class SimulationApp:
     def __init__(self, root):
         self.root = root
         self.discretisation = tk.IntVar(value=10)  # Nombre de jours par itération
+        # Taille des blocs ajustée au temps de calcul et de rendu mesuré (la discrétisation est le premier bloc)
+        self.discretisation_adaptative = tk.BooleanVar(value=True)
+        self.jours_par_bloc = 10
         
         # Paramètres de la vie
         self.initial_sains = tk.IntVar(value=9990)
@@ -23,10 +53,10 @@ class SimulationApp:
         
         # Paramètres du virus
         self.prob_contamination = tk.DoubleVar(value=0.15)  # Beta
-        self.duree_incubation = tk.IntVar(value=3)          # Sigma inverse
-        self.duree_infection = tk.IntVar(value=7)           # Gamma
+        self.duree_incubation = tk.DoubleVar(value=3)        # Sigma inverse
+        self.duree_infection = tk.DoubleVar(value=7)         # Gamma
         self.prob_vaccination = tk.DoubleVar(value=0.05)
-        self.duree_immunite = tk.IntVar(value=30)
+        self.duree_immunite = tk.DoubleVar(value=30)
         self.taux_mortalite = tk.DoubleVar(value=0.02)      # Mu
         
         # Simulation
@@ -34,11 +64,24 @@ class SimulationApp:
         
         # Statistiques
         self.statistiques = []
+        self.journalier = []     # Trajectoire évaluée jour par jour
+        self.execution = None    # Empreinte de la dernière exécution dans le dépôt de résultats
+        self.depot = None        # Dépôt de résultats, créé au premier lancement enregistré
+        # Enregistrement des exécutions dans le dépôt (resultats/ du dossier courant), désactivé par défaut
+        self.enregistrer_resultats = tk.BooleanVar(value=False)
         
         # Simulation state
         self.simulation_running = False
         self.current_jour = 0
         
+        # Calcul dans un processus séparé (tampon en mémoire partagée)
+        self.calcul_separe = tk.BooleanVar(value=False)
+        self.processus = None
+        self.tampon = None
+        
+        # Trajectoires des virus comparés, créé au premier usage (import du moteur)
+        self.cache_scenarios = None
+        
         # Attribuer le module utils à self.utils
         self.utils = utils_module
         
@@ -48,6 +91,14 @@ class SimulationApp:
         
         # Mettre à jour les paramètres affichés après initialisation complète
         self.mettre_a_jour_label_parametres()
+        
+        # Figure et moteur chargés en une seule étape du thread Tk, une fois la fenêtre affichée:
+        # un import dans un autre thread pourrait croiser celui de construire_figure
+        self.root.after_idle(lambda: self.root.after(0, self.chargement_differe))
+    
+    def chargement_differe(self):
+        self.main_window.construire_figure()
+        precharger_modules()
     
     def mettre_a_jour_label_parametres(self):
         # Mettre à jour l'affichage des paramètres
@@ -75,63 +126,60 @@ class SimulationApp:
     def ouvrir_fenetre_parametres(self):
         ParameterWindow(self.root, self)
     
+    def lire_parametres(self):
+        # Construit (et valide) un VirusParams à partir des variables Tk
+        try:
+            valeurs = {champ: getattr(self, champ).get() for champ in CHAMPS}
+        except tk.TclError as e:
+            raise ValueError(f"Valeur invalide: {e}") from None
+        params = VirusParams(**valeurs)
+        if params.population > POPULATION_MAX:
+            raise ValueError(f"La population totale ne doit pas dépasser {POPULATION_MAX} individus.")
+        return params
+    
     def lancer_simulation(self):
         if not self.simulation_running:
-            # Récupérer les paramètres
-            S0 = self.initial_sains.get()
-            E0 = self.initial_contamines.get()
-            I0 = self.initial_infectes.get()
-            R0 = self.initial_retablis.get()
-            D0 = self.initial_morts.get()
-            beta = self.prob_contamination.get()
-            sigma = 1 / self.duree_incubation.get() if self.duree_incubation.get() != 0 else 0
-            gamma = 1 / self.duree_infection.get() if self.duree_infection.get() != 0 else 0
-            mu = self.taux_mortalite.get()
-            nombre_jours = self.nombre_jours.get()
-            discretisation = self.discretisation.get()
-            
-            # Validation des paramètres
-            total_population = S0 + E0 + I0 + R0 + D0
-            if total_population > 10000:
-                messagebox.showerror("Erreur", "La population totale ne doit pas dépasser 10 000 individus.")
-                return
-            if not (0 <= beta <= 1):
-                messagebox.showerror("Erreur", "La probabilité de contamination (Beta) doit être entre 0 et 1.")
-                return
-            if sigma < 0 or gamma < 0 or mu < 0:
-                messagebox.showerror("Erreur", "Les taux Sigma, Gamma et Mu doivent être positifs.")
-                return
-            if nombre_jours <= 0:
-                messagebox.showerror("Erreur", "Le nombre de jours de simulation doit être un nombre positif.")
+            # Récupérer et valider les paramètres une seule fois
+            try:
+                params = self.lire_parametres()
+            except ValueError as e:
+                messagebox.showerror("Erreur", str(e))
                 return
-            if discretisation <= 0:
-                messagebox.showerror("Erreur", "La discrétisation doit être un nombre positif.")
+            
+            if self.calcul_separe.get():
+                self.lancer_processus(params)
                 return
             
+            # Une seule résolution pour tout l'horizon; avec l'enregistrement, relue du dépôt si ce
+            # manifeste a déjà été exécuté
+            if self.enregistrer_resultats.get():
+                if self.depot is None:
+                    self.depot = simulation.DepotResultats()
+                self.execution, etats = self.depot.executer(simulation.manifeste_execution(params))
+            else:
+                trajectoire = simulation.resoudre_seir(params.etat_initial, *params.taux, params.nombre_jours - 1)
+                self.execution, etats = None, trajectoire.evaluer(simulation.grille_temps(params.nombre_jours))
+            self.journalier = [
+                {'sain': S, 'contaminé': E, 'infecté': I, 'rétabli': R, 'mort': D} for S, E, I, R, D in etats
+            ]
+            
             # Lancer la simulation
             self.simulation_running = True
             self.current_jour = 0
+            self.jours_par_bloc = params.discretisation
             self.statistiques = []
-            self.simuler_jour(beta, sigma, gamma, mu, nombre_jours, discretisation)
+            self.simuler_jour(params)
         else:
             messagebox.showinfo("Info", "Simulation déjà en cours")
     
-    def simuler_jour(self, beta, sigma, gamma, mu, nombre_jours, discretisation):
-        if self.simulation_running and self.current_jour < nombre_jours:
-            jours_a_simuler = min(discretisation, nombre_jours - self.current_jour)
-            # Effectuer la simulation SEIR pour le bloc de jours
-            statistiques = simulate_seir(
-                initial_sains=self.initial_sains.get(),
-                initial_contamines=self.initial_contamines.get(),
-                initial_infectes=self.initial_infectes.get(),
-                initial_retablis=self.initial_retablis.get(),
-                initial_morts=self.initial_morts.get(),
-                beta=beta,
-                sigma=sigma,
-                gamma=gamma,
-                mu=mu,
-                nombre_jours=jours_a_simuler
-            )
+    def simuler_jour(self, params):
+        if self.simulation_running and self.current_jour < params.nombre_jours:
+            debut = time.perf_counter()
+            adaptative = self.discretisation_adaptative.get()
+            bloc = self.jours_par_bloc if adaptative else params.discretisation
+            jours_a_simuler = min(bloc, params.nombre_jours - self.current_jour)
+            # Révéler le bloc de jours suivant de la trajectoire
+            statistiques = self.journalier[self.current_jour:self.current_jour + jours_a_simuler]
             self.statistiques.extend(statistiques)
             self.current_jour += jours_a_simuler
             print(f"Jours {self.current_jour - jours_a_simuler +1} à {self.current_jour}: {statistiques}")
@@ -140,15 +188,86 @@ class SimulationApp:
             self.main_window.update_graphs(self.statistiques)
             
             # Planifier le prochain bloc de jours
-            self.root.after(100, lambda: self.simuler_jour(beta, sigma, gamma, mu, nombre_jours, discretisation))
+            if adaptative:
+                # Rendu immédiat, pour mesurer le coût complet de l'image
+                self.root.update_idletasks()
+                duree = (time.perf_counter() - debut) * 1000
+                self.jours_par_bloc = self.ajuster_bloc(bloc, duree)
+                delai = max(1, round(BUDGET_IMAGE - duree))
+            else:
+                delai = DELAI_FIXE
+            self.root.after(delai, lambda: self.simuler_jour(params))
         else:
             self.simulation_running = False
             self.mettre_a_jour_label_parametres()
             messagebox.showinfo("Info", "Simulation terminée")
     
+    @staticmethod
+    def ajuster_bloc(bloc, duree):
+        # Bloc suivant proportionnel au budget restant par image, variation bornée à un facteur 2
+        # pour amortir le bruit des mesures
+        cible = bloc * BUDGET_IMAGE / max(duree, 1e-3)
+        return int(min(max(cible, bloc / 2, 1), bloc * 2))
+    
+    def lancer_processus(self, params):
+        # Calcul dans un processus séparé: les résultats arrivent par un tampon en mémoire partagée
+        import multiprocessing
+        import numpy as np
+        from simulation.shared_buffer import TamponCirculaire, executer_dans_tampon
+        
+        self.tampon = TamponCirculaire(capacite=max(CAPACITE_TAMPON, 4 * params.discretisation))
+        self.historique = np.empty((params.nombre_jours, 5))
+        self.processus = multiprocessing.Process(
+            target=executer_dans_tampon, args=(self.tampon.nom, params), daemon=True
+        )
+        self.processus.start()
+        self.simulation_running = True
+        self.current_jour = 0
+        self.statistiques = []
+        self.root.after(INTERVALLE_LECTURE, self.lire_tampon)
+    
+    def lire_tampon(self):
+        if not self.simulation_running or self.tampon is None:
+            return
+        # Lecture sans copie des lignes disponibles, recopiées directement dans l'historique
+        lues = 0
+        for vue in self.tampon.lire():
+            self.historique[self.current_jour + lues:self.current_jour + lues + len(vue)] = vue
+            lues += len(vue)
+        self.tampon.liberer(lues)
+        self.current_jour += lues
+        if lues:
+            self.main_window.afficher_tableau(self.historique[:self.current_jour])
+        if self.tampon.termine and self.tampon.disponibles == 0:
+            self.terminer_processus()
+            self.statistiques = [
+                {'sain': S, 'contaminé': E, 'infecté': I, 'rétabli': R, 'mort': D}
+                for S, E, I, R, D in self.historique[:self.current_jour]
+            ]
+            self.simulation_running = False
+            self.mettre_a_jour_label_parametres()
+            messagebox.showinfo("Info", "Simulation terminée")
+        elif not self.processus.is_alive() and self.tampon.disponibles == 0:
+            self.terminer_processus()
+            self.simulation_running = False
+            messagebox.showerror("Erreur", "Le processus de simulation s'est arrêté de façon inattendue.")
+        else:
+            self.root.after(INTERVALLE_LECTURE, self.lire_tampon)
+    
+    def terminer_processus(self):
+        if self.processus is not None:
+            if self.processus.is_alive():
+                self.processus.terminate()
+            self.processus.join()
+            self.processus = None
+        if self.tampon is not None:
+            self.tampon.fermer()
+            self.tampon = None
+    
     def arreter_simulation(self):
         if self.simulation_running:
             self.simulation_running = False
+            self.terminer_processus()
             messagebox.showinfo("Info", "Simulation arrêtée")
         else:
             messagebox.showinfo("Info", "Aucune simulation en cours")
@@ -156,6 +275,7 @@ class SimulationApp:
     def reinitialiser_simulation(self):
         if self.simulation_running:
             self.simulation_running = False
+        self.terminer_processus()
         self.statistiques = []
         self.current_jour = 0
         self.main_window.clear_graphs()
@@ -167,28 +287,18 @@ class SimulationApp:
         if not nom_virus:
             messagebox.showwarning("Avertissement", "Le nom du virus ne peut pas être vide.")
             return
-        if nom_virus in list_viruses():
+        if nom_virus in self.utils.list_viruses():
             overwrite = messagebox.askyesno("Confirmation", f"Le virus '{nom_virus}' existe déjà. Voulez-vous le remplacer?")
             if not overwrite:
                 return
         # Préparer les paramètres
-        parameters = {
-            'initial_sains': self.initial_sains.get(),
-            'initial_contamines': self.initial_contamines.get(),
-            'initial_infectes': self.initial_infectes.get(),
-            'initial_retablis': self.initial_retablis.get(),
-            'initial_morts': self.initial_morts.get(),
-            'prob_contamination': self.prob_contamination.get(),
-            'duree_incubation': self.duree_incubation.get(),
-            'duree_infection': self.duree_infection.get(),
-            'prob_vaccination': self.prob_vaccination.get(),
-            'duree_immunite': self.duree_immunite.get(),
-            'taux_mortalite': self.taux_mortalite.get(),
-            'nombre_jours': self.nombre_jours.get(),
-            'discretisation': self.discretisation.get()
-        }
         try:
-            save_virus(nom_virus, parameters)
+            parameters = self.lire_parametres().to_dict()
+        except ValueError as e:
+            messagebox.showerror("Erreur", str(e))
+            return
+        try:
+            self.utils.save_virus(nom_virus, parameters)
             messagebox.showinfo("Info", f"Virus '{nom_virus}' sauvegardé avec succès.")
             self.control_panel.update_virus_dropdown()
         except Exception as e:
@@ -200,21 +310,10 @@ class SimulationApp:
             messagebox.showwarning("Avertissement", "Aucun virus sélectionné.")
             return
         try:
-            parameters = load_virus(nom_virus)
+            params = VirusParams.from_dict(self.utils.load_virus(nom_virus))
             # Appliquer les paramètres
-            self.initial_sains.set(parameters['initial_sains'])
-            self.initial_contamines.set(parameters['initial_contamines'])
-            self.initial_infectes.set(parameters['initial_infectes'])
-            self.initial_retablis.set(parameters['initial_retablis'])
-            self.initial_morts.set(parameters.get('initial_morts', 0))
-            self.prob_contamination.set(parameters['prob_contamination'])
-            self.duree_incubation.set(parameters['duree_incubation'])
-            self.duree_infection.set(parameters['duree_infection'])
-            self.prob_vaccination.set(parameters['prob_vaccination'])
-            self.duree_immunite.set(parameters['duree_immunite'])
-            self.taux_mortalite.set(parameters['taux_mortalite'])
-            self.nombre_jours.set(parameters['nombre_jours'])
-            self.discretisation.set(parameters.get('discretisation', 10))
+            for champ in CHAMPS:
+                getattr(self, champ).set(getattr(params, champ))
             # Mise à jour des labels et graphiques
             self.mettre_a_jour_label_parametres()
             self.main_window.update_graphs(self.statistiques)
@@ -241,9 +340,63 @@ class SimulationApp:
             except Exception as e:
                 messagebox.showerror("Erreur", f"Erreur lors de la suppression du virus: {e}")
     
+    def ouvrir_comparaison(self):
+        ComparisonWindow(self.root, self)
+    
+    def exporter_animation(self):
+        # Rendu hors écran (Agg, plusieurs processus) dans un thread, l'interface restant disponible
+        if not self.statistiques:
+            messagebox.showwarning("Avertissement", "Aucune simulation à exporter.")
+            return
+        sortie = filedialog.asksaveasfilename(
+            title="Exporter l'animation", defaultextension='.mp4',
+            filetypes=[("Vidéo MP4", '*.mp4'), ("GIF animé", '*.gif')]
+        )
+        if not sortie:
+            return
+        from gui.export import exporter_animation
+        from gui.styles import SERIES
+        etats = [[etat[cle] for cle, _, _ in SERIES] for etat in self.statistiques]
+        resultat = {}
+        
+        def exporter():
+            try:
+                resultat['chemin'] = exporter_animation(etats, sortie)
+            except Exception as e:
+                resultat['erreur'] = e
+        
+        export = threading.Thread(target=exporter, daemon=True)
+        export.start()
+        
+        def verifier():
+            if export.is_alive():
+                self.root.after(200, verifier)
+            elif 'erreur' in resultat:
+                messagebox.showerror("Erreur", f"Erreur lors de l'export: {resultat['erreur']}")
+            else:
+                messagebox.showinfo("Info", f"Animation exportée dans {resultat['chemin']}.")
+        self.root.after(200, verifier)
+    
+    def comparer_virus(self, noms):
+        # Superpose les virus sélectionnés; seuls ceux jamais résolus sont intégrés, en un seul appel
+        if not noms:
+            self.main_window.quitter_comparaison()
+            return
+        try:
+            scenarios = {nom: VirusParams.from_dict(self.utils.load_virus(nom)) for nom in noms}
+        except (FileNotFoundError, ValueError) as e:
+            messagebox.showerror("Erreur", f"Erreur lors du chargement des virus: {e}")
+            return
+        if self.cache_scenarios is None:
+            from simulation.scenarios import CacheScenarios
+            self.cache_scenarios = CacheScenarios()
+        trajectoires = self.cache_scenarios.obtenir(scenarios.values())
+        self.main_window.comparer(dict(zip(scenarios, trajectoires)))
+    
     def quitter_simulation(self):
         if self.simulation_running:
             self.simulation_running = False
+        self.terminer_processus()
         self.root.quit()
 
 if __name__ == "__main__":
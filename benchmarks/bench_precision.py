@@ -0,0 +1,75 @@
+# benchmarks/bench_precision.py
+# Compare les ensembles RK4 en float64 et en float32: temps, mémoire et précision des trajectoires
+# rendues, et écarts au calcul float64 de référence. Échoue (code de sortie 1) si un écart dépasse
+# sa borne ou si les morts ne sont pas rendus en float64.
+# Usage: python benchmarks/bench_precision.py [--scenarios K] [--jours N]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation.ensemble import PAS_PAR_JOUR, resumer_ensemble, simulate_ensemble, tableau_trajectoires
+
+ETAT_INITIAL = (9990, 0, 10, 0, 0)
+# Écarts maximaux tolérés en float32, relatifs à la population (trajectoires et résumés en effectifs)
+BORNE_RELATIVE = 1e-4
+# Le jour du pic peut glisser d'un pas sur un plateau
+BORNE_JOURS = 1.0 / PAS_PAR_JOUR + 1e-9
+
+def tirer_scenarios(k, graine=0):
+    rng = np.random.default_rng(graine)
+    return (rng.uniform(0.05, 0.8, k), 1 / rng.uniform(1, 10, k), 1 / rng.uniform(2, 20, k), rng.uniform(0, 0.05, k))
+
+def chronometrer(fonction, *args, **kwargs):
+    debut = time.perf_counter()
+    resultat = fonction(*args, **kwargs)
+    return resultat, time.perf_counter() - debut
+
+def main():
+    parser = argparse.ArgumentParser(description="Précision float32 des ensembles RK4: vitesse et exactitude.")
+    parser.add_argument('--scenarios', type=int, default=10000)
+    parser.add_argument('--jours', type=int, default=365)
+    args = parser.parse_args()
+    taux = tirer_scenarios(args.scenarios)
+    population = sum(ETAT_INITIAL)
+
+    reference, duree64 = chronometrer(simulate_ensemble, ETAT_INITIAL, *taux, args.jours)
+    simple, duree32 = chronometrer(simulate_ensemble, ETAT_INITIAL, *taux, args.jours, precision='float32')
+    print(f"trajectoires float64: {duree64:6.2f} s")
+    print(f"trajectoires float32: {duree32:6.2f} s (x{duree64 / duree32:.2f})")
+    print(f"mémoire des trajectoires: float64 {reference.nbytes / 2**20:.1f} Mio, "
+          f"float32 {simple.nbytes / 2**20:.1f} Mio (x{reference.nbytes / simple.nbytes:.2f})")
+    # Les morts cumulés sont rendus en float64 dans les deux précisions
+    echecs = [] if simple['morts'].dtype == np.float64 else ["type des morts"]
+
+    ecarts = np.abs(tableau_trajectoires(simple) - tableau_trajectoires(reference)).max(axis=(0, 1)) / population
+    for nom, ecart in zip(('sain', 'contaminé', 'infecté', 'rétabli', 'mort'), ecarts):
+        print(f"  écart relatif maximal {nom:>9}: {ecart:.2e}")
+        if ecart > BORNE_RELATIVE:
+            echecs.append(f"trajectoire {nom}")
+
+    resume64, duree64 = chronometrer(resumer_ensemble, ETAT_INITIAL, *taux, args.jours)
+    resume32, duree32 = chronometrer(resumer_ensemble, ETAT_INITIAL, *taux, args.jours, precision='float32')
+    print(f"résumés float64: {duree64:6.2f} s, float32: {duree32:6.2f} s (x{duree64 / duree32:.2f})")
+    for nom in resume64.dtype.names:
+        jours = nom.startswith('jour')
+        echelle = 1.0 if jours or nom == 'taux_attaque' else population
+        ecart = np.nanmax(np.abs(resume64[nom] - resume32[nom])) / echelle
+        # Un passage de R effectif sous 1 doit être détecté dans les deux précisions
+        if nom == 'jour_reff' and not np.array_equal(np.isnan(resume64[nom]), np.isnan(resume32[nom])):
+            ecart = np.inf
+        print(f"  écart maximal {nom:>12}: {ecart:.2e}")
+        if ecart > (BORNE_JOURS if jours else BORNE_RELATIVE):
+            echecs.append(f"résumé {nom}")
+
+    if echecs:
+        print(f"ÉCHEC: bornes dépassées ({', '.join(echecs)})")
+        sys.exit(1)
+    print("Écarts float32 dans les bornes.")
+
+if __name__ == '__main__':
+    main()
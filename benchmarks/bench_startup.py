@@ -0,0 +1,74 @@
+# benchmarks/bench_startup.py
+# Mesure le temps jusqu'à l'affichage de la première fenêtre, puis jusqu'à ce que la figure et
+# le moteur soient chargés (fenêtre prête à lancer une simulation).
+# Usage: python benchmarks/bench_startup.py [--repetitions N]
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Chaque mesure est faite dans un processus neuf, pour ne pas profiter des modules déjà importés.
+# Le mode "eager" importe d'abord les modules lourds, comme le faisait l'application avant le
+# chargement différé, pour servir de référence.
+SCRIPT = r'''
+import time
+debut = time.perf_counter()
+import sys
+if {eager}:
+    import matplotlib.pyplot
+    import mpl_toolkits.mplot3d
+    import scipy.integrate
+import tkinter as tk
+from app import SimulationApp
+import_fin = time.perf_counter()
+fenetre = pret = None
+try:
+    root = tk.Tk()
+except tk.TclError:
+    root = None
+if root is not None:
+    app = SimulationApp(root)
+    if {eager}:
+        app.main_window.construire_figure()
+        app.main_window.axe_3d()
+    root.update()
+    fenetre = time.perf_counter()
+    while app.main_window.fig is None or 'mpl_toolkits.mplot3d' not in sys.modules:
+        root.update()
+    pret = time.perf_counter()
+    root.destroy()
+print(import_fin - debut, (fenetre - debut) if fenetre else -1, (pret - debut) if pret else -1)
+'''
+
+def mesurer(eager, repetitions):
+    imports, fenetres, prets = [], [], []
+    for _ in range(repetitions):
+        sortie = subprocess.run(
+            [sys.executable, '-c', SCRIPT.format(eager=eager)],
+            cwd=RACINE, capture_output=True, text=True, check=True
+        ).stdout.split()
+        imports.append(float(sortie[0]))
+        if float(sortie[1]) >= 0:
+            fenetres.append(float(sortie[1]))
+            prets.append(float(sortie[2]))
+    return imports, fenetres, prets
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps de démarrage de l'application.")
+    parser.add_argument('--repetitions', type=int, default=5)
+    args = parser.parse_args()
+    for mode, eager in (("différé", False), ("eager (référence)", True)):
+        imports, fenetres, prets = mesurer(eager, args.repetitions)
+        ligne = f"{mode:>18}: imports {statistics.median(imports) * 1000:7.1f} ms"
+        if fenetres:
+            ligne += f", première fenêtre {statistics.median(fenetres) * 1000:7.1f} ms"
+            ligne += f", prête {statistics.median(prets) * 1000:7.1f} ms"
+        else:
+            ligne += " (pas d'affichage disponible: fenêtre non mesurée)"
+        print(ligne)
+
+if __name__ == '__main__':
+    main()
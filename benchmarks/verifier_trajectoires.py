@@ -0,0 +1,51 @@
+# benchmarks/verifier_trajectoires.py
+# Vérifie les propriétés de TrajectoireSEIR dont dépendent les résultats affichés et enregistrés.
+# Échoue (code de sortie 1) si une vérification ne passe pas.
+# Usage: python benchmarks/verifier_trajectoires.py
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation.differential_equations import evenement_extinction, evenement_pic, grille_temps, resoudre_seir
+
+ETAT_INITIAL = (9990, 0, 10, 0, 3)
+TAUX = (0.5, 0.2, 0.1, 0.01)
+# Écart toléré entre deux évaluations de la même solution, relatif à la population
+BORNE_RELATIVE = 1e-9
+
+def morts_independants_de_la_grille():
+    # Les morts cumulés sont lus dans la solution continue: rééchantillonner à l'heure ne les change
+    # pas, et le jour 0 redonne D0 (pas de mu * I0 compté à t = 0)
+    trajectoire = resoudre_seir(ETAT_INITIAL, *TAUX, 199)
+    jours = trajectoire.evaluer(grille_temps(200))[:, 4]
+    heures = trajectoire.evaluer(np.arange(0, 199 * 24 + 1) / 24)[::24, 4]
+    ecart = np.abs(jours - heures).max() / sum(ETAT_INITIAL)
+    return ecart <= BORNE_RELATIVE and jours[0] == ETAT_INITIAL[4], f"écart jour/heure {ecart:.1e}, D(0) = {jours[0]}"
+
+def extinction_apres_le_pic():
+    # Avec I0 au seuil et E0 = 0, I baisse d'abord avant le départ de l'épidémie: l'extinction
+    # (terminale) ne doit pas arrêter l'intégration à t = 0, mais après le pic (~2 800 infectés vers le jour 62)
+    trajectoire = resoudre_seir((9999, 0, 1, 0, 0), *TAUX, 200, [evenement_pic(), evenement_extinction(1.0)])
+    pics, extinctions = trajectoire.evenements['pic'], trajectoire.evenements['extinction']
+    succes = len(pics) == 1 and pics[0][1][2] > 2000 and len(extinctions) == 1 and extinctions[0][0] > pics[0][0]
+    detail = ', '.join([f"pic au jour {t:.1f} ({etat[2]:.0f} infectés)" for t, etat in pics]
+                       + [f"extinction au jour {t:.1f}" for t, _ in extinctions]) or "aucun événement"
+    return succes, detail
+
+VERIFICATIONS = (morts_independants_de_la_grille, extinction_apres_le_pic)
+
+def main():
+    echecs = []
+    for verification in VERIFICATIONS:
+        succes, detail = verification()
+        print(f"{'ok   ' if succes else 'ÉCHEC'} {verification.__name__}: {detail}")
+        if not succes:
+            echecs.append(verification.__name__)
+    if echecs:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+# gui/comparison_window.py
+import tkinter as tk
+
+class ComparisonWindow:
+    def __init__(self, parent, simulation_app):
+        self.parent = parent
+        self.simulation_app = simulation_app
+        self.window = tk.Toplevel(parent)
+        self.window.title("Comparer des virus")
+        self.window.geometry("300x400")
+        self.window.protocol("WM_DELETE_WINDOW", self.fermer)
+        self.setup_selection()
+    
+    def setup_selection(self):
+        tk.Label(self.window, text="Virus comparés:", font=("Helvetica", 12, "bold"))\
+            .pack(anchor='w', padx=10, pady=(10, 5))
+        
+        # Une case par virus de la bibliothèque: cocher ou décocher ne relance aucun calcul
+        # pour un virus déjà résolu (cache des scénarios)
+        self.selection = {}
+        for nom in sorted(self.simulation_app.utils.list_viruses()):
+            var = tk.BooleanVar(value=False)
+            tk.Checkbutton(self.window, text=nom, variable=var, command=self.mettre_a_jour)\
+                .pack(anchor='w', padx=20)
+            self.selection[nom] = var
+        
+        tk.Button(self.window, text="Fermer", command=self.fermer).pack(fill=tk.X, padx=10, pady=10)
+    
+    def mettre_a_jour(self):
+        noms = [nom for nom, var in self.selection.items() if var.get()]
+        self.simulation_app.comparer_virus(noms)
+    
+    def fermer(self):
+        self.simulation_app.comparer_virus([])
+        self.window.destroy()
@@ -51,9 +51,27 @@ class ControlPanel:
         tk.Label(self.parent, text="Discrétisation (jours):").grid(row=12, column=0, padx=5, pady=5, sticky='e')
         self.entry_discretisation = tk.Entry(self.parent, textvariable=self.simulation_app.discretisation)
         self.entry_discretisation.grid(row=12, column=1, padx=5, pady=5, sticky='w')
+        tk.Checkbutton(self.parent, text="Discrétisation adaptative", variable=self.simulation_app.discretisation_adaptative)\
+            .grid(row=13, column=0, columnspan=2, padx=5, pady=5, sticky='w')
+        
+        # Calcul hors du thread de l'interface
+        tk.Checkbutton(self.parent, text="Calcul dans un processus séparé", variable=self.simulation_app.calcul_separe)\
+            .grid(row=14, column=0, columnspan=2, padx=5, pady=5, sticky='w')
+        
+        # Dépôt de résultats (resultats/), pour retrouver et réutiliser les exécutions
+        tk.Checkbutton(self.parent, text="Enregistrer les résultats", variable=self.simulation_app.enregistrer_resultats)\
+            .grid(row=15, column=0, columnspan=2, padx=5, pady=5, sticky='w')
+        
+        # Superposition de virus de la bibliothèque
+        tk.Button(self.parent, text="Comparer des Virus", command=self.simulation_app.ouvrir_comparaison)\
+            .grid(row=16, column=0, columnspan=2, padx=5, pady=5, sticky='ew')
+        
+        # Animation de la simulation (MP4 ou GIF)
+        tk.Button(self.parent, text="Exporter l'animation", command=self.simulation_app.exporter_animation)\
+            .grid(row=17, column=0, columnspan=2, padx=5, pady=5, sticky='ew')
         
         # Espacement flexible
-        tk.Label(self.parent).grid(row=15, column=0, columnspan=2, pady=10)
+        tk.Label(self.parent).grid(row=18, column=0, columnspan=2, pady=10)
     
     def update_virus_dropdown(self):
         menu = self.dropdown_virus['menu']
@@ -0,0 +1,44 @@
+# gui/decimation.py
+import numpy as np
+
+def indices_minmax(y, largeur):
+    """
+    Indices des points à tracer pour représenter y sur `largeur` pixels: pour chaque pixel,
+    le minimum et le maximum de la série (dans l'ordre temporel), plus les extrémités.
+    Les pics restent donc exacts quel que soit le nombre de points d'origine.
+
+    Args:
+        y (np.ndarray): Série à réduire.
+        largeur (int): Nombre de colonnes de pixels disponibles.
+
+    Returns:
+        np.ndarray: Indices croissants, au plus 2 * largeur + 2.
+    """
+    n = len(y)
+    largeur = max(int(largeur), 1)
+    if n <= 2 * largeur + 2:
+        return np.arange(n)
+    taille = -(-n // largeur)
+    seaux = -(-n // taille)
+    # Remplissage par NaN pour découper la série en seaux de taille égale
+    complet = np.full(seaux * taille, np.nan)
+    complet[:n] = y
+    complet = complet.reshape(seaux, taille)
+    debuts = np.arange(seaux) * taille
+    minimums = debuts + np.nanargmin(complet, axis=1)
+    maximums = debuts + np.nanargmax(complet, axis=1)
+    indices = np.concatenate(([0], np.minimum(minimums, maximums), np.maximum(minimums, maximums), [n - 1]))
+    return np.unique(indices)
+
+def indices_multiples(series, largeur):
+    # Union des indices min/max de plusieurs séries partageant le même axe x
+    if not series:
+        return np.arange(0)
+    return np.unique(np.concatenate([indices_minmax(y, largeur) for y in series]))
+
+def fenetre_visible(x, xmin, xmax):
+    # Tranche des points visibles entre xmin et xmax, élargie d'un point de chaque côté
+    # pour que les segments qui sortent du cadre restent tracés
+    debut = max(np.searchsorted(x, xmin, side='left') - 1, 0)
+    fin = min(np.searchsorted(x, xmax, side='right') + 1, len(x))
+    return slice(debut, fin)
@@ -0,0 +1,231 @@
+# gui/export.py
+# Export d'une simulation en animation (MP4, GIF ou images PNG) sans interface graphique:
+# la figure de la fenêtre principale est reconstruite sur le backend Agg, ses artistes sont
+# créés une seule fois et seules leurs données changent d'une image à l'autre. Axes, textes et
+# légendes sont rendus une fois dans un fond restauré à chaque image, où seules les courbes
+# sont redessinées. Les images sont rendues par petits lots dans plusieurs processus et
+# transmises dans l'ordre à l'encodeur au fil du rendu.
+#
+# Usage: python -m gui.export NOISO animation.mp4 [--images 1000] [--ips 30] [--dpi 80]
+import argparse
+import multiprocessing
+import os
+import shutil
+import subprocess
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from gui.decimation import indices_minmax, indices_multiples
+from gui.styles import SERIES
+
+IPS = 30
+DPI = 80
+TAILLE = (16, 9)
+# Images par tâche de rendu, et tâches en cours au plus par processus
+IMAGES_PAR_LOT = 4
+TACHES_EN_VOL = 2
+
+class RenduHorsEcran:
+    """
+    Figure de MainWindow (évolution linéaire et diagramme de phase 3D) sur un canvas Agg.
+    Les axes sont fixés une fois pour toute la simulation, pour que l'animation ne change pas
+    d'échelle d'une image à l'autre.
+    """
+
+    def __init__(self, etats, dpi=DPI, taille=TAILLE):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.etats = np.asarray(etats, dtype=float)
+        self.fig = Figure(figsize=taille, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        jours = len(self.etats)
+
+        self.ax_linear = self.fig.add_subplot(121)
+        self.ax_linear.set_title("Évolution de la population")
+        self.ax_linear.set_xlabel("Jour")
+        self.ax_linear.set_ylabel("Nombre d'individus")
+        self.lignes = [self.ax_linear.plot([], [], label=libelle, color=couleur)[0] for _, libelle, couleur in SERIES]
+        self.ax_linear.legend(loc='upper right')
+        self.ax_linear.set_xlim(1, max(jours, 2))
+        self.ax_linear.set_ylim(0, float(self.etats.max()) * 1.05 or 1)
+
+        self.ax_3d = self.fig.add_subplot(122, projection='3d')
+        self.ax_3d.set_title("Diagramme de phase en 3D")
+        self.ax_3d.set_xlabel("Sains")
+        self.ax_3d.set_ylabel("Infectés")
+        self.ax_3d.set_zlabel("Rétablis")
+        self.trajectoire_3d = self.ax_3d.plot([], [], [], color='purple', label='Trajectoire')[0]
+        self.debut_3d = self.ax_3d.plot([], [], [], 'o', color='green', markersize=10, label='Début')[0]
+        self.fin_3d = self.ax_3d.plot([], [], [], 'o', color='red', markersize=10, label='Fin')[0]
+        self.ax_3d.legend(loc='upper right')
+        phase = self.etats[:, [0, 2, 3]]
+        self.ax_3d.auto_scale_xyz(phase[:, 0], phase[:, 1], phase[:, 2], had_data=False)
+
+        self.titre = self.fig.suptitle("")
+        # Mise en page calculée une seule fois (tight_layout à chaque image coûterait un rendu de plus)
+        self.fig.tight_layout()
+        self.largeur_2d = max(int(self.ax_linear.bbox.width), 1)
+        self.largeur_3d = max(int(self.ax_3d.bbox.width), 1)
+        self.dimensions = self.canvas.get_width_height()
+
+        # Fond sans les artistes animés, restauré avant chaque image
+        self.animes = [(self.ax_linear, ligne) for ligne in self.lignes]
+        self.animes += [(self.ax_3d, ligne) for ligne in (self.trajectoire_3d, self.debut_3d, self.fin_3d)]
+        self.animes.append((self.fig, self.titre))
+        for _, artiste in self.animes:
+            artiste.set_animated(True)
+        self.canvas.draw()
+        self.fond = self.canvas.copy_from_bbox(self.fig.bbox)
+
+    def image(self, n):
+        # Tableau (hauteur, largeur, 4) RGBA des n premiers jours; valable jusqu'à l'image suivante
+        etats = self.etats[:n]
+        jours = np.arange(1, n + 1)
+        for colonne, ligne in enumerate(self.lignes):
+            indices = indices_minmax(etats[:, colonne], self.largeur_2d)
+            ligne.set_data(jours[indices], etats[indices, colonne])
+        sains, infectes, retablis = etats[:, 0], etats[:, 2], etats[:, 3]
+        indices = indices_multiples((sains, infectes, retablis), self.largeur_3d)
+        self.trajectoire_3d.set_data_3d(sains[indices], infectes[indices], retablis[indices])
+        self.debut_3d.set_data_3d(sains[:1], infectes[:1], retablis[:1])
+        self.fin_3d.set_data_3d(sains[-1:], infectes[-1:], retablis[-1:])
+        self.titre.set_text(f"Jour {n}")
+        self.canvas.restore_region(self.fond)
+        for parent, artiste in self.animes:
+            parent.draw_artist(artiste)
+        return np.asarray(self.canvas.buffer_rgba())
+
+def _jours_par_image(jours, images):
+    # Nombre de jours affichés à chaque image, croissant jusqu'à la simulation complète
+    return np.unique(np.linspace(1, jours, images).round().astype(int))
+
+# Processus de rendu: une seule figure par processus, créée par _initialiser
+_rendu = None
+
+def _initialiser(etats, dpi, taille):
+    global _rendu
+    _rendu = RenduHorsEcran(etats, dpi, taille)
+
+def _rendre(jours, premier, dossier, rendu=None):
+    # Images RGB (hauteur, largeur, 3) des jours demandés, dans l'ordre; pour un export PNG,
+    # les images sont écrites ici, numérotées à partir de `premier`, et rien n'est renvoyé
+    rendu = rendu or _rendu
+    if dossier is None:
+        return [np.ascontiguousarray(rendu.image(n)[:, :, :3]) for n in jours]
+    from PIL import Image
+    for numero, n in enumerate(jours, start=premier):
+        Image.fromarray(rendu.image(n)).save(os.path.join(dossier, f"image_{numero:05d}.png"))
+    return []
+
+def _images(etats, jours, dossier, dpi, taille, n_jobs):
+    """
+    Rend les images dans l'ordre, par petits lots répartis entre `n_jobs` processus. Au plus
+    TACHES_EN_VOL lots par processus sont en cours: les images sont transmises à l'encodeur au
+    fil du rendu, et la mémoire reste bornée quel que soit leur nombre (aucun fichier intermédiaire).
+    """
+    lots = [(jours[i:i + IMAGES_PAR_LOT], i) for i in range(0, len(jours), IMAGES_PAR_LOT)]
+    if n_jobs == 1:
+        rendu = RenduHorsEcran(etats, dpi, taille)
+        for lot, premier in lots:
+            yield from _rendre(lot, premier, dossier, rendu)
+        return
+    # 'spawn': l'export peut être lancé depuis un thread de l'application Tk, où un fork copierait
+    # un processus multithread (verrous de Tk et de matplotlib compris)
+    contexte = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=n_jobs, mp_context=contexte, initializer=_initialiser,
+                             initargs=(etats, dpi, taille)) as executor:
+        attente = deque()
+        for lot, premier in lots:
+            attente.append(executor.submit(_rendre, lot, premier, dossier))
+            if len(attente) >= TACHES_EN_VOL * n_jobs:
+                yield from attente.popleft().result()
+        while attente:
+            yield from attente.popleft().result()
+
+def _encoder_mp4(ffmpeg, images, sortie, ips):
+    premiere = next(images)
+    hauteur, largeur, _ = premiere.shape
+    commande = [
+        ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f"{largeur}x{hauteur}",
+        '-r', str(ips), '-i', '-', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', sortie,
+    ]
+    processus = subprocess.Popen(commande, stdin=subprocess.PIPE)
+    try:
+        processus.stdin.write(premiere.tobytes())
+        for image in images:
+            processus.stdin.write(image.tobytes())
+    finally:
+        processus.stdin.close()
+        if processus.wait() != 0:
+            raise RuntimeError(f"ffmpeg a échoué (code {processus.returncode}).")
+
+def _encoder_gif(images, sortie, ips):
+    from PIL import Image
+
+    images = (Image.fromarray(image) for image in images)
+    premiere = next(images)
+    premiere.save(sortie, save_all=True, append_images=images, duration=round(1000 / ips), loop=0)
+
+def exporter_animation(etats, sortie, images=None, ips=IPS, dpi=DPI, taille=TAILLE, n_jobs=None):
+    """
+    Rend une simulation en animation, sans Tk.
+
+    Args:
+        etats (array-like): Tableau (jours, 5) des compartiments sain, contaminé, infecté, rétabli, mort.
+        sortie (str): Fichier .mp4 (ffmpeg requis, sinon un .gif est écrit à côté), .gif, ou
+            dossier des images PNG numérotées.
+        images (int, optional): Nombre d'images (par défaut une par jour).
+        ips (int): Images par seconde.
+        dpi (int): Résolution (la figure mesure `taille` pouces, comme celle de l'application).
+        n_jobs (int, optional): Processus de rendu (par défaut le nombre de cœurs).
+
+    Returns:
+        str: Chemin effectivement écrit.
+    """
+    etats = np.asarray(etats, dtype=float)
+    if not len(etats):
+        raise ValueError("Aucun jour à exporter.")
+    extension = os.path.splitext(sortie)[1].lower()
+    if extension not in ('.mp4', '.gif', ''):
+        raise ValueError(f"Format d'export non reconnu pour '{sortie}' (attendu: .mp4, .gif ou un dossier).")
+    ffmpeg = shutil.which('ffmpeg')
+    if extension == '.mp4' and ffmpeg is None:
+        sortie = os.path.splitext(sortie)[0] + '.gif'
+        extension = '.gif'
+        warnings.warn(f"ffmpeg introuvable: export en GIF dans {sortie}.")
+
+    jours = _jours_par_image(len(etats), images or len(etats))
+    n_jobs = max(1, min(n_jobs or os.cpu_count() or 1, -(-len(jours) // IMAGES_PAR_LOT)))
+    if extension == '':
+        os.makedirs(sortie, exist_ok=True)
+        for _ in _images(etats, jours, sortie, dpi, taille, n_jobs):
+            pass
+    elif extension == '.mp4':
+        _encoder_mp4(ffmpeg, _images(etats, jours, None, dpi, taille, n_jobs), sortie, ips)
+    else:
+        _encoder_gif(_images(etats, jours, None, dpi, taille, n_jobs), sortie, ips)
+    return sortie
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporte la simulation d'un virus sauvegardé en animation.")
+    parser.add_argument('virus', help="Nom du virus sauvegardé")
+    parser.add_argument('sortie', help="Fichier .mp4 ou .gif, ou dossier des images PNG")
+    parser.add_argument('--images', type=int, help="Nombre d'images (par défaut une par jour)")
+    parser.add_argument('--ips', type=int, default=IPS, help="Images par seconde")
+    parser.add_argument('--dpi', type=int, default=DPI)
+    parser.add_argument('--jobs', type=int, help="Processus de rendu")
+    args = parser.parse_args(argv)
+
+    from simulation import DepotResultats, VirusParams, manifeste_execution
+    from utils.file_management import load_virus
+
+    params = VirusParams.from_dict(load_virus(args.virus))
+    _, etats = DepotResultats().executer(manifeste_execution(params))
+    print(exporter_animation(etats, args.sortie, args.images, args.ips, args.dpi, n_jobs=args.jobs))
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,6 @@
 # gui/main_window.py
 import tkinter as tk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import matplotlib.pyplot as plt
+from gui.styles import SERIES, STYLES_SCENARIOS
 
 class MainWindow:
     def __init__(self, root, simulation_app):
@@ -26,18 +25,49 @@ class MainWindow:
         self.graph_frame.rowconfigure(1, weight=1)  # Canvas
         self.graph_frame.columnconfigure(0, weight=1)
         
+        # La figure est construite après le premier affichage de la fenêtre (SimulationApp.chargement_differe)
+        self.fig = None
+        self.ax_linear = None
+        self.ax_3d = None
+        # Mode comparaison: {nom: tableau (jours, 5)} des scénarios superposés
+        self.scenarios = {}
+        self.styles = {}
+        self.collections = None
+        # Statistiques déjà converties par update_graphs: liste source, tableau à capacité doublée, jours convertis
+        self._source = None
+        self._tableau = None
+        self._convertis = 0
+    
+    def construire_figure(self):
+        # Import différé: NumPy, matplotlib et le backend Tk ne sont chargés qu'ici
+        if self.fig is not None:
+            return
+        import numpy as np
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        
         # Création de la figure matplotlib
-        self.fig = plt.Figure(figsize=(16, 9), tight_layout=True)
+        self.fig = Figure(figsize=(16, 9), tight_layout=True)
         self.ax_linear = self.fig.add_subplot(121)
         self.ax_linear.set_title("Évolution de la population")
         self.ax_linear.set_xlabel("Jour")
         self.ax_linear.set_ylabel("Nombre d'individus")
         
-        self.ax_3d = self.fig.add_subplot(122, projection='3d')
-        self.ax_3d.set_title("Diagramme de phase en 3D")
-        self.ax_3d.set_xlabel("Sains")
-        self.ax_3d.set_ylabel("Infectés")
-        self.ax_3d.set_zlabel("Rétablis")
+        # Artistes persistants: seules leurs données changent d'un tracé à l'autre
+        self.lignes = {
+            cle: self.ax_linear.plot([], [], label=libelle, color=couleur)[0]
+            for cle, libelle, couleur in SERIES
+        }
+        self.ax_linear.legend()
+        self.jours = np.empty(0)
+        self.donnees = {cle: np.empty(0) for cle, _, _ in SERIES}
+        
+        # Niveau de détail recalculé à chaque zoom ou déplacement (NavigationToolbar2Tk)
+        self._mise_a_jour_lod = False
+        self.ax_linear.callbacks.connect('xlim_changed', self._sur_changement_vue)
+        # Vue zoomée ou déplacée par l'utilisateur: plus de mise à l'échelle automatique jusqu'à
+        # la prochaine simulation
+        self.vue_utilisateur = False
         
         # Sous-Frame pour la barre d'outils
         self.toolbar_frame = tk.Frame(self.graph_frame)
@@ -53,52 +83,207 @@ class MainWindow:
         self.toolbar.update()
         self.toolbar.pack(side=tk.TOP, fill=tk.X)
     
+    def axe_3d(self):
+        # Le diagramme de phase 3D (et mplot3d) n'est créé qu'au premier tracé
+        if self.ax_3d is None:
+            self.ax_3d = self.fig.add_subplot(122, projection='3d')
+            self.ax_3d.set_title("Diagramme de phase en 3D")
+            self.ax_3d.set_xlabel("Sains")
+            self.ax_3d.set_ylabel("Infectés")
+            self.ax_3d.set_zlabel("Rétablis")
+            self.trajectoire_3d = self.ax_3d.plot([], [], [], color='purple', label='Trajectoire')[0]
+            self.debut_3d = self.ax_3d.plot([], [], [], 'o', color='green', markersize=10, label='Début')[0]
+            self.fin_3d = self.ax_3d.plot([], [], [], 'o', color='red', markersize=10, label='Fin')[0]
+            self.ax_3d.legend()
+        return self.ax_3d
+    
+    def largeur_pixels(self, ax):
+        return max(int(ax.bbox.width), 1)
+    
+    def _sur_changement_vue(self, ax):
+        if not self._mise_a_jour_lod:
+            self.vue_utilisateur = True
+            if self.scenarios:
+                self._decimer_comparaison(*ax.get_xlim())
+            else:
+                self._decimer_lineaire(*ax.get_xlim())
+            self.canvas.draw_idle()
+    
+    def _decimer_lineaire(self, xmin=None, xmax=None):
+        # Réduit chaque série aux minima/maxima par pixel de la portion visible
+        from gui.decimation import fenetre_visible, indices_minmax
+        if xmin is None:
+            visible = slice(0, len(self.jours))
+        else:
+            visible = fenetre_visible(self.jours, xmin, xmax)
+        jours = self.jours[visible]
+        largeur = self.largeur_pixels(self.ax_linear)
+        self._mise_a_jour_lod = True
+        try:
+            for cle, ligne in self.lignes.items():
+                serie = self.donnees[cle][visible]
+                indices = indices_minmax(serie, largeur)
+                ligne.set_data(jours[indices], serie[indices])
+        finally:
+            self._mise_a_jour_lod = False
+    
+    def comparer(self, scenarios):
+        """
+        Superpose plusieurs scénarios sur le graphique linéaire: une seule LineCollection par
+        compartiment (un segment par scénario), le style de trait distinguant les scénarios.
+
+        Args:
+            scenarios (dict): {nom: tableau (jours, 5)} des scénarios à afficher, dans l'ordre.
+        """
+        self.construire_figure()
+        if not scenarios:
+            return self.quitter_comparaison()
+        if self.collections is None:
+            from matplotlib.collections import LineCollection
+            self.collections = {}
+            for cle, _, couleur in SERIES:
+                self.collections[cle] = LineCollection([], colors=couleur)
+                self.ax_linear.add_collection(self.collections[cle], autolim=False)
+        # Le style d'un scénario ne dépend que de son nom, pas des autres scénarios affichés
+        for nom in scenarios:
+            self.styles.setdefault(nom, STYLES_SCENARIOS[len(self.styles) % len(STYLES_SCENARIOS)])
+        self.scenarios = dict(scenarios)
+        for ligne in self.lignes.values():
+            ligne.set_visible(False)
+        
+        from matplotlib.lines import Line2D
+        legendes = [Line2D([], [], color=couleur, label=libelle) for _, libelle, couleur in SERIES]
+        legendes += [Line2D([], [], color='gray', linestyle=self.styles[nom], label=nom) for nom in self.scenarios]
+        self.ax_linear.legend(handles=legendes)
+        
+        jours_max = max(len(etats) for etats in self.scenarios.values())
+        effectif_max = max(float(etats.max()) for etats in self.scenarios.values())
+        self._mise_a_jour_lod = True
+        try:
+            self.ax_linear.set_xlim(1, max(jours_max, 2))
+            self.ax_linear.set_ylim(0, effectif_max * 1.05 or 1)
+        finally:
+            self._mise_a_jour_lod = False
+        self.vue_utilisateur = False
+        self._decimer_comparaison(*self.ax_linear.get_xlim())
+        self.canvas.draw_idle()
+    
+    def _decimer_comparaison(self, xmin, xmax):
+        # Segments min/max par pixel de la portion visible de chaque scénario
+        import numpy as np
+        from gui.decimation import fenetre_visible, indices_minmax
+        largeur = self.largeur_pixels(self.ax_linear)
+        segments = {cle: [] for cle, _, _ in SERIES}
+        styles = []
+        for nom, etats in self.scenarios.items():
+            jours = np.arange(1, len(etats) + 1)
+            visible = fenetre_visible(jours, xmin, xmax)
+            styles.append(self.styles[nom])
+            for colonne, (cle, _, _) in enumerate(SERIES):
+                serie = etats[visible, colonne]
+                indices = indices_minmax(serie, largeur)
+                segments[cle].append(np.column_stack((jours[visible][indices], serie[indices])))
+        for cle, collection in self.collections.items():
+            collection.set_segments(segments[cle])
+            collection.set_linestyles(styles)
+    
+    def quitter_comparaison(self):
+        # Retour à l'affichage d'une seule simulation
+        if not self.scenarios:
+            return
+        self.scenarios = {}
+        for collection in self.collections.values():
+            collection.set_segments([])
+        for ligne in self.lignes.values():
+            ligne.set_visible(True)
+        self.ax_linear.legend()
+        self._mise_a_jour_lod = True
+        try:
+            # set_xlim (zoom, comparaison) désactive la mise à l'échelle automatique
+            self.ax_linear.set_autoscale_on(True)
+            self.ax_linear.relim()
+            self.ax_linear.autoscale_view()
+        finally:
+            self._mise_a_jour_lod = False
+        self.vue_utilisateur = False
+        self.canvas.draw_idle()
+    
     def update_graphs(self, statistiques):
+        # La liste grandit d'un bloc par appel: seuls les jours ajoutés depuis l'appel précédent
+        # sont convertis, dans un tableau dont la capacité double (coût total linéaire sur la simulation)
         if not statistiques:
             return
-        jours = range(1, len(statistiques) + 1)
-        sains = [etat['sain'] for etat in statistiques]
-        contamines = [etat['contaminé'] for etat in statistiques]
-        infectes = [etat['infecté'] for etat in statistiques]
-        retablis = [etat['rétabli'] for etat in statistiques]
-        morts = [etat['mort'] for etat in statistiques]
-        
-        # Mise à jour du graphique linéaire 2D
-        self.ax_linear.clear()
-        self.ax_linear.set_title("Évolution de la population")
-        self.ax_linear.set_xlabel("Jour")
-        self.ax_linear.set_ylabel("Nombre d'individus")
-        self.ax_linear.plot(jours, sains, label='Sains', color='green')
-        self.ax_linear.plot(jours, contamines, label='Contaminés', color='yellow')
-        self.ax_linear.plot(jours, infectes, label='Infectés', color='red')
-        self.ax_linear.plot(jours, retablis, label='Rétablis', color='blue')
-        self.ax_linear.plot(jours, morts, label='Morts', color='black')
-        self.ax_linear.legend()
+        import numpy as np
+        if statistiques is not self._source or len(statistiques) < self._convertis:
+            self._source = statistiques
+            self._convertis = 0
+        n = len(statistiques)
+        if self._tableau is None or len(self._tableau) < n:
+            agrandi = np.empty((max(n, 2 * self._convertis), len(SERIES)))
+            agrandi[:self._convertis] = self._tableau[:self._convertis] if self._convertis else 0
+            self._tableau = agrandi
+        self._tableau[self._convertis:n] = [[etat[cle] for cle, _, _ in SERIES] for etat in statistiques[self._convertis:n]]
+        self._convertis = n
+        self.afficher_tableau(self._tableau[:n])
+    
+    def afficher_tableau(self, etats):
+        # Trace un tableau (jours, 5) de colonnes sain, contaminé, infecté, rétabli, mort.
+        # Les séries sont des vues sur ce tableau: aucune copie n'est faite avant la décimation.
+        if not len(etats):
+            return
+        import numpy as np
+        from gui.decimation import indices_multiples
+        self.construire_figure()
+        self.quitter_comparaison()
+        self.jours = np.arange(1, len(etats) + 1)
+        self.donnees = {cle: etats[:, colonne] for colonne, (cle, _, _) in enumerate(SERIES)}
+        
+        # Mise à jour du graphique linéaire 2D: une vue choisie par l'utilisateur est conservée
+        if self.vue_utilisateur:
+            self._decimer_lineaire(*self.ax_linear.get_xlim())
+        else:
+            self._decimer_lineaire()
+            self._mise_a_jour_lod = True
+            try:
+                self.ax_linear.relim()
+                self.ax_linear.autoscale_view()
+            finally:
+                self._mise_a_jour_lod = False
         
         # Mise à jour du diagramme de phase 3D
-        self.ax_3d.clear()
-        self.ax_3d.set_title("Diagramme de phase en 3D")
-        self.ax_3d.set_xlabel("Sains")
-        self.ax_3d.set_ylabel("Infectés")
-        self.ax_3d.set_zlabel("Rétablis")
-        self.ax_3d.plot(sains, infectes, retablis, color='purple', label='Trajectoire')
-        self.ax_3d.scatter(sains[0], infectes[0], retablis[0], color='green', s=100, label='Début')
-        self.ax_3d.scatter(sains[-1], infectes[-1], retablis[-1], color='red', s=100, label='Fin')
-        self.ax_3d.legend()
+        self.axe_3d()
+        sains, infectes, retablis = self.donnees['sain'], self.donnees['infecté'], self.donnees['rétabli']
+        indices = indices_multiples((sains, infectes, retablis), self.largeur_pixels(self.ax_3d))
+        self.trajectoire_3d.set_data_3d(sains[indices], infectes[indices], retablis[indices])
+        self.debut_3d.set_data_3d(sains[:1], infectes[:1], retablis[:1])
+        self.fin_3d.set_data_3d(sains[-1:], infectes[-1:], retablis[-1:])
+        self.ax_3d.auto_scale_xyz(sains[indices], infectes[indices], retablis[indices], had_data=False)
         
-        self.canvas.draw()
+        self.canvas.draw_idle()
     
     def clear_graphs(self):
         # Réinitialiser les graphiques
-        self.ax_linear.clear()
-        self.ax_linear.set_title("Évolution de la population")
-        self.ax_linear.set_xlabel("Jour")
-        self.ax_linear.set_ylabel("Nombre d'individus")
+        self._source = None
+        self._convertis = 0
+        if self.fig is None:
+            return
+        import numpy as np
+        self.quitter_comparaison()
+        self.jours = np.empty(0)
+        self.donnees = {cle: np.empty(0) for cle, _, _ in SERIES}
+        self._decimer_lineaire()
+        self._mise_a_jour_lod = True
+        try:
+            # set_xlim (zoom, comparaison) désactive la mise à l'échelle automatique
+            self.ax_linear.set_autoscale_on(True)
+            self.ax_linear.relim()
+            self.ax_linear.autoscale_view()
+        finally:
+            self._mise_a_jour_lod = False
+        self.vue_utilisateur = False
         
-        self.ax_3d.clear()
-        self.ax_3d.set_title("Diagramme de phase en 3D")
-        self.ax_3d.set_xlabel("Sains")
-        self.ax_3d.set_ylabel("Infectés")
-        self.ax_3d.set_zlabel("Rétablis")
+        if self.ax_3d is not None:
+            for ligne in (self.trajectoire_3d, self.debut_3d, self.fin_3d):
+                ligne.set_data_3d([], [], [])
         
-        self.canvas.draw()
+        self.canvas.draw_idle()
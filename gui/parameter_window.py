@@ -72,34 +72,11 @@ class ParameterWindow:
             self.simulation_app.prob_vaccination.set(self.simulation_app.prob_vaccination.get() / 100)
             self.simulation_app.taux_mortalite.set(self.simulation_app.taux_mortalite.get() / 100)
             
-            # Validation des paramètres
-            total_initial = (
-                self.simulation_app.initial_sains.get() +
-                self.simulation_app.initial_contamines.get() +
-                self.simulation_app.initial_infectes.get() +
-                self.simulation_app.initial_retablis.get() +
-                self.simulation_app.initial_morts.get()
-            )
-            if total_initial > 10000:
-                messagebox.showerror("Erreur", "La population totale ne doit pas dépasser 10 000 individus.")
-                return
-            if not (0 <= self.simulation_app.prob_contamination.get() <= 1):
-                messagebox.showerror("Erreur", "La probabilité de contamination doit être entre 0 et 1.")
-                return
-            if not (0 <= self.simulation_app.prob_vaccination.get() <= 1):
-                messagebox.showerror("Erreur", "La probabilité de vaccination doit être entre 0 et 1.")
-                return
-            if not (0 <= self.simulation_app.taux_mortalite.get() <= 1):
-                messagebox.showerror("Erreur", "Le taux de mortalité doit être entre 0 et 1.")
-                return
-            if self.simulation_app.duree_incubation.get() <= 0 or self.simulation_app.duree_infection.get() <= 0 or self.simulation_app.duree_immunite.get() <= 0:
-                messagebox.showerror("Erreur", "Les durées doivent être des nombres positifs.")
-                return
-            if self.simulation_app.nombre_jours.get() <= 0:
-                messagebox.showerror("Erreur", "Le nombre de jours de simulation doit être un nombre positif.")
-                return
-            if self.simulation_app.discretisation.get() <= 0:
-                messagebox.showerror("Erreur", "La discrétisation doit être un nombre positif.")
+            # Validation des paramètres (règles partagées avec le lancement de la simulation)
+            try:
+                self.simulation_app.lire_parametres()
+            except ValueError as e:
+                messagebox.showerror("Erreur", str(e))
                 return
             
             # Mise à jour des labels et fermeture de la fenêtre
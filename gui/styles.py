@@ -0,0 +1,13 @@
+# gui/styles.py
+# Styles partagés par la fenêtre principale et l'export hors écran (sans dépendance à Tk)
+
+# Séries du graphique linéaire: (clé des statistiques, libellé, couleur)
+SERIES = (
+    ('sain', 'Sains', 'green'),
+    ('contaminé', 'Contaminés', 'yellow'),
+    ('infecté', 'Infectés', 'red'),
+    ('rétabli', 'Rétablis', 'blue'),
+    ('mort', 'Morts', 'black'),
+)
+# Styles de trait distinguant les scénarios superposés en mode comparaison
+STYLES_SCENARIOS = ('solid', 'dashed', 'dotted', 'dashdot')
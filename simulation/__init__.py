@@ -1,2 +1,30 @@
 # simulation/__init__.py
-from .differential_equations import simulate_seir
+import importlib
+
+from .parameters import VirusParams, SCHEMA_VERSION, migrer_parametres
+
+__version__ = '1.0.0'
+
+# Le moteur (NumPy/SciPy) n'est importé qu'au premier accès, pour accélérer le démarrage de l'interface
+_EXPORTS_DIFFERES = {
+    'simulate_seir': '.differential_equations',
+    'resoudre_seir': '.differential_equations',
+    'grille_temps': '.differential_equations',
+    'caracteriser_epidemie': '.differential_equations',
+    'PlanInterventions': '.interventions',
+    'resoudre_avec_interventions': '.interventions',
+    'ModeleCompartimental': '.models',
+    'MODELES': '.models',
+    'simulate_modele': '.models',
+    'compiler_modele': '.model_compiler',
+    'PopulationAgents': '.agents',
+    'manifeste_execution': '.runs',
+    'DepotResultats': '.runs',
+}
+
+def __getattr__(name):
+    if name in _EXPORTS_DIFFERES:
+        valeur = getattr(importlib.import_module(_EXPORTS_DIFFERES[name], __name__), name)
+        globals()[name] = valeur
+        return valeur
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
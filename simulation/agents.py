@@ -0,0 +1,314 @@
+# simulation/agents.py
+import os
+
+import numpy as np
+
+from .checkpoint import charger_point, sauvegarder_point
+from .parameters import VirusParams
+
+# Codes d'état des agents (uint8)
+SAIN, CONTAMINE, INFECTE, RETABLI, MORT = range(5)
+COMPARTIMENTS = ('sain', 'contaminé', 'infecté', 'rétabli', 'mort')
+
+# Agents traités ensemble: les tableaux de travail d'un bloc tiennent dans le cache L2/L3
+TAILLE_BLOC = 1 << 20
+FICHIER_POINT = 'point.npz'
+
+def _chemin(dossier, nom):
+    return os.path.join(dossier, f"{nom}.bin")
+
+def _indexer_regions(dossier, region, population_region, taille_bloc):
+    # Tri par dénombrement, bloc par bloc: membres[bornes[r]:bornes[r+1]] sont les agents de la région r
+    bornes = np.concatenate(([0], np.cumsum(population_region)))
+    dtype = np.uint32 if len(region) <= np.iinfo(np.uint32).max else np.int64
+    membres = np.memmap(_chemin(dossier, 'membres'), dtype=dtype, mode='w+', shape=(len(region),))
+    curseur = bornes[:-1].copy()
+    for debut in range(0, len(region), taille_bloc):
+        regions = np.asarray(region[debut:debut + taille_bloc])
+        ordre = np.argsort(regions, kind='stable')
+        comptes = np.bincount(regions, minlength=len(population_region))
+        rang = np.arange(len(ordre)) - np.repeat(np.cumsum(comptes) - comptes, comptes)
+        membres[curseur[regions[ordre]] + rang] = debut + ordre
+        curseur += comptes
+    membres.flush()
+
+class PopulationAgents:
+    """
+    Modèle à agents de l'ancienne application (_OLD/simulation.py) dont l'état est stocké
+    dans des fichiers numpy.memmap plutôt qu'en objets Python: un code d'état (uint8), le
+    jour d'origine de son minuteur (int16) et une région (uint16), plus l'index des agents
+    par région quand il y en a plusieurs. Le système d'exploitation pagine les fichiers, ce
+    qui permet des populations plus grandes que la RAM.
+
+    Un jour ne parcourt pas la population: les effectifs par état et par région sont tenus à
+    jour à chaque transition, les nouveaux contaminés et vaccinés sont tirés parmi les sains
+    (effectif binomial par région puis tirage uniforme), et les fins d'incubation, d'infection
+    et d'immunité sont rangées dans un calendrier par jour d'échéance. Le coût d'un jour est
+    proportionnel au nombre d'agents qui changent d'état.
+
+    Les changements du jour sont d'abord écrits dans le point de reprise (journal), puis
+    appliqués aux fichiers: une interruption reprend exactement au dernier jour achevé.
+
+    Utiliser PopulationAgents.creer() pour une nouvelle population, PopulationAgents(dossier)
+    pour en rouvrir une.
+    """
+
+    def __init__(self, dossier):
+        self.dossier = dossier
+        point = charger_point(os.path.join(dossier, FICHIER_POINT))
+        meta, tableaux = point['meta'], point['tableaux']
+        self.params = VirusParams.from_dict(meta['params'])
+        self.taille = meta['taille']
+        self.n_regions = meta['n_regions']
+        self.melange = meta['melange']
+        self.taille_bloc = meta['taille_bloc']
+        self.jour = point['jour']
+        self.rng = point['rng']
+        self.statistiques = [dict(zip(COMPARTIMENTS, map(int, ligne))) for ligne in tableaux['statistiques']]
+        self.comptes = tableaux['statistiques'][-1].copy()
+        self.population_region = tableaux['population_region']
+        self.sains_region = tableaux['sains_region']
+        self.infectes_region = tableaux['infectes_region']
+        p = self.params
+        self.durees = {
+            CONTAMINE: max(1, int(np.ceil(p.duree_incubation))),
+            INFECTE: max(1, int(np.ceil(p.duree_infection))),
+        }
+        # Immunité permanente (durée nulle): les rétablis ne sont jamais replanifiés
+        if p.omega > 0:
+            self.durees[RETABLI] = max(1, int(np.ceil(p.duree_immunite)))
+
+        forme = (self.taille,)
+        self.region = np.memmap(_chemin(dossier, 'region'), dtype=np.uint16, mode='r', shape=forme)
+        self.etat = np.memmap(_chemin(dossier, 'etat'), dtype=np.uint8, mode='r+', shape=forme)
+        self.origine = np.memmap(_chemin(dossier, 'origine'), dtype=np.int16, mode='r+', shape=forme)
+        self.bornes_region = np.concatenate(([0], np.cumsum(self.population_region)))
+        self.membres = None
+        if self.n_regions > 1:
+            if not os.path.exists(_chemin(dossier, 'membres')):
+                _indexer_regions(dossier, self.region, self.population_region, self.taille_bloc)
+            dtype = np.uint32 if self.taille <= np.iinfo(np.uint32).max else np.int64
+            self.membres = np.memmap(_chemin(dossier, 'membres'), dtype=dtype, mode='r', shape=forme)
+
+        # Journal du dernier jour, peut-être interrompu avant d'atteindre les fichiers
+        self._appliquer(tableaux['journal_ids'], tableaux['journal_etat'], tableaux['journal_origine'])
+        self.calendrier = {}
+        self._reconstruire_calendrier()
+
+    @classmethod
+    def creer(cls, dossier, params, effectifs=None, n_regions=1, melange=0.0, graine=None, taille_bloc=TAILLE_BLOC):
+        """
+        Crée les fichiers d'une population à partir des effectifs initiaux d'un virus.
+
+        Args:
+            dossier (str): Dossier des fichiers de la population (créé si besoin).
+            params (VirusParams): Virus simulé.
+            effectifs (tuple, optional): Effectifs initiaux (S, E, I, R, D) remplaçant ceux du virus.
+            n_regions (int): Nombre de régions; chaque agent est affecté à une région au hasard.
+            melange (float): Part des contacts hors de la région (0: régions isolées, 1: population homogène).
+            graine (int, optional): Graine du générateur aléatoire.
+        """
+        if not 1 <= n_regions <= np.iinfo(np.uint16).max + 1:
+            raise ValueError(f"Nombre de régions invalide: {n_regions}")
+        os.makedirs(dossier, exist_ok=True)
+        effectifs = np.array(params.etat_initial if effectifs is None else effectifs, dtype=np.int64)
+        if effectifs.shape != (5,) or (effectifs < 0).any():
+            raise ValueError("Les effectifs initiaux doivent être 5 nombres positifs.")
+        taille = int(effectifs.sum())
+        bornes = np.concatenate(([0], np.cumsum(effectifs)))
+        rng = np.random.default_rng(graine)
+        region = np.memmap(_chemin(dossier, 'region'), dtype=np.uint16, mode='w+', shape=(taille,))
+        etat = np.memmap(_chemin(dossier, 'etat'), dtype=np.uint8, mode='w+', shape=(taille,))
+        # Les agents initiaux ont un minuteur à zéro au jour 0, comme s'ils étaient entrés dans leur état la veille
+        origine = np.memmap(_chemin(dossier, 'origine'), dtype=np.int16, mode='w+', shape=(taille,))
+        population_region = np.zeros(n_regions, dtype=np.int64)
+        sains_region = np.zeros(n_regions, dtype=np.int64)
+        infectes_region = np.zeros(n_regions, dtype=np.int64)
+        for debut in range(0, taille, taille_bloc):
+            fin = min(debut + taille_bloc, taille)
+            # Agents rangés par état initial, comme dans l'ancienne Population
+            codes = (np.searchsorted(bornes, np.arange(debut, fin), side='right') - 1).astype(np.uint8)
+            regions = rng.integers(0, n_regions, size=fin - debut, dtype=np.uint16)
+            etat[debut:fin] = codes
+            origine[debut:fin] = -1
+            region[debut:fin] = regions
+            population_region += np.bincount(regions, minlength=n_regions)
+            sains_region += np.bincount(regions[codes == SAIN], minlength=n_regions)
+            infectes_region += np.bincount(regions[codes == INFECTE], minlength=n_regions)
+        for tableau in (region, etat, origine):
+            tableau.flush()
+        if n_regions > 1:
+            _indexer_regions(dossier, region, population_region, taille_bloc)
+        del region, etat, origine
+
+        meta = {
+            'params': params.to_dict(), 'taille': taille, 'n_regions': int(n_regions), 'melange': float(melange),
+            'taille_bloc': int(taille_bloc),
+        }
+        sauvegarder_point(os.path.join(dossier, FICHIER_POINT), 0, {
+            'statistiques': effectifs[None, :], 'population_region': population_region,
+            'sains_region': sains_region, 'infectes_region': infectes_region,
+            'journal_ids': np.empty(0, dtype=np.int64), 'journal_etat': np.empty(0, dtype=np.uint8),
+            'journal_origine': np.empty(0, dtype=np.int16),
+        }, rng=rng, meta=meta)
+        return cls(dossier)
+
+    def _reconstruire_calendrier(self):
+        # Un seul parcours à l'ouverture: les échéances se déduisent de l'état et de l'origine
+        for debut in range(0, self.taille, self.taille_bloc):
+            etat = np.asarray(self.etat[debut:debut + self.taille_bloc])
+            origine = np.asarray(self.origine[debut:debut + self.taille_bloc])
+            for code, duree in self.durees.items():
+                ids = np.flatnonzero(etat == code)
+                echeances = origine[ids].astype(np.int64) + duree
+                ordre = np.argsort(echeances, kind='stable')
+                jours, premiers = np.unique(echeances[ordre], return_index=True)
+                for jour, groupe in zip(jours, np.split(ids[ordre] + debut, premiers[1:])):
+                    self._planifier(code, groupe, max(int(jour), self.jour))
+
+    def _planifier(self, code, ids, echeance):
+        if len(ids):
+            self.calendrier.setdefault(echeance, {}).setdefault(code, []).append(ids)
+
+    def _echeances(self, code):
+        # Triés: le même ordre qu'après une reconstruction, pour une reprise identique
+        groupes = self.calendrier.get(self.jour, {}).pop(code, [])
+        return np.sort(np.concatenate(groupes)) if groupes else np.empty(0, dtype=np.int64)
+
+    def _agents(self, positions):
+        return positions if self.membres is None else self.membres[positions].astype(np.int64)
+
+    def _tirer_sains(self, r, k):
+        # k sains distincts de la région r, uniformément: tirages avec remise rejetés s'ils ne sont
+        # pas sains, premières occurrences conservées dans l'ordre des tirages
+        debut, fin = self.bornes_region[r], self.bornes_region[r + 1]
+        n, sains = fin - debut, self.sains_region[r]
+        if k * n > sains * (n // 4 + 1):
+            # Presque plus de sains ou presque tous tirés: un parcours de la région coûte moins
+            candidats = np.concatenate([
+                ids[self.etat[ids] == SAIN]
+                for ids in (self._agents(np.arange(b, min(b + self.taille_bloc, fin))) for b in range(debut, fin, self.taille_bloc))
+            ])
+            return self.rng.permutation(candidats)[:k]
+        choisis = np.empty(0, dtype=np.int64)
+        while len(choisis) < k:
+            m = int((k - len(choisis)) * n / sains * 1.2) + 16
+            candidats = self._agents(debut + self.rng.integers(0, n, size=m))
+            tous = np.concatenate((choisis, candidats[self.etat[candidats] == SAIN]))
+            _, premiers = np.unique(tous, return_index=True)
+            choisis = tous[np.sort(premiers)][:k]
+        return choisis
+
+    def _par_region(self, ids):
+        return np.bincount(self.region[ids], minlength=self.n_regions)
+
+    def jour_suivant(self):
+        # Propagation, vaccination puis évolution des agents arrivés à échéance, dans l'ordre de l'ancien simuler()
+        p, j = self.params, self.jour
+        journal = []
+
+        # Effectifs binomiaux par région, puis choix des agents
+        pression = self._pression() if self.infectes_region.any() else np.zeros(self.n_regions)
+        n_contamines = self.rng.binomial(self.sains_region, pression)
+        n_vaccines = self.rng.binomial(self.sains_region - n_contamines, p.prob_vaccination)
+        contamines, vaccines = [], []
+        for r in np.flatnonzero(n_contamines + n_vaccines):
+            ids = self._tirer_sains(r, n_contamines[r] + n_vaccines[r])
+            contamines.append(ids[:n_contamines[r]])
+            vaccines.append(ids[n_contamines[r]:])
+        contamines = np.concatenate(contamines) if contamines else np.empty(0, dtype=np.int64)
+        vaccines = np.concatenate(vaccines) if vaccines else np.empty(0, dtype=np.int64)
+        self.sains_region -= n_contamines + n_vaccines
+        # Les nouveaux contaminés et vaccinés voient leur minuteur avancer dès aujourd'hui
+        journal.append((contamines, CONTAMINE, j - 1))
+        self._planifier(CONTAMINE, contamines, j - 1 + self.durees[CONTAMINE])
+        journal.append((vaccines, RETABLI, j - 1))
+        if RETABLI in self.durees:
+            self._planifier(RETABLI, vaccines, j - 1 + self.durees[RETABLI])
+
+        # Une seule transition par agent et par jour
+        incubes = self._echeances(CONTAMINE)
+        journal.append((incubes, INFECTE, j))
+        self._planifier(INFECTE, incubes, j + self.durees[INFECTE])
+        gueris = self._echeances(INFECTE)
+        morts = self.rng.random(len(gueris)) < p.taux_mortalite
+        journal.append((gueris[morts], MORT, j))
+        journal.append((gueris[~morts], RETABLI, j))
+        if RETABLI in self.durees:
+            self._planifier(RETABLI, gueris[~morts], j + self.durees[RETABLI])
+        immunises = self._echeances(RETABLI)
+        journal.append((immunises, SAIN, j))
+        self.calendrier.pop(j, None)
+
+        self.sains_region += self._par_region(immunises)
+        self.infectes_region += self._par_region(incubes) - self._par_region(gueris)
+        self.comptes += [
+            len(immunises) - len(contamines) - len(vaccines),
+            len(contamines) - len(incubes),
+            len(incubes) - len(gueris),
+            len(vaccines) + (~morts).sum() - len(immunises),
+            morts.sum(),
+        ]
+        self.jour += 1
+        self.statistiques.append(dict(zip(COMPARTIMENTS, map(int, self.comptes))))
+
+        # Journal écrit avant les fichiers; un agent changé deux fois garde son dernier état
+        ids = np.concatenate([i for i, _, _ in journal])
+        codes = np.concatenate([np.full(len(i), c, dtype=np.uint8) for i, c, _ in journal])
+        origines = np.concatenate([np.full(len(i), o, dtype=np.int16) for i, _, o in journal])
+        _, derniers = np.unique(ids[::-1], return_index=True)
+        garder = len(ids) - 1 - derniers
+        self._sauvegarder(ids[garder], codes[garder], origines[garder])
+        self._appliquer(ids[garder], codes[garder], origines[garder])
+        return self.statistiques[-1]
+
+    def _pression(self):
+        # Probabilité de contamination d'un sain, par région (contacts locaux et globaux)
+        population = np.maximum(self.population_region, 1)
+        locale = self.infectes_region / population
+        globale = self.infectes_region.sum() / max(self.taille, 1)
+        return self.params.prob_contamination * ((1 - self.melange) * locale + self.melange * globale)
+
+    def _appliquer(self, ids, codes, origines):
+        if len(ids):
+            self.etat[ids] = codes
+            self.origine[ids] = origines
+            self.etat.flush()
+            self.origine.flush()
+
+    def _sauvegarder(self, ids, codes, origines):
+        meta = {
+            'params': self.params.to_dict(), 'taille': self.taille, 'n_regions': self.n_regions,
+            'melange': self.melange, 'taille_bloc': self.taille_bloc,
+        }
+        statistiques = np.array([[s[c] for c in COMPARTIMENTS] for s in self.statistiques], dtype=np.int64)
+        sauvegarder_point(os.path.join(self.dossier, FICHIER_POINT), self.jour, {
+            'statistiques': statistiques, 'population_region': self.population_region,
+            'sains_region': self.sains_region, 'infectes_region': self.infectes_region,
+            'journal_ids': ids, 'journal_etat': codes, 'journal_origine': origines,
+        }, rng=self.rng, meta=meta)
+
+    def simuler(self, nombre_jours=None, callback=None):
+        """
+        Avance jusqu'au jour `nombre_jours` (par défaut celui du virus), en reprenant au
+        dernier jour achevé.
+
+        Returns:
+            list: Statistiques journalières {compartiment: effectif}, jour 0 compris.
+        """
+        nombre_jours = self.params.nombre_jours if nombre_jours is None else nombre_jours
+        if nombre_jours > np.iinfo(np.int16).max:
+            raise ValueError(f"Au plus {np.iinfo(np.int16).max} jours de simulation.")
+        while self.jour < nombre_jours:
+            comptes = self.jour_suivant()
+            if callback:
+                callback(self.jour, comptes, self.statistiques)
+        return self.statistiques
+
+    def effectif(self, compartiment):
+        # Effectif courant, sans parcours de la population
+        return int(self.comptes[COMPARTIMENTS.index(compartiment)])
+
+    def etat_courant(self):
+        # Vue (sans copie) sur les codes d'état du jour courant
+        return self.etat
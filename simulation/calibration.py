@@ -0,0 +1,225 @@
+# simulation/calibration.py
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.optimize import least_squares
+from scipy.stats import qmc
+
+import utils.file_management as file_management
+from .differential_equations import simulate_seir_batch, simulate_seir_sensitivities
+from .parameters import VirusParams
+
+COMPARTIMENTS = ('sain', 'contaminé', 'infecté', 'rétabli', 'mort')
+TAUX = ('beta', 'sigma', 'gamma', 'mu')
+
+# Bornes par défaut des taux ajustés (sigma et gamma strictement positifs: durées finies)
+BORNES_PAR_DEFAUT = {
+    'beta': (1e-4, 1.0),
+    'sigma': (1e-3, 5.0),
+    'gamma': (1e-3, 5.0),
+    'mu': (0.0, 1.0),
+}
+# Domaine de chaque taux accepté par VirusParams: (min, max, min inclus)
+DOMAINES = {
+    'beta': (0.0, 1.0, True),
+    'sigma': (0.0, np.inf, False),
+    'gamma': (0.0, np.inf, False),
+    'mu': (0.0, 1.0, True),
+}
+
+def charger_serie(path, colonne=None):
+    """
+    Lit une série observée dans un fichier CSV avec en-tête.
+
+    Args:
+        path (str): Chemin du fichier CSV.
+        colonne (str, optional): Colonne à utiliser. Par défaut, la dernière colonne.
+
+    Returns:
+        np.ndarray: Valeurs journalières observées.
+    """
+    donnees = np.genfromtxt(path, delimiter=',', names=True, dtype=float, encoding='utf-8')
+    noms = donnees.dtype.names
+    if colonne is None:
+        colonne = noms[-1]
+    if colonne not in noms:
+        raise ValueError(f"Colonne '{colonne}' absente du fichier '{path}' (colonnes: {', '.join(noms)}).")
+    return np.atleast_1d(donnees[colonne])
+
+class _Residus:
+    # Résidus du modèle par rapport aux observations. Les jeux de paramètres candidats
+    # (point courant et perturbations pour le jacobien) sont résolus en un seul lot.
+
+    def __init__(self, params, observations, compartiment, ajustes, t):
+        self.etat_initial = np.asarray(params.etat_initial, dtype=float)
+        self.taux_fixes = dict(zip(TAUX, params.taux))
+        self.observations = observations
+        self.masque = ~np.isnan(observations)
+        self.indice = COMPARTIMENTS.index(compartiment)
+        self.ajustes = ajustes
+        self.t = t
+        self.echelle = max(np.nanmax(np.abs(observations)), 1.0)
+        # Résidus du dernier point évalué, gardés en cache: le jacobien par différences
+        # les reprend au lieu de les recalculer au point courant
+        self._dernier_x = None
+        self._dernier_r = None
+        self.nb_resolutions = 0
+
+    def _taux(self, X):
+        taux = [np.full(len(X), self.taux_fixes[nom]) for nom in TAUX]
+        for j, nom in enumerate(self.ajustes):
+            taux[TAUX.index(nom)] = X[:, j]
+        return taux
+
+    def evaluer_lot(self, X):
+        X = np.atleast_2d(X)
+        trajectoires = simulate_seir_batch(self.etat_initial, *self._taux(X), self.t)
+        self.nb_resolutions += 1
+        modele = trajectoires[:, :, self.indice]
+        return (modele[:, self.masque] - self.observations[self.masque]) / self.echelle
+
+    def __call__(self, x):
+        if self._dernier_x is None or not np.array_equal(x, self._dernier_x):
+            self._dernier_x = np.array(x)
+            self._dernier_r = self.evaluer_lot(x)[0]
+        return self._dernier_r
+
+    def jacobien_exact(self, x):
+        # Jacobien exact par les équations de sensibilité directe: une seule résolution augmentée
+        taux = [t[0] for t in self._taux(np.atleast_2d(x))]
+        trajectoire, sensibilites = simulate_seir_sensitivities(self.etat_initial, *taux, self.t)
+        self.nb_resolutions += 1
+        colonnes = [TAUX.index(nom) for nom in self.ajustes]
+        return sensibilites[self.masque][:, self.indice, colonnes] / self.echelle
+
+    def jacobien(self, x, bornes_sup):
+        # Différences finies avant, les k perturbations étant résolues dans un seul lot
+        r0 = self(x)
+        pas = np.sqrt(np.finfo(float).eps) * np.maximum(np.abs(x), 1e-2)
+        # Rester dans les bornes: perturber vers le bas si le pas avant sort du domaine
+        pas = np.where(x + pas > bornes_sup, -pas, pas)
+        X = x + np.diag(pas)
+        R = self.evaluer_lot(X)
+        return ((R - r0) / pas[:, None]).T
+
+def _valider_bornes(ajustes, bornes):
+    # Les bornes doivent rester dans le domaine de VirusParams: sinon avec_taux ne refuserait
+    # le virus ajusté qu'à la fin de l'ajustement
+    for nom, (inf, sup) in zip(ajustes, bornes):
+        minimum, maximum, inclus = DOMAINES[nom]
+        if not inf <= sup:
+            raise ValueError(f"Bornes de {nom} invalides: {inf} > {sup}.")
+        if inf < minimum or (inf == minimum and not inclus) or sup > maximum:
+            domaine = f"{'[' if inclus else ']'}{minimum}, {maximum}]" if np.isfinite(maximum) else f"]{minimum}, +inf["
+            raise ValueError(f"Bornes de {nom} ({inf}, {sup}) hors du domaine {domaine}.")
+
+def _ajuster(params, observations, compartiment, ajustes, bornes, x0, jacobien):
+    t = np.arange(len(observations), dtype=float)
+    residus = _Residus(params, observations, compartiment, ajustes, t)
+    inf, sup = np.array(bornes, dtype=float).T
+    if jacobien == 'sensibilites':
+        jac = residus.jacobien_exact
+    else:
+        jac = lambda x: residus.jacobien(x, sup)
+    resultat = least_squares(
+        residus, np.clip(x0, inf, sup), jac=jac, bounds=(inf, sup), x_scale='jac'
+    )
+    return resultat.x, resultat.cost, resultat.success, resultat.message, residus.nb_resolutions
+
+def _ajuster_tache(arguments):
+    return _ajuster(*arguments)
+
+def calibrer(params, observations, compartiment='infecté', ajustes=TAUX, bornes=None,
+             nb_departs=1, n_jobs=None, graine=None, jacobien='sensibilites'):
+    """
+    Ajuste les taux d'un virus à une série observée par moindres carrés bornés.
+
+    Args:
+        params (VirusParams): Virus de départ (conditions initiales et taux non ajustés).
+        observations (array-like | str): Série journalière (NaN = jour manquant) ou chemin d'un CSV.
+        compartiment (str): Compartiment comparé aux observations.
+        ajustes (tuple): Taux ajustés, parmi 'beta', 'sigma', 'gamma', 'mu'.
+        bornes (dict, optional): Bornes {taux: (min, max)}, complétées par BORNES_PAR_DEFAUT.
+            Elles doivent rester dans le domaine des taux de VirusParams (DOMAINES).
+        nb_departs (int): Nombre de points de départ. Le premier est le virus lui-même,
+            les suivants sont tirés par hypercube latin dans les bornes.
+        n_jobs (int, optional): Nombre de processus pour les départs multiples.
+        graine (int, optional): Graine du tirage des points de départ.
+        jacobien (str): 'sensibilites' (exact, par les équations de sensibilité directe)
+            ou 'differences' (différences finies résolues en lot).
+
+    Returns:
+        dict: 'params' (VirusParams ajusté), 'taux', 'cout', 'succes', 'message', 'departs'.
+    """
+    if isinstance(observations, str):
+        observations = charger_serie(observations)
+    observations = np.asarray(observations, dtype=float)
+    if compartiment not in COMPARTIMENTS:
+        raise ValueError(f"Compartiment inconnu: {compartiment}")
+    if jacobien not in ('sensibilites', 'differences'):
+        raise ValueError(f"Méthode de jacobien inconnue: {jacobien}")
+    inconnus = set(ajustes) - set(TAUX)
+    if inconnus:
+        raise ValueError(f"Taux inconnus: {', '.join(sorted(inconnus))}")
+    ajustes = tuple(ajustes)
+    bornes = [(bornes or {}).get(nom, BORNES_PAR_DEFAUT[nom]) for nom in ajustes]
+    _valider_bornes(ajustes, bornes)
+
+    # Premier départ depuis les taux du virus (ramenés dans les bornes), puis départs tirés
+    taux = dict(zip(TAUX, params.taux))
+    departs = [np.array([taux[nom] for nom in ajustes])]
+    if nb_departs > 1:
+        inf, sup = np.array(bornes, dtype=float).T
+        echantillon = qmc.LatinHypercube(d=len(ajustes), seed=graine).random(nb_departs - 1)
+        departs.extend(qmc.scale(echantillon, inf, sup))
+
+    taches = [(params, observations, compartiment, ajustes, bornes, x0, jacobien) for x0 in departs]
+    if len(taches) > 1 and n_jobs != 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            resultats = list(executor.map(_ajuster_tache, taches))
+    else:
+        resultats = [_ajuster_tache(tache) for tache in taches]
+
+    x, cout, succes, message, _ = min(resultats, key=lambda r: r[1])
+    taux_ajustes = dict(zip(ajustes, (float(v) for v in x)))
+    return {
+        'params': params.avec_taux(**taux_ajustes),
+        'taux': taux_ajustes,
+        'cout': float(cout),
+        'succes': bool(succes),
+        'message': message,
+        'departs': [float(r[1]) for r in resultats],
+    }
+
+def calibrer_virus(nom_virus, observations, nom_sortie=None, **options):
+    # Ajuste un virus sauvegardé et enregistre le résultat via save_virus
+    params = VirusParams.from_dict(file_management.load_virus(nom_virus))
+    resultat = calibrer(params, observations, **options)
+    file_management.save_virus(nom_sortie or nom_virus, resultat['params'].to_dict())
+    return resultat
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibre un virus sauvegardé sur une série observée (CSV).")
+    parser.add_argument('virus', help="Nom du virus dans le dossier virus/")
+    parser.add_argument('csv', help="Fichier CSV de la série observée")
+    parser.add_argument('--colonne', help="Colonne du CSV à utiliser (par défaut la dernière)")
+    parser.add_argument('--compartiment', default='infecté', choices=COMPARTIMENTS)
+    parser.add_argument('--ajuster', default=','.join(TAUX), help="Taux ajustés, séparés par des virgules")
+    parser.add_argument('--departs', type=int, default=1, help="Nombre de points de départ")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="Nombre de processus")
+    parser.add_argument('--sortie', help="Nom du virus ajusté (par défaut, remplace le virus d'origine)")
+    args = parser.parse_args(argv)
+
+    resultat = calibrer_virus(
+        args.virus, charger_serie(args.csv, args.colonne), nom_sortie=args.sortie,
+        compartiment=args.compartiment, ajustes=tuple(args.ajuster.split(',')),
+        nb_departs=args.departs, n_jobs=args.jobs
+    )
+    print(f"Coût: {resultat['cout']:.6g} ({resultat['message']})")
+    for nom, valeur in resultat['taux'].items():
+        print(f"{nom} = {valeur:.6g}")
+
+if __name__ == '__main__':
+    main()
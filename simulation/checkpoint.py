@@ -0,0 +1,114 @@
+# simulation/checkpoint.py
+import argparse
+import json
+import os
+
+import numpy as np
+
+from utils.file_management import ecriture_atomique
+
+# Version du format des points de reprise
+VERSION_POINT = 1
+
+def sauvegarder_point(path, jour, tableaux, rng=None, meta=None):
+    """
+    Écrit un point de reprise binaire (.npz non compressé) de façon atomique: un arrêt
+    brutal pendant l'écriture laisse le point précédent intact.
+
+    Args:
+        path (str): Fichier du point de reprise.
+        jour (int): Compteur d'avancement (jour ou pas déjà calculés).
+        tableaux (dict): {nom: np.ndarray} de l'état du moteur, enregistrés bit à bit.
+        rng (np.random.Generator, optional): Générateur dont l'état est enregistré.
+        meta (dict, optional): Informations JSON complémentaires.
+    """
+    entete = {
+        'version': VERSION_POINT,
+        'jour': int(jour),
+        'rng': rng.bit_generator.state if rng is not None else None,
+        'meta': meta or {},
+    }
+    contenu = {f"tableau_{nom}": np.asarray(valeur) for nom, valeur in tableaux.items()}
+    contenu['entete'] = np.frombuffer(json.dumps(entete).encode('utf-8'), dtype=np.uint8)
+    ecriture_atomique(path, lambda f: np.savez(f, **contenu))
+
+def chemin_segments(path):
+    # Fichier des segments ajoutés à côté d'un point de reprise
+    return f"{path}.segments"
+
+def ajouter_segment(path, tableau):
+    """
+    Ajoute un tableau (données brutes) à la fin d'un fichier de segments, écrit sur disque
+    avant le retour: le point de reprise qui le compte n'est écrit qu'ensuite. Chaque point
+    n'écrit ainsi que ce qui a été calculé depuis le précédent.
+    """
+    with open(path, 'ab') as f:
+        f.write(np.ascontiguousarray(tableau).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+def lire_segments(path, dtype, nombre):
+    """
+    Relit les `nombre` premiers éléments d'un fichier de segments. Ce qui les suit (ajout
+    interrompu avant l'écriture du point de reprise) est retiré du fichier.
+    """
+    dtype = np.dtype(dtype)
+    with open(path, 'r+b') as f:
+        f.truncate(nombre * dtype.itemsize)
+        donnees = np.fromfile(f, dtype=dtype, count=nombre)
+    if len(donnees) != nombre:
+        raise ValueError(f"Segments incomplets dans {path}: {len(donnees)} éléments sur {nombre}.")
+    return donnees
+
+def charger_point(path):
+    """
+    Returns:
+        dict: 'jour', 'tableaux' ({nom: np.ndarray}), 'rng' (np.random.Generator restauré ou None)
+        et 'meta'.
+    """
+    with np.load(path, allow_pickle=False) as donnees:
+        entete = json.loads(donnees['entete'].tobytes().decode('utf-8'))
+        if entete['version'] > VERSION_POINT:
+            raise ValueError(f"Version de point de reprise {entete['version']} non supportée.")
+        tableaux = {nom[len('tableau_'):]: donnees[nom] for nom in donnees.files if nom.startswith('tableau_')}
+    rng = None
+    if entete['rng'] is not None:
+        etat = entete['rng']
+        rng = np.random.Generator(getattr(np.random, etat['bit_generator'])())
+        rng.bit_generator.state = etat
+    return {'jour': entete['jour'], 'tableaux': tableaux, 'rng': rng, 'meta': entete['meta']}
+
+def reprendre_ensemble(path, intervalle_points=None):
+    """
+    Reprend un ensemble interrompu (simulate_ensemble avec point_de_reprise) à partir du seul
+    fichier de reprise: les entrées y sont enregistrées avec l'état.
+
+    Returns:
+        np.ndarray: Trajectoires structurées (k, nombre_jours) de simulate_ensemble, identiques bit à
+        bit à une exécution sans interruption.
+    """
+    from .ensemble import INTERVALLE_POINTS, simulate_ensemble
+
+    point = charger_point(path)
+    entrees, meta = point['tableaux'], point['meta']
+    return simulate_ensemble(
+        entrees['etat_initial'], *entrees['taux'], meta['nombre_jours'], meta['pas_par_jour'],
+        point_de_reprise=path, intervalle_points=intervalle_points or INTERVALLE_POINTS,
+        precision=meta.get('precision', 'float64')
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reprend un ensemble interrompu depuis son point de reprise.")
+    parser.add_argument('point', help="Fichier du point de reprise")
+    parser.add_argument('sortie', help="Fichier .npy des trajectoires")
+    parser.add_argument('--intervalle', type=float, help="Secondes entre deux points de reprise")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.point):
+        parser.error(f"Point de reprise introuvable: {args.point}")
+    jour = charger_point(args.point)['jour']
+    print(f"Reprise au jour {jour}")
+    np.save(args.sortie, reprendre_ensemble(args.point, args.intervalle))
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,16 @@
 # simulation/differential_equations.py
+from types import SimpleNamespace
+
 import numpy as np
-from scipy.integrate import odeint
+from scipy.integrate import OdeSolution, odeint, solve_ivp
+
+# Tolérances des résolutions à sortie continue (celles d'odeint par défaut)
+RTOL = 1.49012e-8
+ATOL = 1.49012e-8
+
+# Compteurs cumulés intégrés avec l'état (après S, E, I, R, D): nouvelles contaminations
+# (S -> E) et nouvelles infections (E -> I) depuis t = 0
+CUMULS = ('contaminations', 'infections')
 
 def seir_model(y, t, beta, sigma, gamma, mu):
     S, E, I, R = y
@@ -11,36 +21,318 @@ def seir_model(y, t, beta, sigma, gamma, mu):
     dRdt = gamma * I
     return [dSdt, dEdt, dIdt, dRdt]
 
+def seir_model_batch(y, t, beta, sigma, gamma, mu):
+    # Même système que seir_model, augmenté des morts cumulés, pour k jeux de paramètres
+    # empilés (état aplati de forme (5 * k,))
+    S, E, I, R, D = y.reshape(5, -1)
+    N = S + E + I + R
+    infection = beta * S * I / N
+    return np.concatenate((-infection, infection - sigma * E, sigma * E - (gamma + mu) * I, gamma * I, mu * I))
+
+def grille_temps(nombre_jours):
+    # Grille de sortie utilisée par simulate_seir: un point par jour, le jour 0 étant l'état initial
+    return np.arange(nombre_jours, dtype=float)
+
+def simulate_seir_batch(etat_initial, beta, sigma, gamma, mu, t):
+    """
+    Résout le modèle SEIR pour k jeux de paramètres en une seule intégration vectorisée.
+
+    Args:
+        etat_initial (array-like): (S0, E0, I0, R0, D0), de forme (5,) ou (k, 5).
+        beta, sigma, gamma, mu (array-like): Taux, scalaires ou de forme (k,).
+        t (array-like): Instants de sortie.
+
+    Returns:
+        np.ndarray: Tableau (k, len(t), 5) des compartiments sain, contaminé, infecté, rétabli, mort.
+    """
+    beta, sigma, gamma, mu = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float)) for x in (beta, sigma, gamma, mu)))
+    k = beta.shape[0]
+    etat_initial = np.broadcast_to(np.asarray(etat_initial, dtype=float), (k, 5))
+    y0 = etat_initial.T.ravel()
+    solution = odeint(seir_model_batch, y0, t, args=(beta, sigma, gamma, mu))
+    return solution.reshape(len(t), 5, k).transpose(2, 0, 1)
+
+def seir_model_sensitivities(y, t, beta, sigma, gamma, mu):
+    # Système SEIR (morts cumulés compris) augmenté des équations de sensibilité directe:
+    # y = [S, E, I, R, D] puis la matrice (5, 4) des dérivées d'état par rapport à (beta, sigma, gamma, mu)
+    S, E, I, R = y[:4]
+    sensibilites = y[5:].reshape(5, 4)
+    N = S + E + I + R
+    contact = S * I / N
+    infection = beta * contact
+    sS, sE, sI, sR, _ = sensibilites
+    # Gradient de beta * S * I / N par rapport à (S, E, I, R), appliqué aux sensibilités
+    variation = beta / N ** 2 * (I * (N - S) * sS - S * I * (sE + sR) + S * (N - I) * sI)
+    # Jacobien d'état appliqué aux sensibilités, plus les dérivées partielles par rapport
+    # aux paramètres (colonnes beta, sigma, gamma, mu)
+    dsS = -variation
+    dsE = variation - sigma * sE
+    dsI = sigma * sE - (gamma + mu) * sI
+    dsR = gamma * sI
+    dsD = mu * sI
+    dsS[0] -= contact
+    dsE[0] += contact
+    dsE[1] -= E
+    dsI[1] += E
+    dsI[2] -= I
+    dsI[3] -= I
+    dsR[2] += I
+    dsD[3] += I
+    return np.concatenate(([-infection, infection - sigma * E, sigma * E - (gamma + mu) * I, gamma * I, mu * I],
+                           dsS, dsE, dsI, dsR, dsD))
+
+def simulate_seir_sensitivities(etat_initial, beta, sigma, gamma, mu, t):
+    """
+    Résout le modèle SEIR et ses équations de sensibilité en une seule intégration.
+
+    Args:
+        etat_initial (array-like): (S0, E0, I0, R0, D0).
+        beta, sigma, gamma, mu (float): Taux du modèle.
+        t (array-like): Instants de sortie.
+
+    Returns:
+        tuple: (trajectoire (len(t), 5), sensibilites (len(t), 5, 4)), où sensibilites[j, c, p]
+        est la dérivée du compartiment c au temps t[j] par rapport au paramètre p
+        (dans l'ordre beta, sigma, gamma, mu).
+    """
+    etat_initial = np.asarray(etat_initial, dtype=float)
+    y0 = np.concatenate((etat_initial, np.zeros(20)))
+    solution = odeint(seir_model_sensitivities, y0, t, args=(beta, sigma, gamma, mu))
+    return solution[:, :5], solution[:, 5:].reshape(len(t), 5, 4)
+
+def sensibilites_locales(params, t=None):
+    """
+    Élasticités (p / y) * dy/dp du pic d'infectés et des morts finaux par rapport à beta, sigma, gamma, mu.
+
+    Returns:
+        dict: {'pic_infectes': {taux: élasticité}, 'morts_finaux': {taux: élasticité}}.
+    """
+    if t is None:
+        t = grille_temps(params.nombre_jours)
+    trajectoire, sensibilites = simulate_seir_sensitivities(params.etat_initial, *params.taux, t)
+    jour_pic = np.argmax(trajectoire[:, 2])
+    taux = np.array(params.taux)
+    noms = ('beta', 'sigma', 'gamma', 'mu')
+
+    def elasticites(valeur, gradient):
+        if valeur == 0:
+            return dict.fromkeys(noms, 0.0)
+        return dict(zip(noms, (float(e) for e in taux * gradient / valeur)))
+
+    return {
+        'pic_infectes': elasticites(trajectoire[jour_pic, 2], sensibilites[jour_pic, 2]),
+        'morts_finaux': elasticites(trajectoire[-1, 4], sensibilites[-1, 4]),
+    }
+
+def seir_model_morts(t, y, beta, sigma, gamma, mu):
+    # Second membre de seir_model augmenté des morts cumulés D (dD/dt = mu * I) et des compteurs
+    # CUMULS, au format solve_ivp: les totaux ne dépendent pas de la grille de sortie
+    S, E, I, R = y[:4]
+    N = S + E + I + R
+    infection = beta * S * I / N
+    incubation = sigma * E
+    return [-infection, infection - incubation, incubation - (gamma + mu) * I, gamma * I, mu * I, infection, incubation]
+
+class Evenement:
+    """
+    Condition surveillée pendant l'intégration: l'instant où `condition(t, y, beta, sigma, gamma, mu)`
+    s'annule est localisé précisément par le solveur (y = [S, E, I, R, D] puis les CUMULS).
+
+    Args:
+        nom (str): Nom de l'événement dans les résultats.
+        condition (callable): Fonction dont on cherche les zéros.
+        terminal (bool): Arrêter l'intégration à la première occurrence.
+        direction (int): -1 (passage de + à -), 1 (de - à +) ou 0 (les deux).
+        armement (callable, optional): Condition de même signature; l'événement n'est surveillé
+            qu'une fois qu'elle est devenue positive (dès t = 0 si elle l'est déjà).
+    """
+
+    def __init__(self, nom, condition, terminal=False, direction=0, armement=None):
+        self.nom = nom
+        self.condition = condition
+        self.terminal = terminal
+        self.direction = direction
+        self.armement = armement
+
+    def pour_solveur(self):
+        def fonction(t, y, *args):
+            return self.condition(t, y, *args)
+        fonction.terminal = self.terminal
+        fonction.direction = self.direction
+        return fonction
+
+    def armement_pour_solveur(self):
+        # Passage de l'armement au positif: arrête le morceau d'intégration en cours
+        def fonction(t, y, *args):
+            return self.armement(t, y, *args)
+        fonction.terminal = True
+        fonction.direction = 1
+        return fonction
+
+def evenement_pic(terminal=False):
+    # Pic des infectés: I'(t) = sigma * E - (gamma + mu) * I passe de positif à négatif
+    return Evenement('pic', lambda t, y, beta, sigma, gamma, mu: sigma * y[1] - (gamma + mu) * y[2],
+                     terminal=terminal, direction=-1)
+
+def evenement_extinction(seuil=1.0, terminal=True):
+    # Les infectés redescendent sous le seuil, après l'avoir dépassé: avec I0 au seuil et E0 = 0,
+    # la baisse initiale de I, avant le départ de l'épidémie, n'est pas une extinction
+    return Evenement('extinction', lambda t, y, *args: y[2] - seuil, terminal=terminal, direction=-1,
+                     armement=lambda t, y, *args: y[2] - seuil)
+
+def evenement_morts(seuil, terminal=False):
+    # Les morts cumulés dépassent le seuil
+    return Evenement('morts', lambda t, y, *args: y[4] - seuil, terminal=terminal, direction=1)
+
+class TrajectoireSEIR:
+    """
+    Solution continue du modèle SEIR issue d'une seule intégration: la trajectoire peut
+    ensuite être évaluée à n'importe quels instants de [0, t_fin] (heures, semaines, événements...).
+    Si un événement terminal s'est produit, t_fin est l'instant de cet événement.
+    """
+
+    def __init__(self, solution, etat_initial, evenements=()):
+        self.solution = solution
+        self.etat_initial = np.asarray(etat_initial, dtype=float)
+        self.t_fin = solution.t[-1]
+        self.interrompue = solution.status == 1
+        # Occurrences de chaque événement: {nom: [(instant, état [S, E, I, R, D]), ...]}
+        self.evenements = {
+            evenement.nom: [(instant, etat[:5]) for instant, etat in zip(temps, etats)]
+            for evenement, temps, etats in zip(evenements, solution.t_events or (), solution.y_events or ())
+        }
+
+    def _interpoler(self, t):
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        if len(t) and (t.min() < 0 or t.max() > self.t_fin):
+            raise ValueError(f"Instants hors de l'intervalle résolu [0, {self.t_fin}].")
+        return self.solution.sol(t).T if len(t) else np.empty((0, 5 + len(CUMULS)))
+
+    def evaluer(self, t):
+        """
+        Returns:
+            np.ndarray: Tableau (len(t), 5) des compartiments sain, contaminé, infecté, rétabli, mort.
+        """
+        return self._interpoler(t)[:, :5]
+
+    def cumuls(self, t):
+        """
+        Returns:
+            np.ndarray: Tableau (len(t), len(CUMULS)) des nouvelles contaminations et nouvelles
+            infections cumulées depuis t = 0.
+        """
+        return self._interpoler(t)[:, 5:]
+
+    def incidence(self, t):
+        # Nouvelles contaminations et infections sur chaque intervalle ]t[i - 1], t[i]] (depuis 0 pour le premier)
+        return np.diff(self.cumuls(t), axis=0, prepend=0.0)
+
+    def statistiques(self, t):
+        # Même format que simulate_seir: une liste de dictionnaires par instant
+        return [
+            {'sain': S, 'contaminé': E, 'infecté': I, 'rétabli': R, 'mort': D}
+            for S, E, I, R, D in self.evaluer(t)
+        ]
+
+def resoudre_seir(etat_initial, beta, sigma, gamma, mu, t_fin, evenements=(), rtol=RTOL, atol=ATOL):
+    """
+    Intègre le modèle SEIR de 0 à t_fin en conservant la sortie continue du solveur.
+
+    Args:
+        etat_initial (array-like): (S0, E0, I0, R0, D0).
+        beta, sigma, gamma, mu (float): Taux du modèle.
+        t_fin (float): Fin de l'intervalle d'intégration (en jours).
+        evenements (iterable): Événements (Evenement) à localiser; un événement terminal
+            arrête l'intégration. Les occurrences à t = 0 sont ignorées.
+
+    Returns:
+        TrajectoireSEIR: Trajectoire évaluable à tout instant de [0, t_fin].
+    """
+    etat_initial = np.asarray(etat_initial, dtype=float)
+    evenements = tuple(evenements)
+    taux = (beta, sigma, gamma, mu)
+    y = np.concatenate((etat_initial, np.zeros(len(CUMULS))))
+    armes = [evenement.armement is None or evenement.armement(0.0, y, *taux) > 0 for evenement in evenements]
+    occurrences = [([], []) for _ in evenements]
+    debut, fin = 0.0, max(float(t_fin), 1.0)
+    instants, interpolants = [0.0], []
+    # Un morceau d'intégration par armement: l'intégration repart de l'instant où un événement
+    # est armé, comme resoudre_avec_interventions repart à chaque rupture du calendrier
+    while True:
+        surveilles = [i for i, arme in enumerate(armes) if arme]
+        en_attente = [i for i, arme in enumerate(armes) if not arme]
+        morceau = solve_ivp(
+            seir_model_morts, (debut, fin), y, method='LSODA', dense_output=True, rtol=rtol, atol=atol,
+            events=[evenements[i].pour_solveur() for i in surveilles]
+                   + [evenements[i].armement_pour_solveur() for i in en_attente] or None,
+            args=taux
+        )
+        if morceau.status < 0:
+            raise RuntimeError(f"Échec de l'intégration: {morceau.message}")
+        instants.extend(morceau.sol.ts[1:])
+        interpolants.extend(morceau.sol.interpolants)
+        for i, temps, etats in zip(surveilles, morceau.t_events or (), morceau.y_events or ()):
+            garder = temps > 0
+            occurrences[i][0].append(temps[garder])
+            occurrences[i][1].append(np.reshape(etats, (-1, len(y)))[garder])
+        y, debut = morceau.y[:, -1], morceau.t[-1]
+        arrete = any(evenements[i].terminal and len(temps[temps > 0]) for i, temps in zip(surveilles, morceau.t_events or ()))
+        if morceau.status == 0 or arrete:
+            break
+        for i, temps in zip(en_attente, morceau.t_events[len(surveilles):]):
+            armes[i] = armes[i] or len(temps) > 0
+    instants = np.array(instants)
+    solution = SimpleNamespace(
+        t=instants, sol=OdeSolution(instants, interpolants), status=1 if arrete else 0,
+        t_events=[np.concatenate(temps) if temps else np.empty(0) for temps, _ in occurrences],
+        y_events=[np.concatenate(etats) if etats else np.empty((0, len(y))) for _, etats in occurrences]
+    )
+    return TrajectoireSEIR(solution, etat_initial, evenements)
+
+def caracteriser_epidemie(params, seuil_extinction=1.0, seuil_morts=None):
+    """
+    Pic, extinction et franchissement d'un seuil de morts, sans intégrer au-delà de l'extinction.
+
+    Returns:
+        dict: 'jour_pic', 'pic_infectes', 'jour_extinction' (None si les infectés restent au-dessus
+        du seuil sur l'horizon), 'jour_seuil_morts' (None si non atteint ou non demandé) et
+        'jours_integres'.
+    """
+    evenements = [evenement_pic(), evenement_extinction(seuil_extinction)]
+    if seuil_morts is not None:
+        evenements.append(evenement_morts(seuil_morts))
+    trajectoire = resoudre_seir(params.etat_initial, *params.taux, params.nombre_jours - 1, evenements)
+    pics = trajectoire.evenements['pic']
+    if pics:
+        jour_pic, etat_pic = max(pics, key=lambda pic: pic[1][2])
+        pic_infectes = etat_pic[2]
+    else:
+        # Pas de maximum intérieur: les infectés décroissent dès le départ (ou croissent jusqu'à la fin)
+        bornes = trajectoire.solution.sol([0.0, trajectoire.t_fin])[2]
+        jour_pic = 0.0 if bornes[0] >= bornes[1] else trajectoire.t_fin
+        pic_infectes = max(bornes)
+    extinctions = trajectoire.evenements['extinction']
+    morts = trajectoire.evenements.get('morts', [])
+    return {
+        'jour_pic': float(jour_pic),
+        'pic_infectes': float(pic_infectes),
+        'jour_extinction': float(extinctions[0][0]) if extinctions else None,
+        'jour_seuil_morts': float(morts[0][0]) if morts else None,
+        'jours_integres': float(trajectoire.t_fin),
+    }
+
 def simulate_seir(initial_sains, initial_contamines, initial_infectes, initial_retablis, initial_morts,
-                 beta, sigma, gamma, mu, nombre_jours):
+                 beta, sigma, gamma, mu, nombre_jours, interventions=None):
     # Conditions initiales
-    S0 = initial_sains
-    E0 = initial_contamines
-    I0 = initial_infectes
-    R0 = initial_retablis
-    D0 = initial_morts
-    y0 = [S0, E0, I0, R0]
-    
-    # Temps
-    t = np.linspace(0, nombre_jours, nombre_jours)
-    
-    # Résolution des équations différentielles
-    solution = odeint(seir_model, y0, t, args=(beta, sigma, gamma, mu))
-    S, E, I, R = solution.T
+    etat_initial = [initial_sains, initial_contamines, initial_infectes, initial_retablis, initial_morts]
     
-    # Calcul des morts cumulés en intégrant mu * I
-    D = D0 + np.cumsum(mu * I)  # Intégration cumulative
-    
-    # Compilation des résultats
-    statistiques = []
-    for day in range(nombre_jours):
-        etats = {
-            'sain': S[day],
-            'contaminé': E[day],
-            'infecté': I[day],
-            'rétabli': R[day],
-            'mort': D[day]
-        }
-        statistiques.append(etats)
+    # Temps: un point par jour
+    t = grille_temps(nombre_jours)
     
-    return statistiques
+    # Résolution des équations différentielles (éventuellement sous un calendrier
+    # d'interventions, voir simulation.interventions), évaluée sur la grille journalière
+    if interventions is not None:
+        trajectoire = interventions.resoudre(etat_initial, beta, sigma, gamma, mu, t[-1])
+    else:
+        trajectoire = resoudre_seir(etat_initial, beta, sigma, gamma, mu, t[-1])
+    return trajectoire.statistiques(t)
@@ -0,0 +1,188 @@
+# simulation/ensemble.py
+import os
+import time
+
+import numpy as np
+
+# Nombre de pas RK4 par jour pour l'intégration d'ensembles
+PAS_PAR_JOUR = 4
+# Secondes entre deux points de reprise (simulate_ensemble avec point_de_reprise)
+INTERVALLE_POINTS = 60.0
+# Précisions de calcul: 'float32' divise par deux la mémoire et le débit mémoire de l'état
+# intégré des grands ensembles; les morts cumulés restent accumulés et rendus en float64
+PRECISIONS = ('float64', 'float32')
+
+def dtype_trajectoires(precision='float64'):
+    # Un jour d'un scénario: sain, contaminé, infecté, rétabli dans la précision de calcul (24
+    # octets par jour en float32 au lieu de 40) et morts cumulés en float64
+    return np.dtype([('compartiments', precision, (4,)), ('morts', 'f8')])
+
+def colonne(trajectoires, indice):
+    # Vue (k, jours) d'une colonne: 0 à 3 pour sain, contaminé, infecté, rétabli, 4 pour les morts
+    return trajectoires['morts'] if indice == 4 else trajectoires['compartiments'][..., indice]
+
+def tableau_trajectoires(trajectoires):
+    # Copie (k, jours, 5) float64 des trajectoires structurées (conversions exactes)
+    return np.concatenate((trajectoires['compartiments'].astype(float), trajectoires['morts'][..., None]), axis=-1)
+
+# Résumé par scénario du mode réduit (resumer_ensemble)
+RESUME_DTYPE = np.dtype([
+    ('pic_infectes', 'f8'),
+    ('jour_pic', 'f8'),
+    ('taux_attaque', 'f8'),
+    ('morts_finaux', 'f8'),
+    ('jour_reff', 'f8'),  # Premier passage de R effectif sous 1 (NaN si jamais)
+])
+
+def _derivees(S, E, I, R, beta, sigma, gamma, mu):
+    N = S + E + I + R
+    infection = beta * S * I / N
+    return (-infection, infection - sigma * E, sigma * E - (gamma + mu) * I, gamma * I, mu * I)
+
+def _pas_rk4(etat, beta, sigma, gamma, mu, h):
+    S, E, I, R, D = etat
+    k1 = _derivees(S, E, I, R, beta, sigma, gamma, mu)
+    k2 = _derivees(*(x + 0.5 * h * k for x, k in zip(etat[:4], k1)), beta, sigma, gamma, mu)
+    k3 = _derivees(*(x + 0.5 * h * k for x, k in zip(etat[:4], k2)), beta, sigma, gamma, mu)
+    k4 = _derivees(*(x + h * k for x, k in zip(etat[:4], k3)), beta, sigma, gamma, mu)
+    return [x + h / 6 * (a + 2 * b + 2 * c + d) for x, a, b, c, d in zip(etat, k1, k2, k3, k4)]
+
+def _preparer(etat_initial, beta, sigma, gamma, mu, precision='float64'):
+    if precision not in PRECISIONS:
+        raise ValueError(f"Précision inconnue: {precision} (attendu: {', '.join(PRECISIONS)}).")
+    taux = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=precision)) for x in (beta, sigma, gamma, mu)))
+    k = taux[0].shape[0]
+    etat = np.broadcast_to(np.asarray(etat_initial, dtype=float), (k, 5)).T
+    # S, E, I, R dans la précision demandée; D, somme de petits incréments, toujours en float64
+    return [x.astype(precision) for x in etat[:4]] + [etat[4].copy()], taux
+
+def _enregistrer(trajectoires, jour, etat):
+    trajectoires['compartiments'][:, jour] = np.column_stack(etat[:4])
+    trajectoires['morts'][:, jour] = etat[4]
+
+def _integrer(etat, taux, nombre_jours, pas_par_jour, premier_pas=1):
+    # Avance l'ensemble jusqu'au jour nombre_jours - 1 et rend (t, état) après chaque pas
+    h = 1.0 / pas_par_jour
+    for pas in range(premier_pas, (nombre_jours - 1) * pas_par_jour + 1):
+        etat = _pas_rk4(etat, *taux, h)
+        yield pas * h, etat
+
+def simulate_ensemble(etat_initial, beta, sigma, gamma, mu, nombre_jours, pas_par_jour=PAS_PAR_JOUR,
+                      point_de_reprise=None, intervalle_points=INTERVALLE_POINTS, precision='float64'):
+    """
+    Intègre le modèle SEIR pour un ensemble de scénarios avec un schéma RK4 à pas fixe,
+    tous les scénarios avançant ensemble dans des opérations NumPy vectorisées.
+
+    Args:
+        etat_initial (array-like): (S0, E0, I0, R0, D0), de forme (5,) ou (k, 5).
+        beta, sigma, gamma, mu (array-like): Taux, scalaires ou de forme (k,).
+        nombre_jours (int): Nombre de jours de sortie (jours 0 à nombre_jours - 1).
+        pas_par_jour (int): Nombre de pas RK4 par jour.
+        point_de_reprise (str, optional): Fichier de reprise (voir simulation.checkpoint). S'il
+            existe, l'intégration repart de l'état enregistré; il est réécrit toutes les
+            `intervalle_points` secondes avec l'état courant, les jours calculés depuis le point
+            précédent étant ajoutés au fichier de segments voisin, et les deux sont supprimés à la
+            fin. Le résultat est identique bit à bit à celui d'une exécution sans interruption.
+        precision (str): 'float64' ou 'float32' (calcul de S, E, I, R, voir PRECISIONS).
+
+    Returns:
+        np.ndarray: Tableau structuré (k, nombre_jours) de type dtype_trajectoires(precision):
+        'compartiments' (sain, contaminé, infecté, rétabli) dans la précision de calcul et 'morts'
+        en float64. Voir colonne et tableau_trajectoires.
+    """
+    etat, taux = _preparer(etat_initial, beta, sigma, gamma, mu, precision)
+    trajectoires = np.empty((len(etat[0]), nombre_jours), dtype=dtype_trajectoires(precision))
+    _enregistrer(trajectoires, 0, etat)
+    jour = 0
+    if point_de_reprise is not None:
+        from .checkpoint import ajouter_segment, charger_point, chemin_segments, lire_segments, sauvegarder_point
+        segments = chemin_segments(point_de_reprise)
+        entrees = {'etat_initial': np.column_stack(etat), 'taux': np.array(taux)}
+        meta = {'nombre_jours': int(nombre_jours), 'pas_par_jour': int(pas_par_jour), 'precision': precision,
+                'trajectoires': 'segments'}
+        # Fin (exclue) des jours de chaque segment enregistré
+        fins = []
+        if os.path.exists(point_de_reprise):
+            point = charger_point(point_de_reprise)
+            enregistre = point['tableaux']
+            if point['meta'] != meta or any(not np.array_equal(enregistre[nom], valeur) for nom, valeur in entrees.items()):
+                raise ValueError(f"Le point de reprise {point_de_reprise} ne correspond pas à cet ensemble.")
+            jour = point['jour']
+            fins = enregistre['segments'].tolist()
+            k = len(trajectoires)
+            donnees = lire_segments(segments, trajectoires.dtype, k * fins[-1])
+            for debut, fin in zip([0] + fins, fins):
+                trajectoires[:, debut:fin] = donnees[k * debut:k * fin].reshape(k, fin - debut)
+            # Conversions exactes: l'état enregistré en float64 redonne les mêmes valeurs float32
+            etat = [x.astype(precision) for x in enregistre['etat'][:4]] + [enregistre['etat'][4]]
+        else:
+            # Segments d'une exécution interrompue avant son premier point
+            open(segments, 'wb').close()
+        dernier_point = time.monotonic()
+    premier_pas = jour * pas_par_jour + 1
+    for pas, (_, etat) in enumerate(_integrer(etat, taux, nombre_jours, pas_par_jour, premier_pas), start=premier_pas):
+        if pas % pas_par_jour == 0:
+            jour = pas // pas_par_jour
+            _enregistrer(trajectoires, jour, etat)
+            if point_de_reprise is not None and time.monotonic() - dernier_point >= intervalle_points:
+                ajouter_segment(segments, trajectoires[:, fins[-1] if fins else 0:jour + 1])
+                fins.append(jour + 1)
+                sauvegarder_point(point_de_reprise, jour, {
+                    **entrees, 'etat': np.array(etat), 'segments': np.array(fins)
+                }, meta=meta)
+                dernier_point = time.monotonic()
+    if point_de_reprise is not None:
+        for chemin in (point_de_reprise, segments):
+            if os.path.exists(chemin):
+                os.remove(chemin)
+    return trajectoires
+
+def resumer_ensemble(etat_initial, beta, sigma, gamma, mu, nombre_jours, pas_par_jour=PAS_PAR_JOUR, precision='float64'):
+    """
+    Mode réduit de simulate_ensemble: les statistiques résumées sont calculées au fil de
+    l'intégration, sans jamais conserver les trajectoires (mémoire O(1) par scénario).
+
+    Returns:
+        np.ndarray: Tableau structuré (k,) de type RESUME_DTYPE.
+    """
+    etat, taux = _preparer(etat_initial, beta, sigma, gamma, mu, precision)
+    beta, _, gamma, mu = taux
+    population = sum(etat[:4]) + etat[4]
+    sains_initiaux = etat[0].copy()
+    resume = np.empty(len(etat[0]), dtype=RESUME_DTYPE)
+    pic = etat[2].copy()
+    jour_pic = np.zeros_like(pic)
+    jour_reff = np.full_like(pic, np.nan)
+    retablissement = np.where(gamma + mu > 0, gamma + mu, np.inf)
+
+    def reff(S, E, I, R):
+        return beta / retablissement * S / (S + E + I + R)
+
+    reff_precedent = reff(*etat[:4])
+    # Déjà sous 1 au départ: le passage a lieu au jour 0
+    jour_reff[reff_precedent < 1] = 0.0
+    t_precedent = 0.0
+    for t, etat in _integrer(etat, taux, nombre_jours, pas_par_jour):
+        S, E, I, R, _ = etat
+        plus_haut = I > pic
+        pic = np.where(plus_haut, I, pic)
+        jour_pic = np.where(plus_haut, t, jour_pic)
+        # Passage de R effectif sous 1, interpolé linéairement dans le pas
+        reff_courant = reff(S, E, I, R)
+        passage = np.isnan(jour_reff) & (reff_precedent >= 1) & (reff_courant < 1)
+        if passage.any():
+            fraction = (reff_precedent[passage] - 1) / (reff_precedent[passage] - reff_courant[passage])
+            jour_reff[passage] = t_precedent + fraction * (t - t_precedent)
+        reff_precedent = reff_courant
+        t_precedent = t
+    resume['pic_infectes'] = pic
+    resume['jour_pic'] = jour_pic
+    resume['taux_attaque'] = (sains_initiaux - etat[0]) / population
+    resume['morts_finaux'] = etat[4]
+    resume['jour_reff'] = jour_reff
+    return resume
+
+def resumer_seir(params, pas_par_jour=PAS_PAR_JOUR):
+    # Résumé d'un seul virus (VirusParams) sous forme de dictionnaire
+    resume = resumer_ensemble(params.etat_initial, *params.taux, params.nombre_jours, pas_par_jour)[0]
+    return {nom: float(resume[nom]) for nom in RESUME_DTYPE.names}
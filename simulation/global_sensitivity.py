@@ -0,0 +1,196 @@
+# simulation/global_sensitivity.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.stats import qmc
+
+from .ensemble import resumer_ensemble
+
+# Paramètres du virus étudiés et plages par défaut
+PLAGES_PAR_DEFAUT = {
+    'prob_contamination': (0.05, 0.5),
+    'duree_incubation': (1.0, 14.0),
+    'duree_infection': (2.0, 21.0),
+    'taux_mortalite': (0.0, 0.1),
+}
+SORTIES = ('pic_infectes', 'morts_finaux')
+
+# Nombre de scénarios intégrés ensemble par lot
+TAILLE_LOT = 50000
+
+def _sorties_lot(etat_initial, X, nombre_jours):
+    # X: colonnes prob_contamination, duree_incubation, duree_infection, taux_mortalite
+    resume = resumer_ensemble(etat_initial, X[:, 0], 1 / X[:, 1], 1 / X[:, 2], X[:, 3], nombre_jours)
+    return np.column_stack((resume['pic_infectes'], resume['morts_finaux']))
+
+def _sorties_tache(arguments):
+    return _sorties_lot(*arguments)
+
+def evaluer(params, X, noms=tuple(PLAGES_PAR_DEFAUT), n_jobs=None, taille_lot=TAILLE_LOT):
+    """
+    Évalue le pic d'infectés et les morts totaux pour chaque ligne de X.
+
+    Args:
+        params (VirusParams): Virus de référence (conditions initiales, horizon, paramètres non échantillonnés).
+        X (np.ndarray): Échantillon (n, len(noms)) des paramètres étudiés.
+        noms (tuple): Noms des paramètres correspondant aux colonnes de X.
+        n_jobs (int, optional): Nombre de processus (1 pour rester dans le processus courant).
+        taille_lot (int): Nombre de scénarios intégrés ensemble.
+
+    Returns:
+        dict: {sortie: np.ndarray (n,)} pour chaque sortie de SORTIES.
+    """
+    X = np.asarray(X, dtype=float)
+    complet = np.empty((len(X), len(PLAGES_PAR_DEFAUT)))
+    for j, nom in enumerate(PLAGES_PAR_DEFAUT):
+        complet[:, j] = X[:, noms.index(nom)] if nom in noms else getattr(params, nom)
+    taches = [(params.etat_initial, complet[debut:debut + taille_lot], params.nombre_jours)
+              for debut in range(0, len(X), taille_lot)]
+    if len(taches) > 1 and n_jobs != 1:
+        with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count()) as executor:
+            resultats = list(executor.map(_sorties_tache, taches))
+    else:
+        resultats = [_sorties_tache(tache) for tache in taches]
+    Y = np.concatenate(resultats) if resultats else np.empty((0, len(SORTIES)))
+    return dict(zip(SORTIES, Y.T))
+
+def _plages(plages):
+    plages = dict(plages or PLAGES_PAR_DEFAUT)
+    inconnus = set(plages) - set(PLAGES_PAR_DEFAUT)
+    if inconnus:
+        raise ValueError(f"Paramètres inconnus: {', '.join(sorted(inconnus))}")
+    return tuple(plages), np.array(list(plages.values()), dtype=float)
+
+def echantillons_saltelli(plages, n, graine=None):
+    """
+    Plan de Saltelli à partir d'une suite de Sobol: matrices A, B et A_B^i (colonne i de B).
+
+    Returns:
+        tuple: (A, B, AB) de formes (n, d), (n, d) et (d, n, d).
+    """
+    bornes = np.asarray(plages, dtype=float)
+    d = len(bornes)
+    base = qmc.scale(qmc.Sobol(d=2 * d, seed=graine).random(n), np.tile(bornes[:, 0], 2), np.tile(bornes[:, 1], 2))
+    A, B = base[:, :d], base[:, d:]
+    AB = np.repeat(A[None, :, :], d, axis=0)
+    for i in range(d):
+        AB[i, :, i] = B[:, i]
+    return A, B, AB
+
+def indices_sobol(yA, yB, yAB, n_boot=200, confiance=0.95, graine=None):
+    """
+    Indices de premier ordre (estimateur de Saltelli 2010) et totaux (estimateur de Jansen),
+    avec intervalles de confiance par bootstrap.
+
+    Returns:
+        dict: 'S1', 'ST' (d,) et 'S1_ic', 'ST_ic' (d, 2).
+    """
+    def estimer(a, b, ab):
+        variance = np.var(np.concatenate((a, b), axis=-1), axis=-1)
+        variance = np.where(variance > 0, variance, np.nan)
+        s1 = np.mean(b[..., None, :] * (ab - a[..., None, :]), axis=-1) / variance[..., None]
+        st = 0.5 * np.mean((a[..., None, :] - ab) ** 2, axis=-1) / variance[..., None]
+        return s1, st
+
+    s1, st = estimer(yA, yB, yAB)
+    n = len(yA)
+    rng = np.random.default_rng(graine)
+    # Réplicats bootstrap traités par paquets pour borner la mémoire
+    paquet = max(1, TAILLE_LOT * 20 // max(n * (len(yAB) + 2), 1))
+    s1_boot, st_boot = [], []
+    for debut in range(0, n_boot, paquet):
+        tirages = rng.integers(0, n, size=(min(paquet, n_boot - debut), n))
+        s1_b, st_b = estimer(yA[tirages], yB[tirages], np.moveaxis(yAB[:, tirages], 0, 1))
+        s1_boot.append(s1_b)
+        st_boot.append(st_b)
+    s1_boot = np.concatenate(s1_boot)
+    st_boot = np.concatenate(st_boot)
+    alpha = (1 - confiance) / 2
+    quantiles = (alpha, 1 - alpha)
+    return {
+        'S1': s1,
+        'ST': st,
+        'S1_ic': np.nanquantile(s1_boot, quantiles, axis=0).T,
+        'ST_ic': np.nanquantile(st_boot, quantiles, axis=0).T,
+    }
+
+def analyse_sobol(params, plages=None, n=4096, n_boot=200, confiance=0.95, n_jobs=None, graine=None):
+    """
+    Analyse de sensibilité globale de Sobol sur le pic d'infectés et les morts totaux.
+    Le plan de Saltelli demande n * (d + 2) évaluations du modèle.
+
+    Returns:
+        dict: {sortie: {paramètre: {'S1', 'S1_ic', 'ST', 'ST_ic'}}}.
+    """
+    noms, bornes = _plages(plages)
+    d = len(noms)
+    A, B, AB = echantillons_saltelli(bornes, n, graine)
+    Y = evaluer(params, np.concatenate((A, B, AB.reshape(d * n, d))), noms, n_jobs)
+    rapport = {}
+    for sortie, y in Y.items():
+        indices = indices_sobol(y[:n], y[n:2 * n], y[2 * n:].reshape(d, n), n_boot, confiance, graine)
+        rapport[sortie] = {
+            nom: {cle: (tuple(float(v) for v in valeur[i]) if valeur.ndim == 2 else float(valeur[i]))
+                  for cle, valeur in indices.items()}
+            for i, nom in enumerate(noms)
+        }
+    return rapport
+
+def echantillons_morris(plages, r, niveaux=4, graine=None):
+    """
+    Trajectoires de Morris: r trajectoires de d + 1 points sur une grille à `niveaux` niveaux.
+
+    Returns:
+        tuple: (X de forme (r * (d + 1), d) dans les plages, ordre de déplacement des paramètres (r, d),
+        pas signés (r, d) en unités de plage).
+    """
+    bornes = np.asarray(plages, dtype=float)
+    d = len(bornes)
+    rng = np.random.default_rng(graine)
+    delta = niveaux / (2 * (niveaux - 1))
+    grille = np.arange(niveaux // 2) / (niveaux - 1)
+    depart = rng.choice(grille, size=(r, d))
+    signes = rng.choice((-1.0, 1.0), size=(r, d))
+    # Départ décalé pour que chaque pas reste dans [0, 1]
+    depart = np.where(signes < 0, depart + delta, depart)
+    ordre = np.argsort(rng.random((r, d)), axis=1)
+    unitaire = np.empty((r, d + 1, d))
+    unitaire[:, 0] = depart
+    for etape in range(d):
+        unitaire[:, etape + 1] = unitaire[:, etape]
+        colonne = ordre[:, etape]
+        unitaire[np.arange(r), etape + 1, colonne] += signes[np.arange(r), colonne] * delta
+    X = bornes[:, 0] + unitaire * (bornes[:, 1] - bornes[:, 0])
+    return X.reshape(r * (d + 1), d), ordre, signes * delta
+
+def analyse_morris(params, plages=None, r=100, niveaux=4, n_boot=200, confiance=0.95, n_jobs=None, graine=None):
+    """
+    Criblage de Morris: effets élémentaires moyens absolus (mu*) et écarts-types (sigma),
+    avec intervalle de confiance par bootstrap sur mu*.
+
+    Returns:
+        dict: {sortie: {paramètre: {'mu_etoile', 'mu_etoile_ic', 'sigma'}}}.
+    """
+    noms, bornes = _plages(plages)
+    d = len(noms)
+    X, ordre, deltas = echantillons_morris(bornes, r, niveaux, graine)
+    Y = evaluer(params, X, noms, n_jobs)
+    rng = np.random.default_rng(graine)
+    tirages = rng.integers(0, r, size=(n_boot, r))
+    alpha = (1 - confiance) / 2
+    rapport = {}
+    for sortie, y in Y.items():
+        y = y.reshape(r, d + 1)
+        effets = np.empty((r, d))
+        # L'étape e de la trajectoire déplace le paramètre ordre[:, e]
+        effets[np.arange(r)[:, None], ordre] = np.diff(y, axis=1) / np.take_along_axis(deltas, ordre, axis=1)
+        mu_etoile = np.abs(effets).mean(axis=0)
+        mu_boot = np.abs(effets[tirages]).mean(axis=1)
+        ic = np.quantile(mu_boot, (alpha, 1 - alpha), axis=0).T
+        ecart = effets.std(axis=0, ddof=1) if r > 1 else np.zeros(d)
+        rapport[sortie] = {
+            nom: {'mu_etoile': float(mu_etoile[i]), 'mu_etoile_ic': tuple(float(v) for v in ic[i]), 'sigma': float(ecart[i])}
+            for i, nom in enumerate(noms)
+        }
+    return rapport
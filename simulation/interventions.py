@@ -0,0 +1,140 @@
+# simulation/interventions.py
+from types import SimpleNamespace
+
+import numpy as np
+from scipy.integrate import OdeSolution, solve_ivp
+
+from .differential_equations import ATOL, CUMULS, RTOL, TrajectoireSEIR
+
+# Grandeurs pilotées par le calendrier: multiplicateur de beta, taux de vaccination (S -> R)
+# et taux de perte d'immunité (R -> S)
+CONTROLES = ('facteur_beta', 'vaccination', 'perte_immunite')
+
+def seir_model_interventions(t, y, beta, sigma, gamma, mu, debut, facteur, pente_facteur,
+                             nu, pente_nu, omega, pente_omega):
+    # Second membre sur un intervalle du calendrier: chaque contrôle y vaut a + b * (t - debut),
+    # les coefficients étant précalculés, sans aucun test à l'exécution. Les compteurs CUMULS
+    # suivent l'état comme dans seir_model_morts
+    S, E, I, R = y[:4]
+    N = S + E + I + R
+    dt = t - debut
+    infection = beta * (facteur + pente_facteur * dt) * S * I / N
+    incubation = sigma * E
+    vaccination = (nu + pente_nu * dt) * S
+    perte = (omega + pente_omega * dt) * R
+    return [-infection - vaccination + perte, infection - incubation, incubation - (gamma + mu) * I,
+            gamma * I + vaccination - perte, mu * I, infection, incubation]
+
+class PlanInterventions:
+    """
+    Calendrier d'interventions: confinements (multiplicateur de beta), campagnes de vaccination
+    et perte d'immunité. Chaque contrôle est défini par des nœuds (temps, valeur), constants
+    par morceaux ('constant') ou interpolés linéairement entre nœuds ('lineaire').
+
+    Args:
+        vaccination (float): Taux de vaccination de base (par jour).
+        perte_immunite (float): Taux de perte d'immunité de base (par jour).
+        interpolation (str): 'constant' ou 'lineaire'.
+    """
+
+    def __init__(self, vaccination=0.0, perte_immunite=0.0, interpolation='constant'):
+        if interpolation not in ('constant', 'lineaire'):
+            raise ValueError(f"Interpolation inconnue: {interpolation}")
+        self.interpolation = interpolation
+        self.noeuds = {
+            'facteur_beta': {0.0: 1.0},
+            'vaccination': {0.0: float(vaccination)},
+            'perte_immunite': {0.0: float(perte_immunite)},
+        }
+
+    @classmethod
+    def depuis_virus(cls, params, interpolation='constant'):
+        # Vaccination et perte d'immunité constantes, tirées de prob_vaccination et duree_immunite
+        return cls(vaccination=params.nu, perte_immunite=params.omega, interpolation=interpolation)
+
+    def definir(self, controle, temps, valeurs):
+        if controle not in CONTROLES:
+            raise ValueError(f"Contrôle inconnu: {controle}")
+        for t, valeur in zip(temps, valeurs):
+            if t < 0 or valeur < 0:
+                raise ValueError("Les instants et les valeurs d'un calendrier doivent être positifs.")
+            self.noeuds[controle][float(t)] = float(valeur)
+        return self
+
+    def _segment(self, controle, debut, fin, valeur):
+        # Valeur appliquée sur [debut, fin), retour à la valeur qui prévalait en fin ensuite
+        if fin <= debut:
+            raise ValueError("La fin d'une intervention doit suivre son début.")
+        noeuds = self.noeuds[controle]
+        temps = sorted(noeuds)
+        apres = noeuds[temps[np.searchsorted(temps, fin, side='right') - 1]]
+        for t in temps:
+            if debut < t < fin:
+                del noeuds[t]
+        return self.definir(controle, (debut, fin), (valeur, apres))
+
+    def confinement(self, debut, fin, facteur):
+        return self._segment('facteur_beta', debut, fin, facteur)
+
+    def campagne_vaccination(self, debut, fin, taux):
+        return self._segment('vaccination', debut, fin, taux)
+
+    def perte_immunite(self, debut, fin, duree_immunite):
+        return self._segment('perte_immunite', debut, fin, 1 / duree_immunite)
+
+    def compiler(self, t_fin):
+        """
+        Compile le calendrier sur [0, t_fin] en tables de coefficients par intervalle.
+
+        Returns:
+            tuple: (bornes (k + 1,), coefficients (k, 6)) où, sur [bornes[i], bornes[i + 1]],
+            chaque contrôle vaut coefficients[i, 2c] + coefficients[i, 2c + 1] * (t - bornes[i]).
+        """
+        ruptures = set()
+        for noeuds in self.noeuds.values():
+            ruptures.update(t for t in noeuds if 0 < t < t_fin)
+        bornes = np.array(sorted(ruptures | {0.0, float(t_fin)}))
+        debuts, fins = bornes[:-1], bornes[1:]
+        coefficients = np.zeros((len(debuts), 2 * len(CONTROLES)))
+        for c, controle in enumerate(CONTROLES):
+            temps = np.array(sorted(self.noeuds[controle]))
+            valeurs = np.array([self.noeuds[controle][t] for t in temps])
+            if self.interpolation == 'constant':
+                coefficients[:, 2 * c] = valeurs[np.searchsorted(temps, debuts, side='right') - 1]
+            else:
+                gauche = np.interp(debuts, temps, valeurs)
+                droite = np.interp(fins, temps, valeurs)
+                coefficients[:, 2 * c] = gauche
+                coefficients[:, 2 * c + 1] = (droite - gauche) / (fins - debuts)
+        return bornes, coefficients
+
+    def resoudre(self, etat_initial, beta, sigma, gamma, mu, t_fin):
+        return resoudre_avec_interventions(etat_initial, beta, sigma, gamma, mu, t_fin, self)
+
+def resoudre_avec_interventions(etat_initial, beta, sigma, gamma, mu, t_fin, plan, rtol=RTOL, atol=ATOL):
+    """
+    Intègre le modèle sous un calendrier d'interventions. L'intégration est relancée à chaque
+    rupture du calendrier, pour que le solveur ne franchisse jamais une discontinuité.
+
+    Returns:
+        TrajectoireSEIR: Trajectoire continue sur [0, t_fin].
+    """
+    etat_initial = np.asarray(etat_initial, dtype=float)
+    bornes, coefficients = plan.compiler(max(float(t_fin), 1.0))
+    y = np.concatenate((etat_initial, np.zeros(len(CUMULS))))
+    instants, interpolants = [0.0], []
+    for debut, fin, coef in zip(bornes[:-1], bornes[1:], coefficients):
+        morceau = solve_ivp(
+            seir_model_interventions, (debut, fin), y, method='LSODA', dense_output=True,
+            rtol=rtol, atol=atol, args=(beta, sigma, gamma, mu, debut, *coef)
+        )
+        if morceau.status < 0:
+            raise RuntimeError(f"Échec de l'intégration: {morceau.message}")
+        instants.extend(morceau.sol.ts[1:])
+        interpolants.extend(morceau.sol.interpolants)
+        y = morceau.y[:, -1]
+    instants = np.array(instants)
+    solution = SimpleNamespace(
+        t=instants, sol=OdeSolution(instants, interpolants), status=0, t_events=None, y_events=None
+    )
+    return TrajectoireSEIR(solution, etat_initial)
@@ -0,0 +1,326 @@
+# simulation/model_compiler.py
+import ast
+import hashlib
+import json
+import linecache
+
+import numpy as np
+
+from .models import COMPARTIMENTS_VIRUS
+
+# Fonctions autorisées dans les expressions de débit
+FONCTIONS = {'exp': 'np.exp', 'log': 'np.log', 'sqrt': 'np.sqrt', 'cos': 'np.cos', 'sin': 'np.sin'}
+# Noms réservés: population vivante et temps
+RESERVES = ('N', 't')
+
+# Modèles compilés, par (empreinte de la spécification, backend)
+_CACHE = {}
+
+def empreinte(spec):
+    # Empreinte de la spécification sous forme canonique
+    canonique = json.dumps(spec, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonique.encode('utf-8')).hexdigest()
+
+def _constante(valeur):
+    return ast.Constant(value=valeur)
+
+def _est(noeud, valeur):
+    return isinstance(noeud, ast.Constant) and noeud.value == valeur
+
+def _neg(a):
+    if a is None:
+        return None
+    return ast.UnaryOp(op=ast.USub(), operand=a)
+
+def _somme(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return ast.BinOp(left=a, op=ast.Add(), right=b)
+
+def _difference(a, b):
+    if b is None:
+        return a
+    if a is None:
+        return _neg(b)
+    return ast.BinOp(left=a, op=ast.Sub(), right=b)
+
+def _produit(a, b):
+    if a is None or b is None:
+        return None
+    if _est(a, 1):
+        return b
+    if _est(b, 1):
+        return a
+    return ast.BinOp(left=a, op=ast.Mult(), right=b)
+
+def _quotient(a, b):
+    if a is None:
+        return None
+    return ast.BinOp(left=a, op=ast.Div(), right=b)
+
+def _deriver(noeud, variable, dans_population):
+    """
+    Dérivée symbolique d'une expression (AST) par rapport à un compartiment.
+    None représente une dérivée identiquement nulle.
+
+    Args:
+        noeud (ast.AST): Expression.
+        variable (str): Compartiment par rapport auquel dériver.
+        dans_population (bool): Si le compartiment compte dans N (dN/dvariable = 1).
+    """
+    if isinstance(noeud, ast.Constant):
+        return None
+    if isinstance(noeud, ast.Name):
+        if noeud.id == variable or (noeud.id == 'N' and dans_population):
+            return _constante(1)
+        return None
+    if isinstance(noeud, ast.UnaryOp):
+        d = _deriver(noeud.operand, variable, dans_population)
+        return d if isinstance(noeud.op, ast.UAdd) else _neg(d)
+    if isinstance(noeud, ast.BinOp):
+        u, v = noeud.left, noeud.right
+        du = _deriver(u, variable, dans_population)
+        dv = _deriver(v, variable, dans_population)
+        if isinstance(noeud.op, ast.Add):
+            return _somme(du, dv)
+        if isinstance(noeud.op, ast.Sub):
+            return _difference(du, dv)
+        if isinstance(noeud.op, ast.Mult):
+            return _somme(_produit(du, v), _produit(u, dv))
+        if isinstance(noeud.op, ast.Div):
+            return _difference(_quotient(du, v), _quotient(_produit(u, dv), ast.BinOp(left=v, op=ast.Mult(), right=v)))
+        if isinstance(noeud.op, ast.Pow):
+            if dv is not None:
+                raise ValueError("Exposant dépendant de l'état non pris en charge.")
+            exposant = ast.BinOp(left=v, op=ast.Sub(), right=_constante(1))
+            return _produit(_produit(v, ast.BinOp(left=u, op=ast.Pow(), right=exposant)), du)
+    if isinstance(noeud, ast.Call):
+        u = noeud.args[0]
+        du = _deriver(u, variable, dans_population)
+        nom = noeud.func.id
+        if nom == 'exp':
+            return _produit(noeud, du)
+        if nom == 'log':
+            return _quotient(du, u)
+        if nom == 'sqrt':
+            return _quotient(du, ast.BinOp(left=_constante(2), op=ast.Mult(), right=noeud))
+        if nom == 'cos':
+            return _neg(_produit(ast.Call(func=ast.Name(id='sin', ctx=ast.Load()), args=[u], keywords=[]), du))
+        if nom == 'sin':
+            return _produit(ast.Call(func=ast.Name(id='cos', ctx=ast.Load()), args=[u], keywords=[]), du)
+    raise ValueError(f"Expression non prise en charge: {ast.unparse(noeud)}")
+
+class _Renommage(ast.NodeTransformer):
+    # Remplace les noms de la spécification par les variables locales du code généré
+    def __init__(self, noms):
+        self.noms = noms
+
+    def visit_Name(self, noeud):
+        return ast.copy_location(ast.Name(id=self.noms[noeud.id], ctx=ast.Load()), noeud)
+
+    def visit_Call(self, noeud):
+        noeud.args = [self.visit(arg) for arg in noeud.args]
+        noeud.func = ast.copy_location(ast.parse(FONCTIONS[noeud.func.id], mode='eval').body, noeud.func)
+        return noeud
+
+def _analyser(expression, compartiments):
+    # Analyse une expression de débit et en extrait les paramètres
+    try:
+        arbre = ast.parse(str(expression), mode='eval').body
+    except SyntaxError as e:
+        raise ValueError(f"Expression de débit invalide: {expression}") from e
+    parametres = []
+    # Noms en position d'appel: seuls ceux-ci peuvent désigner une fonction de FONCTIONS
+    appels = {id(noeud.func) for noeud in ast.walk(arbre) if isinstance(noeud, ast.Call)}
+    for noeud in ast.walk(arbre):
+        if isinstance(noeud, ast.Call):
+            if not isinstance(noeud.func, ast.Name) or noeud.func.id not in FONCTIONS or len(noeud.args) != 1 or noeud.keywords:
+                raise ValueError(f"Fonction non autorisée dans: {expression}")
+        elif isinstance(noeud, ast.BinOp):
+            if not isinstance(noeud.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow)):
+                raise ValueError(f"Opérateur non autorisé dans: {expression}")
+        elif isinstance(noeud, ast.UnaryOp):
+            if not isinstance(noeud.op, (ast.UAdd, ast.USub)):
+                raise ValueError(f"Opérateur non autorisé dans: {expression}")
+        elif isinstance(noeud, ast.Constant):
+            if not isinstance(noeud.value, (int, float)):
+                raise ValueError(f"Constante non numérique dans: {expression}")
+        elif isinstance(noeud, ast.Name):
+            if id(noeud) in appels or noeud.id in compartiments or noeud.id in RESERVES:
+                continue
+            if noeud.id in FONCTIONS:
+                raise ValueError(f"Fonction {noeud.id} utilisée comme variable dans: {expression}")
+            parametres.append(noeud.id)
+        elif not isinstance(noeud, (ast.Load, ast.operator, ast.unaryop, ast.expr_context)):
+            raise ValueError(f"Construction non autorisée dans: {expression}")
+    return arbre, parametres
+
+def _bilan(termes):
+    # Somme signée de termes ('+ f0', '- f1', ...) sous forme de code
+    if not termes:
+        return '0.0'
+    code = ' '.join(termes)
+    return code[2:] if code.startswith('+ ') else '-' + code[2:]
+
+def _generer(spec):
+    # Génère le code source du second membre et du jacobien
+    compartiments = tuple(spec['compartiments'])
+    if len(set(compartiments)) != len(compartiments) or set(compartiments) & set(RESERVES):
+        raise ValueError("Noms de compartiments dupliqués ou réservés.")
+    hors_population = set(spec.get('hors_population', ()))
+    index = {c: i for i, c in enumerate(compartiments)}
+    flux, parametres = [], list(spec.get('parametres', {}))
+    for f in spec['flux']:
+        for cle in ('de', 'vers'):
+            if f.get(cle) is not None and f[cle] not in index:
+                raise ValueError(f"Compartiment inconnu: {f[cle]}")
+        arbre, noms = _analyser(f['debit'], index)
+        parametres.extend(n for n in noms if n not in parametres)
+        flux.append((index.get(f.get('de')), index.get(f.get('vers')), arbre))
+
+    noms = {c: f"x{i}" for i, c in enumerate(compartiments)}
+    noms.update({p: f"k{i}" for i, p in enumerate(parametres)})
+    noms.update({'N': 'N', 't': 't'})
+    renommage = _Renommage(noms)
+
+    def code(arbre):
+        return ast.unparse(renommage.visit(ast.parse(ast.unparse(arbre), mode='eval').body))
+
+    entete = [f"    x{i} = y[{i}]" for i in range(len(compartiments))]
+    entete += [f"    k{i} = p[{i}]" for i in range(len(parametres))]
+    vivants = [f"x{i}" for i, c in enumerate(compartiments) if c not in hors_population]
+    entete.append(f"    N = {' + '.join(vivants) or '0.0'}")
+
+    # Second membre: débits puis bilans par compartiment
+    lignes = ["def second_membre(t, y, p):"] + entete
+    lignes += [f"    f{j} = {code(arbre)}" for j, (_, _, arbre) in enumerate(flux)]
+    lignes.append("    dy = np.empty_like(y)")
+    for i in range(len(compartiments)):
+        termes = [f"- f{j}" for j, (de, _, _) in enumerate(flux) if de == i]
+        termes += [f"+ f{j}" for j, (_, vers, _) in enumerate(flux) if vers == i]
+        lignes.append(f"    dy[{i}] = {_bilan(termes)}")
+    lignes.append("    return dy")
+
+    # Jacobien: d(dy_i)/dx_k = somme des ±dfj/dx_k, seules les entrées non nulles sont écrites
+    lignes += ["", "def jacobien(t, y, p):"] + entete
+    lignes.append(f"    J = np.zeros(({len(compartiments)}, {len(compartiments)}))")
+    for k, c in enumerate(compartiments):
+        derivees = {}
+        for j, (de, vers, arbre) in enumerate(flux):
+            d = _deriver(arbre, c, c not in hors_population)
+            if d is not None:
+                derivees[j] = code(d)
+                lignes.append(f"    d{j}_{k} = {derivees[j]}")
+        for i in range(len(compartiments)):
+            termes = [f"- d{j}_{k}" for j in derivees if flux[j][0] == i]
+            termes += [f"+ d{j}_{k}" for j in derivees if flux[j][1] == i]
+            if termes:
+                lignes.append(f"    J[{i}, {k}] = {_bilan(termes)}")
+    lignes.append("    return J")
+    return compartiments, tuple(parametres), "\n".join(lignes) + "\n"
+
+class ModeleCompile:
+    """
+    Modèle compartimental compilé depuis une spécification déclarative:
+
+        {
+            "nom": "SEIRS",
+            "compartiments": ["sain", "contaminé", "infecté", "rétabli", "mort"],
+            "hors_population": ["mort"],
+            "parametres": {"omega": 0.03},
+            "flux": [{"de": "sain", "vers": "contaminé", "debit": "beta * sain * infecté / N"}, ...]
+        }
+
+    Les débits sont des expressions arithmétiques (+, -, *, /, **, exp, log, sqrt, cos, sin) des
+    compartiments, des paramètres, de N (population hors `hors_population`) et de t.
+    "de" ou "vers" peut être omis pour une naissance ou une sortie du modèle. "parametres"
+    donne des valeurs par défaut; les autres noms sont des paramètres à fournir.
+
+    Le second membre et le jacobien analytique sont générés en source NumPy déroulé
+    (et compilés par numba lorsqu'il est disponible), sans interprétation à l'appel.
+    """
+
+    def __init__(self, spec, backend='auto'):
+        self.spec = spec
+        self.nom = spec.get('nom', 'modele')
+        self.empreinte = empreinte(spec)
+        self.compartiments, self.parametres, self.source = _generer(spec)
+        self.defauts = {nom: float(v) for nom, v in spec.get('parametres', {}).items()}
+        self.etat_initial_spec = spec.get('etat_initial', {})
+        fichier = f"<modele {self.nom} {self.empreinte[:12]}>"
+        # Enregistré dans linecache pour que les traces d'erreur montrent le code généré
+        linecache.cache[fichier] = (len(self.source), None, self.source.splitlines(True), fichier)
+        espace = {'np': np}
+        exec(compile(self.source, fichier, 'exec'), espace)
+        self.backend = 'numpy'
+        self._second_membre, self._jacobien = espace['second_membre'], espace['jacobien']
+        if backend in ('auto', 'numba'):
+            try:
+                import numba
+            except ImportError:
+                if backend == 'numba':
+                    raise
+            else:
+                self._second_membre = numba.njit(self._second_membre)
+                self._jacobien = numba.njit(self._jacobien)
+                self.backend = 'numba'
+
+    def coefficients(self, taux):
+        # Vecteur des paramètres dans l'ordre du code généré
+        valeurs = {**self.defauts, **taux}
+        manquants = [nom for nom in self.parametres if nom not in valeurs]
+        if manquants:
+            raise ValueError(f"Paramètres manquants pour le modèle {self.nom}: {', '.join(manquants)}")
+        return np.array([float(valeurs[nom]) for nom in self.parametres])
+
+    def second_membre(self, taux):
+        p = self.coefficients(taux)
+        rhs = self._second_membre
+        return lambda t, y: rhs(t, y, p)
+
+    def jacobien(self, taux):
+        p = self.coefficients(taux)
+        jac = self._jacobien
+        return lambda t, y: jac(t, y, p)
+
+    def etat_initial(self, params):
+        # État initial depuis un VirusParams: "etat_initial" de la spécification associe un
+        # compartiment à un champ du virus ou à une valeur; sinon correspondance par nom
+        valeurs = dict(zip(COMPARTIMENTS_VIRUS, params.etat_initial))
+        etat = []
+        for c in self.compartiments:
+            source = self.etat_initial_spec.get(c, c)
+            if not isinstance(source, str):
+                etat.append(source)
+            elif source in valeurs:
+                etat.append(valeurs[source])
+            else:
+                etat.append(getattr(params, source, 0.0))
+        return np.array(etat, dtype=float)
+
+    def __repr__(self):
+        return f"ModeleCompile({self.nom!r}, {self.compartiments}, backend={self.backend!r})"
+
+def compiler_modele(spec, backend='auto'):
+    """
+    Compile une spécification de modèle, en réutilisant le modèle déjà compilé pour
+    une spécification identique (même empreinte).
+
+    Args:
+        spec (dict): Spécification du modèle (voir ModeleCompile).
+        backend (str): 'auto' (numba si disponible), 'numba' ou 'numpy'.
+
+    Returns:
+        ModeleCompile: Modèle compilé.
+    """
+    cle = (empreinte(spec), backend)
+    if cle not in _CACHE:
+        _CACHE[cle] = ModeleCompile(spec, backend)
+    return _CACHE[cle]
+
+def charger_modele(nom, backend='auto'):
+    # Compile un modèle enregistré dans le dossier des modèles (virus/modeles)
+    from utils import file_management
+    return compiler_modele(file_management.load_model(nom), backend)
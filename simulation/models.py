@@ -0,0 +1,182 @@
+# simulation/models.py
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from .differential_equations import ATOL, RTOL, grille_temps
+
+# Compartiments alimentés par les effectifs initiaux d'un VirusParams, dans l'ordre de etat_initial
+COMPARTIMENTS_VIRUS = ('sain', 'contaminé', 'infecté', 'rétabli', 'mort')
+
+class Flux:
+    """
+    Transition d'un compartiment vers un autre.
+
+    Le débit vaut `taux * y[source]`, multiplié par `y[infectieux] / N` pour une transmission
+    (infectieux renseigné), N étant la population vivante du modèle.
+
+    Args:
+        source (str): Compartiment de départ.
+        cible (str): Compartiment d'arrivée.
+        taux (str): Nom du taux (beta, sigma, gamma, mu, nu, omega ou tout taux fourni à la résolution).
+        infectieux (str, optional): Compartiment infectieux, pour une transmission.
+    """
+
+    __slots__ = ('source', 'cible', 'taux', 'infectieux')
+
+    def __init__(self, source, cible, taux, infectieux=None):
+        self.source = source
+        self.cible = cible
+        self.taux = taux
+        self.infectieux = infectieux
+
+    def __repr__(self):
+        return f"Flux({self.source!r} -> {self.cible!r}, {self.taux!r})"
+
+class ModeleCompartimental:
+    """
+    Modèle compartimental déclaré comme un graphe de flux, compilé en une matrice
+    stœchiométrique (compartiments x flux) et des index de gather: le second membre
+    se réduit à un vecteur de débits et un produit matriciel, quel que soit le nombre
+    de compartiments.
+
+    Args:
+        nom (str): Nom du modèle.
+        compartiments (tuple): Noms des compartiments, dans l'ordre de l'état.
+        flux (tuple): Flux du modèle.
+        hors_population (tuple): Compartiments exclus de N (les morts).
+    """
+
+    def __init__(self, nom, compartiments, flux, hors_population=('mort',)):
+        self.nom = nom
+        self.compartiments = tuple(compartiments)
+        self.flux = tuple(flux)
+        index = {c: i for i, c in enumerate(self.compartiments)}
+        for f in self.flux:
+            for c in (f.source, f.cible, f.infectieux):
+                if c is not None and c not in index:
+                    raise ValueError(f"Compartiment inconnu dans le modèle {nom}: {c}")
+        self.taux_requis = tuple(dict.fromkeys(f.taux for f in self.flux))
+        self.stoechiometrie = np.zeros((len(self.compartiments), len(self.flux)))
+        for j, f in enumerate(self.flux):
+            self.stoechiometrie[index[f.source], j] -= 1
+            self.stoechiometrie[index[f.cible], j] += 1
+        self.sources = np.array([index[f.source] for f in self.flux])
+        self.transmissions = np.array([j for j, f in enumerate(self.flux) if f.infectieux is not None], dtype=int)
+        self.infectieux = np.array([index[f.infectieux] for f in self.flux if f.infectieux is not None], dtype=int)
+        self.vivants = np.array([i for i, c in enumerate(self.compartiments) if c not in hors_population])
+        self._taux_flux = np.array([self.taux_requis.index(f.taux) for f in self.flux])
+
+    def coefficients(self, taux):
+        # Vecteur des taux par flux, à partir d'un dictionnaire {nom: valeur}
+        manquants = [nom for nom in self.taux_requis if nom not in taux]
+        if manquants:
+            raise ValueError(f"Taux manquants pour le modèle {self.nom}: {', '.join(manquants)}")
+        valeurs = np.array([float(taux[nom]) for nom in self.taux_requis])
+        return valeurs[self._taux_flux]
+
+    def second_membre(self, taux):
+        """
+        Compile le second membre pour des taux donnés.
+
+        Returns:
+            callable: f(t, y) pour solve_ivp; y peut aussi être de forme (compartiments, k).
+        """
+        coefficients = self.coefficients(taux)
+        stoechiometrie, sources, vivants = self.stoechiometrie, self.sources, self.vivants
+        transmissions, infectieux = self.transmissions, self.infectieux
+
+        def f(t, y):
+            debits = (coefficients * y[sources].T).T
+            debits[transmissions] *= y[infectieux] / y[vivants].sum(axis=0)
+            return stoechiometrie @ debits
+
+        return f
+
+    def etat_initial(self, params):
+        # État initial depuis un VirusParams: les compartiments absents du virus partent de zéro
+        valeurs = dict(zip(COMPARTIMENTS_VIRUS, params.etat_initial))
+        return np.array([valeurs.get(c, 0.0) for c in self.compartiments], dtype=float)
+
+    def specification(self):
+        # Spécification déclarative équivalente, pour simulation.model_compiler
+        def debit(f):
+            return f"{f.taux} * {f.source}" + (f" * {f.infectieux} / N" if f.infectieux else "")
+        return {
+            'nom': self.nom,
+            'compartiments': list(self.compartiments),
+            'hors_population': [c for i, c in enumerate(self.compartiments) if i not in self.vivants],
+            'flux': [{'de': f.source, 'vers': f.cible, 'debit': debit(f)} for f in self.flux],
+        }
+
+    def __repr__(self):
+        return f"ModeleCompartimental({self.nom!r}, {self.compartiments})"
+
+def taux_virus(params):
+    # Taux d'un VirusParams sous les noms utilisés par les flux
+    return {'beta': params.beta, 'sigma': params.sigma, 'gamma': params.gamma, 'mu': params.mu,
+            'nu': params.nu, 'omega': params.omega}
+
+_TRANSMISSION = Flux('sain', 'contaminé', 'beta', infectieux='infecté')
+_SEIRD = (
+    _TRANSMISSION,
+    Flux('contaminé', 'infecté', 'sigma'),
+    Flux('infecté', 'rétabli', 'gamma'),
+    Flux('infecté', 'mort', 'mu'),
+)
+
+# SEIRD: le modèle de seir_model, les morts étant exclus de N
+SEIRD = ModeleCompartimental('SEIRD', COMPARTIMENTS_VIRUS, _SEIRD)
+# SEIRS: perte d'immunité des rétablis au taux omega = 1 / duree_immunite
+SEIRS = ModeleCompartimental(
+    'SEIRS', SEIRD.compartiments, _SEIRD + (Flux('rétabli', 'sain', 'omega'),)
+)
+# SEIRV: vaccination des sains au taux nu = prob_vaccination, immunité vaccinale et naturelle perdues au taux omega
+SEIRV = ModeleCompartimental(
+    'SEIRV', SEIRD.compartiments + ('vacciné',),
+    _SEIRD + (Flux('rétabli', 'sain', 'omega'), Flux('sain', 'vacciné', 'nu'), Flux('vacciné', 'sain', 'omega')),
+)
+
+MODELES = {modele.nom: modele for modele in (SEIRD, SEIRS, SEIRV)}
+
+def resoudre_modele(modele, etat_initial, taux, t, rtol=RTOL, atol=ATOL):
+    """
+    Résout un modèle compartimental sur les instants t.
+
+    Args:
+        modele (ModeleCompartimental ou ModeleCompile): Modèle à résoudre; le jacobien
+            analytique est transmis au solveur lorsque le modèle en fournit un.
+        etat_initial (array-like): État initial, dans l'ordre de modele.compartiments.
+        taux (dict): Taux du modèle, par nom.
+        t (array-like): Instants de sortie, croissants à partir de 0.
+
+    Returns:
+        np.ndarray: Tableau (len(t), len(modele.compartiments)).
+    """
+    t = np.asarray(t, dtype=float)
+    jacobien = getattr(modele, 'jacobien', None)
+    solution = solve_ivp(
+        modele.second_membre(taux), (t[0], max(t[-1], t[0] + 1)), np.asarray(etat_initial, dtype=float),
+        method='LSODA', t_eval=t, rtol=rtol, atol=atol, jac=jacobien(taux) if jacobien else None
+    )
+    if solution.status < 0:
+        raise RuntimeError(f"Échec de l'intégration: {solution.message}")
+    return solution.y.T
+
+def simulate_modele(modele, params):
+    """
+    Simule un virus (VirusParams) avec un modèle de la famille, sur la grille journalière.
+
+    Args:
+        modele (str ou modèle): Modèle, ou nom d'un modèle de MODELES ou du dossier des modèles.
+
+    Returns:
+        list: Statistiques journalières {compartiment: effectif}, comme simulate_seir.
+    """
+    if isinstance(modele, str):
+        if modele in MODELES:
+            modele = MODELES[modele]
+        else:
+            from .model_compiler import charger_modele
+            modele = charger_modele(modele)
+    etats = resoudre_modele(modele, modele.etat_initial(params), taux_virus(params), grille_temps(params.nombre_jours))
+    return [dict(zip(modele.compartiments, map(float, ligne))) for ligne in etats]
@@ -0,0 +1,174 @@
+# simulation/parameters.py
+import math
+
+# Version du schéma JSON des fichiers de virus
+SCHEMA_VERSION = 1
+
+CHAMPS = (
+    'initial_sains', 'initial_contamines', 'initial_infectes', 'initial_retablis', 'initial_morts',
+    'prob_contamination', 'duree_incubation', 'duree_infection',
+    'prob_vaccination', 'duree_immunite', 'taux_mortalite',
+    'nombre_jours', 'discretisation'
+)
+CHAMPS_ENTIERS = (
+    'initial_sains', 'initial_contamines', 'initial_infectes', 'initial_retablis', 'initial_morts',
+    'nombre_jours', 'discretisation'
+)
+# Taux dérivés, calculés une seule fois à la construction
+DERIVES = ('beta', 'sigma', 'gamma', 'mu', 'nu', 'omega', 'population')
+
+def _migrer_v0(parameters):
+    # Fichiers antérieurs au schéma versionné: clés optionnelles ajoutées au fil du temps
+    parameters.setdefault('initial_morts', 0)
+    parameters.setdefault('discretisation', 10)
+    parameters['schema_version'] = 1
+    return parameters
+
+# Migrations successives: version de départ -> fonction vers la version suivante
+MIGRATIONS = {0: _migrer_v0}
+
+def migrer_parametres(parameters):
+    """
+    Amène un dictionnaire de paramètres lu sur disque à la version courante du schéma.
+
+    Raises:
+        ValueError: Si le fichier provient d'une version plus récente que SCHEMA_VERSION.
+    """
+    parameters = dict(parameters)
+    version = parameters.get('schema_version', 0)
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Version de schéma {version} non supportée (maximum {SCHEMA_VERSION}).")
+    while version < SCHEMA_VERSION:
+        parameters = MIGRATIONS[version](parameters)
+        version = parameters['schema_version']
+    return parameters
+
+def _convertir(champ, valeur):
+    # Nombre fini; entier exact pour CHAMPS_ENTIERS (2.7 infectés n'est pas tronqué en 2)
+    nombre = float(valeur)
+    if not math.isfinite(nombre):
+        raise ValueError(f"Le paramètre {champ} doit être un nombre fini.")
+    if champ in CHAMPS_ENTIERS:
+        if not nombre.is_integer():
+            raise ValueError(f"Le paramètre {champ} doit être un nombre entier.")
+        return int(nombre)
+    return nombre
+
+class VirusParams:
+    """
+    Jeu de paramètres d'un virus, validé à la construction et immuable.
+    Les taux (beta, sigma, gamma, mu, nu, omega) sont précalculés et l'objet est hachable,
+    ce qui permet de l'utiliser comme clé de cache.
+
+    Seuls les invariants physiques sont vérifiés ici (la limite de population de l'interface
+    est dans SimulationApp.lire_parametres). Une durée d'immunité nulle signifie une immunité
+    permanente (omega = 0), comme dans les fichiers antérieurs au schéma versionné; les durées
+    d'incubation et d'infection doivent être strictement positives.
+    """
+    __slots__ = CHAMPS + DERIVES + ('_cle', '_hash')
+
+    def __init__(self, initial_sains, initial_contamines, initial_infectes, initial_retablis, initial_morts,
+                 prob_contamination, duree_incubation, duree_infection, prob_vaccination, duree_immunite,
+                 taux_mortalite, nombre_jours, discretisation):
+        valeurs = dict(zip(CHAMPS, (
+            initial_sains, initial_contamines, initial_infectes, initial_retablis, initial_morts,
+            prob_contamination, duree_incubation, duree_infection, prob_vaccination, duree_immunite,
+            taux_mortalite, nombre_jours, discretisation
+        )))
+        for champ, valeur in valeurs.items():
+            valeurs[champ] = _convertir(champ, valeur)
+        self._valider(valeurs)
+
+        for champ, valeur in valeurs.items():
+            object.__setattr__(self, champ, valeur)
+        object.__setattr__(self, 'beta', valeurs['prob_contamination'])
+        object.__setattr__(self, 'sigma', 1 / valeurs['duree_incubation'])
+        object.__setattr__(self, 'gamma', 1 / valeurs['duree_infection'])
+        object.__setattr__(self, 'mu', valeurs['taux_mortalite'])
+        object.__setattr__(self, 'nu', valeurs['prob_vaccination'])
+        object.__setattr__(self, 'omega', 1 / valeurs['duree_immunite'] if valeurs['duree_immunite'] else 0.0)
+        object.__setattr__(self, 'population', sum(valeurs[c] for c in CHAMPS_ENTIERS[:5]))
+        cle = tuple(valeurs[c] for c in CHAMPS)
+        object.__setattr__(self, '_cle', cle)
+        object.__setattr__(self, '_hash', hash(cle))
+
+    @staticmethod
+    def _valider(v):
+        if any(v[c] < 0 for c in CHAMPS_ENTIERS[:5]):
+            raise ValueError("Les effectifs initiaux doivent être positifs.")
+        if not (0 <= v['prob_contamination'] <= 1):
+            raise ValueError("La probabilité de contamination (Beta) doit être entre 0 et 1.")
+        if not (0 <= v['prob_vaccination'] <= 1):
+            raise ValueError("La probabilité de vaccination doit être entre 0 et 1.")
+        if not (0 <= v['taux_mortalite'] <= 1):
+            raise ValueError("Le taux de mortalité doit être entre 0 et 1.")
+        if v['duree_incubation'] <= 0 or v['duree_infection'] <= 0:
+            raise ValueError("Les durées d'incubation et d'infection doivent être strictement positives.")
+        if v['duree_immunite'] < 0:
+            raise ValueError("La durée d'immunité doit être positive (0: immunité permanente).")
+        if v['nombre_jours'] <= 0:
+            raise ValueError("Le nombre de jours de simulation doit être un nombre positif.")
+        if v['discretisation'] <= 0:
+            raise ValueError("La discrétisation doit être un nombre positif.")
+
+    @classmethod
+    def from_dict(cls, parameters):
+        parameters = migrer_parametres(parameters)
+        try:
+            return cls(**{champ: parameters[champ] for champ in CHAMPS})
+        except KeyError as e:
+            raise ValueError(f"Paramètre manquant: {e.args[0]}") from None
+
+    def to_dict(self):
+        parameters = {champ: getattr(self, champ) for champ in CHAMPS}
+        parameters['schema_version'] = SCHEMA_VERSION
+        return parameters
+
+    def remplacer(self, **changements):
+        # Copie modifiée (et revalidée) des paramètres
+        parameters = {champ: getattr(self, champ) for champ in CHAMPS}
+        parameters.update(changements)
+        return VirusParams(**parameters)
+
+    def avec_taux(self, beta=None, sigma=None, gamma=None, mu=None):
+        # Copie dont les taux sont remplacés, reconvertis en probabilités et durées
+        changements = {}
+        if beta is not None:
+            changements['prob_contamination'] = beta
+        if sigma is not None:
+            changements['duree_incubation'] = 1 / sigma
+        if gamma is not None:
+            changements['duree_infection'] = 1 / gamma
+        if mu is not None:
+            changements['taux_mortalite'] = mu
+        return self.remplacer(**changements)
+
+    @property
+    def etat_initial(self):
+        return (self.initial_sains, self.initial_contamines, self.initial_infectes,
+                self.initial_retablis, self.initial_morts)
+
+    @property
+    def taux(self):
+        return (self.beta, self.sigma, self.gamma, self.mu)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("VirusParams est immuable")
+
+    def __delattr__(self, name):
+        raise AttributeError("VirusParams est immuable")
+
+    def __eq__(self, other):
+        if not isinstance(other, VirusParams):
+            return NotImplemented
+        return self._cle == other._cle
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (VirusParams, self._cle)
+
+    def __repr__(self):
+        arguments = ', '.join(f"{champ}={getattr(self, champ)!r}" for champ in CHAMPS)
+        return f"VirusParams({arguments})"
@@ -0,0 +1,316 @@
+# simulation/pipeline.py
+# Chaîne de traitement par blocs: source -> moteur -> réduction -> export.
+#
+# Chaque étape est un générateur qui consomme et produit des blocs (dictionnaires) de
+# `taille_bloc` scénarios:
+#
+#     {'noms': [...], 'params': [VirusParams, ...]}            (sources)
+#     + 'trajectoires': (k, jours) structuré, NaN après l'horizon (simuler)
+#     + 'resumes': tableau structuré (k,)                        (resumer, reduire_pics)
+#
+# Les blocs traversent toute la chaîne un par un: la mémoire reste bornée quel que soit le
+# nombre de scénarios. Exemple:
+#
+#     from functools import partial
+#     chainer(
+#         source_grille(base, prob_contamination=np.linspace(0.05, 0.5, 1000), duree_infection=range(2, 22)),
+#         partial(resumer, n_jobs=8),
+#         partial(vers_sqlite, path='balayage.sqlite'),
+#     )
+import csv
+import functools
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .ensemble import PAS_PAR_JOUR, RESUME_DTYPE, colonne, resumer_ensemble, simulate_ensemble
+from .parameters import CHAMPS, VirusParams
+
+TAILLE_BLOC = 1000
+
+# Résumé calculé à partir de trajectoires complètes (reduire_pics)
+PICS_DTYPE = np.dtype([
+    ('pic_infectes', 'f8'),
+    ('jour_pic', 'f8'),
+    ('taux_attaque', 'f8'),
+    ('morts_finaux', 'f8'),
+])
+
+def chainer(source, *etapes):
+    # Applique les étapes dans l'ordre; la dernière peut être un export qui renvoie un résultat
+    flux = source
+    for etape in etapes:
+        flux = etape(flux)
+    return flux
+
+def _par_blocs(scenarios, taille_bloc):
+    # Regroupe un itérable de (nom, VirusParams) en blocs
+    scenarios = iter(scenarios)
+    while True:
+        morceau = list(itertools.islice(scenarios, taille_bloc))
+        if not morceau:
+            return
+        noms, params = zip(*morceau)
+        yield {'noms': list(noms), 'params': list(params)}
+
+# Sources
+
+def source_dossier(dossier=None, taille_bloc=TAILLE_BLOC):
+    # Virus sauvegardés (un fichier JSON par virus), lus au fur et à mesure; from_dict migre
+    # les fichiers d'anciennes versions du schéma
+    if dossier is None:
+        from utils.file_management import VIRUS_DIR as dossier
+    noms = sorted(os.path.splitext(f)[0] for f in os.listdir(dossier) if f.endswith('.json'))
+
+    def scenarios():
+        for nom in noms:
+            with open(os.path.join(dossier, f"{nom}.json"), 'r') as f:
+                yield nom, VirusParams.from_dict(json.load(f))
+
+    return _par_blocs(scenarios(), taille_bloc)
+
+def source_grille(base, taille_bloc=TAILLE_BLOC, **axes):
+    """
+    Balayage cartésien de paramètres autour d'un virus de référence, produit paresseusement.
+
+    Args:
+        base (VirusParams): Virus de référence.
+        **axes: {champ: valeurs} des champs balayés.
+    """
+    inconnus = set(axes) - set(CHAMPS)
+    if inconnus:
+        raise ValueError(f"Champs inconnus: {', '.join(sorted(inconnus))}")
+    noms = tuple(axes)
+
+    def scenarios():
+        for i, valeurs in enumerate(itertools.product(*axes.values())):
+            yield f"grille_{i}", base.remplacer(**dict(zip(noms, valeurs)))
+
+    return _par_blocs(scenarios(), taille_bloc)
+
+def source_csv(path, base, taille_bloc=TAILLE_BLOC, colonne_nom='nom'):
+    """
+    Un scénario par ligne d'un CSV avec en-tête: les colonnes nommées comme des champs de
+    VirusParams remplacent ceux du virus de référence, les autres sont ignorées. Les valeurs
+    sont converties et validées par VirusParams (un effectif non entier est refusé).
+    """
+    def scenarios():
+        with open(path, newline='', encoding='utf-8') as f:
+            for i, ligne in enumerate(csv.DictReader(f)):
+                changements = {
+                    champ: valeur for champ, valeur in ligne.items() if champ in CHAMPS and valeur not in (None, '')
+                }
+                yield ligne.get(colonne_nom) or f"ligne_{i + 1}", base.remplacer(**changements)
+
+    return _par_blocs(scenarios(), taille_bloc)
+
+# Exécution parallèle et tampons
+
+def en_parallele(blocs, fonction, n_jobs=None, en_vol=None):
+    """
+    Applique `fonction` (picklable) à chaque bloc dans un pool de processus, en gardant au
+    plus `en_vol` blocs en cours: la lecture de la source et l'aval avancent pendant le calcul,
+    sans jamais accumuler plus de en_vol blocs. L'ordre des blocs est conservé.
+    """
+    n_jobs = n_jobs or os.cpu_count()
+    en_vol = en_vol or 2 * n_jobs
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        attente = deque()
+        for bloc in blocs:
+            attente.append(executor.submit(fonction, bloc))
+            if len(attente) >= en_vol:
+                yield attente.popleft().result()
+        while attente:
+            yield attente.popleft().result()
+
+_FIN = object()
+
+def tampon(blocs, taille=2):
+    """
+    Produit les blocs depuis un thread, avec au plus `taille` blocs d'avance: l'étape amont
+    (lecture, calcul) continue pendant que l'aval traite le bloc courant.
+    """
+    file = queue.Queue(maxsize=taille)
+    arret = threading.Event()
+
+    def envoyer(objet):
+        # Attend de la place, sauf si le consommateur a abandonné
+        while not arret.is_set():
+            try:
+                file.put(objet, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produire():
+        try:
+            for bloc in blocs:
+                if not envoyer(bloc):
+                    return
+            envoyer(_FIN)
+        except BaseException as e:
+            envoyer(e)
+
+    producteur = threading.Thread(target=produire, daemon=True)
+    producteur.start()
+    try:
+        while True:
+            bloc = file.get()
+            if bloc is _FIN:
+                return
+            if isinstance(bloc, BaseException):
+                raise bloc
+            yield bloc
+    finally:
+        arret.set()
+
+def _appliquer(blocs, fonction, n_jobs, en_vol):
+    if n_jobs == 1:
+        return map(fonction, blocs)
+    return en_parallele(blocs, fonction, n_jobs, en_vol)
+
+# Moteurs
+
+def _simuler_bloc(bloc, pas_par_jour=PAS_PAR_JOUR, precision='float64'):
+    params = bloc['params']
+    horizons = np.array([p.nombre_jours for p in params])
+    trajectoires = simulate_ensemble(
+        np.array([p.etat_initial for p in params]), *np.array([p.taux for p in params]).T,
+        int(horizons.max()), pas_par_jour, precision=precision
+    )
+    # Un seul horizon par bloc: chaque scénario est masqué (tous champs) au-delà du sien
+    trajectoires[np.arange(trajectoires.shape[1]) >= horizons[:, None]] = np.nan
+    return {**bloc, 'trajectoires': trajectoires}
+
+def simuler(blocs, n_jobs=1, en_vol=None, precision='float64'):
+    """
+    Intègre chaque bloc avec le schéma RK4 vectorisé de simulate_ensemble.
+    Ajoute 'trajectoires' (k, jours) de type dtype_trajectoires(precision), NaN au-delà du
+    nombre de jours de chaque scénario. precision='float32' intègre et conserve S, E, I, R en
+    float32, les morts cumulés restant en float64.
+    """
+    return _appliquer(blocs, functools.partial(_simuler_bloc, precision=precision), n_jobs, en_vol)
+
+def _resumer_bloc(bloc, pas_par_jour=PAS_PAR_JOUR, precision='float64'):
+    # Scénarios regroupés par horizon: resumer_ensemble intègre un horizon commun
+    params = bloc['params']
+    horizons = np.array([p.nombre_jours for p in params])
+    resumes = np.empty(len(params), dtype=RESUME_DTYPE)
+    for horizon in np.unique(horizons):
+        selection = np.flatnonzero(horizons == horizon)
+        groupe = [params[i] for i in selection]
+        resumes[selection] = resumer_ensemble(
+            np.array([p.etat_initial for p in groupe]), *np.array([p.taux for p in groupe]).T,
+            int(horizon), pas_par_jour, precision
+        )
+    return {**bloc, 'resumes': resumes}
+
+def resumer(blocs, n_jobs=1, en_vol=None, precision='float64'):
+    """
+    Moteur et réduction fusionnés (mode réduit de resumer_ensemble): ajoute 'resumes'
+    (RESUME_DTYPE) sans jamais construire les trajectoires.
+    """
+    return _appliquer(blocs, functools.partial(_resumer_bloc, precision=precision), n_jobs, en_vol)
+
+# Réductions
+
+def reduire_pics(blocs, garder_trajectoires=False):
+    # Pic d'infectés, jour du pic, taux d'attaque et morts finaux à partir des trajectoires
+    for bloc in blocs:
+        trajectoires = bloc['trajectoires']
+        infectes = np.nan_to_num(colonne(trajectoires, 2).astype(float), nan=-np.inf)
+        sains, morts = colonne(trajectoires, 0).astype(float), trajectoires['morts']
+        dernier = np.array([p.nombre_jours - 1 for p in bloc['params']])
+        lignes = np.arange(len(trajectoires))
+        population = trajectoires['compartiments'][:, 0].sum(axis=1, dtype=float) + morts[:, 0]
+        resumes = np.empty(len(trajectoires), dtype=PICS_DTYPE)
+        resumes['jour_pic'] = infectes.argmax(axis=1)
+        resumes['pic_infectes'] = infectes[lignes, resumes['jour_pic'].astype(int)]
+        resumes['taux_attaque'] = (sains[:, 0] - sains[lignes, dernier]) / population
+        resumes['morts_finaux'] = morts[lignes, dernier]
+        bloc = {**bloc, 'resumes': resumes}
+        if not garder_trajectoires:
+            del bloc['trajectoires']
+        yield bloc
+
+def quantiles_journaliers(blocs, quantiles=(0.05, 0.5, 0.95), compartiment=2, maximum=None, classes=1000):
+    """
+    Quantiles jour par jour d'un compartiment sur l'ensemble des scénarios, en mémoire
+    constante: chaque jour est résumé par un histogramme de `classes` classes sur
+    [0, maximum] (par défaut, la plus grande population du premier bloc), la précision
+    étant d'une largeur de classe.
+
+    Returns:
+        np.ndarray: Tableau (jours, len(quantiles)).
+    """
+    histogrammes = None
+    for bloc in blocs:
+        valeurs = colonne(bloc['trajectoires'], compartiment)
+        if histogrammes is None:
+            maximum = maximum or max(p.population for p in bloc['params'])
+            histogrammes = np.zeros((valeurs.shape[1], classes), dtype=np.int64)
+        elif valeurs.shape[1] > len(histogrammes):
+            histogrammes = np.vstack((histogrammes, np.zeros((valeurs.shape[1] - len(histogrammes), classes), dtype=np.int64)))
+        valides = ~np.isnan(valeurs)
+        jours = np.broadcast_to(np.arange(valeurs.shape[1]), valeurs.shape)[valides]
+        indices = np.clip((valeurs[valides] / maximum * classes).astype(np.int64), 0, classes - 1)
+        histogrammes[:valeurs.shape[1]] += np.bincount(
+            jours * classes + indices, minlength=valeurs.shape[1] * classes
+        ).reshape(valeurs.shape[1], classes)
+    if histogrammes is None:
+        return np.empty((0, len(quantiles)))
+    cumul = np.cumsum(histogrammes, axis=1)
+    totaux = np.maximum(cumul[:, -1:], 1)
+    rangs = np.asarray(quantiles)[None, :] * totaux
+    classe = np.array([np.searchsorted(c, r) for c, r in zip(cumul, rangs)])
+    # Centre de la classe contenant le quantile
+    return (np.minimum(classe, classes - 1) + 0.5) * maximum / classes
+
+# Exports
+
+def _lignes(bloc):
+    resumes = bloc['resumes']
+    for nom, resume in zip(bloc['noms'], resumes.tolist()):
+        yield (nom, *resume)
+
+def vers_csv(blocs, path):
+    # Écrit les résumés au fil des blocs; renvoie le nombre de lignes écrites
+    n = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        ecrivain = None
+        for bloc in blocs:
+            if ecrivain is None:
+                ecrivain = csv.writer(f)
+                ecrivain.writerow(('nom',) + bloc['resumes'].dtype.names)
+            lignes = list(_lignes(bloc))
+            ecrivain.writerows(lignes)
+            n += len(lignes)
+    return n
+
+def vers_sqlite(blocs, path, table='resumes'):
+    # Une transaction par bloc; renvoie le nombre de lignes écrites
+    n = 0
+    connexion = sqlite3.connect(path)
+    try:
+        for bloc in blocs:
+            champs = bloc['resumes'].dtype.names
+            if n == 0:
+                colonnes = ', '.join(f'"{c}" REAL' for c in champs)
+                connexion.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (nom TEXT, {colonnes})')
+            lignes = list(_lignes(bloc))
+            with connexion:
+                connexion.executemany(
+                    f'INSERT INTO "{table}" VALUES ({", ".join("?" * (len(champs) + 1))})', lignes
+                )
+            n += len(lignes)
+    finally:
+        connexion.close()
+    return n
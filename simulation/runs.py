@@ -0,0 +1,248 @@
+# simulation/runs.py
+import argparse
+import functools
+import hashlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+
+import numpy as np
+
+from .parameters import VirusParams
+from utils.file_management import RESULTATS_DIR, ecriture_atomique, load_virus
+
+# Version du format des manifestes
+VERSION_MANIFESTE = 1
+COMPARTIMENTS = ('sain', 'contaminé', 'infecté', 'rétabli', 'mort')
+
+@functools.lru_cache(maxsize=None)
+def _revision():
+    # Commit du code, suffixé de l'empreinte des modifications du paquet simulation (fichiers
+    # suivis modifiés et fichiers non suivis: deux états différents donnent deux révisions
+    # différentes); None hors d'un dépôt git. Le reste du dépôt (interface, benchmarks,
+    # resultats/) ne change pas les résultats.
+    paquet = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=paquet, capture_output=True, text=True, check=True).stdout.strip()
+        modifications = subprocess.run(['git', 'diff', 'HEAD', '--binary', '--', '.'], cwd=paquet,
+                                       capture_output=True, check=True).stdout
+        non_suivis = subprocess.run(['git', 'ls-files', '--others', '--exclude-standard', '-z', '--', '.'], cwd=paquet,
+                                    capture_output=True, check=True).stdout.split(b'\0')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    empreinte = hashlib.sha256(modifications)
+    for nom in sorted(filter(None, non_suivis)):
+        chemin = os.path.join(paquet, os.fsdecode(nom))
+        empreinte.update(b'\0' + nom + b'\0')
+        with open(chemin, 'rb') as f:
+            empreinte.update(f.read())
+    if not modifications and not any(non_suivis):
+        return commit
+    return f"{commit}+modifié.{empreinte.hexdigest()[:16]}"
+
+def _versions():
+    import scipy
+
+    from . import __version__
+    return {'simulation': __version__, 'python': platform.python_version(), 'numpy': np.__version__, 'scipy': scipy.__version__}
+
+def _executer_seir(params, configuration, graine):
+    from .differential_equations import grille_temps, resoudre_seir
+
+    trajectoire = resoudre_seir(params.etat_initial, *params.taux, params.nombre_jours - 1,
+                                rtol=configuration['rtol'], atol=configuration['atol'])
+    return trajectoire.evaluer(grille_temps(params.nombre_jours))
+
+def _executer_agents(params, configuration, graine):
+    from .agents import PopulationAgents
+
+    with tempfile.TemporaryDirectory() as dossier:
+        population = PopulationAgents.creer(dossier, params, effectifs=configuration['effectifs'], graine=graine,
+                                            n_regions=configuration['n_regions'], melange=configuration['melange'])
+        # Même grille que le moteur seir: jours 0 à nombre_jours - 1
+        statistiques = population.simuler(params.nombre_jours - 1)
+        del population
+    return np.array([[jour[c] for c in COMPARTIMENTS] for jour in statistiques], dtype=float)
+
+def _configuration_seir():
+    from .differential_equations import ATOL, RTOL
+    return {'methode': 'LSODA', 'rtol': RTOL, 'atol': ATOL}
+
+def _configuration_agents():
+    return {'n_regions': 1, 'melange': 0.0, 'effectifs': None}
+
+# Moteurs: (configuration par défaut, exécution) -> tableau (jours, 5)
+MOTEURS = {
+    'seir': (_configuration_seir, _executer_seir),
+    'agents': (_configuration_agents, _executer_agents),
+}
+
+def manifeste_execution(params, moteur='seir', configuration=None, graine=None):
+    """
+    Décrit complètement une exécution: paramètres canoniques du virus (ceux qu'écrit
+    save_virus), moteur et réglages du solveur, graine et versions du code.
+
+    Args:
+        params (VirusParams): Virus simulé.
+        moteur (str): Clé de MOTEURS.
+        configuration (dict, optional): Réglages remplaçant ceux par défaut du moteur.
+        graine (int, optional): Graine des moteurs stochastiques.
+
+    Returns:
+        dict: Manifeste, sérialisable en JSON.
+    """
+    if moteur not in MOTEURS:
+        raise ValueError(f"Moteur inconnu: {moteur} (attendu: {', '.join(MOTEURS)}).")
+    reglages = MOTEURS[moteur][0]()
+    inconnus = set(configuration or {}) - set(reglages)
+    if inconnus:
+        raise ValueError(f"Réglages inconnus pour le moteur {moteur}: {', '.join(sorted(inconnus))}.")
+    reglages.update(configuration or {})
+    return {
+        'version': VERSION_MANIFESTE,
+        'virus': params.to_dict(),
+        'moteur': moteur,
+        'configuration': reglages,
+        'graine': graine,
+        'versions': _versions(),
+        'revision': _revision(),
+    }
+
+def empreinte(manifeste):
+    # Adresse du résultat: empreinte du manifeste sous forme canonique
+    canonique = json.dumps(manifeste, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonique.encode('utf-8')).hexdigest()
+
+class DepotResultats:
+    """
+    Résultats d'exécutions rangés par empreinte de leur manifeste: <dossier>/<2 premiers
+    caractères>/<empreinte>.npz, avec le manifeste à côté en JSON. Un manifeste déjà exécuté
+    est relu depuis le dépôt au lieu d'être recalculé, sauf si sa révision est inconnue (code
+    hors d'un dépôt git): rien ne garantit alors que le résultat enregistré vient du même code.
+    """
+
+    def __init__(self, dossier=RESULTATS_DIR):
+        self.dossier = dossier
+
+    def _chemin(self, cle, extension):
+        return os.path.join(self.dossier, cle[:2], f"{cle}.{extension}")
+
+    def resoudre(self, prefixe):
+        # Empreinte complète à partir d'un préfixe (comme les commits git)
+        candidats = [cle for cle in self.lister() if cle.startswith(prefixe)]
+        if len(candidats) != 1:
+            raise KeyError(f"{'Aucune' if not candidats else 'Plusieurs'} exécution(s) pour '{prefixe}'.")
+        return candidats[0]
+
+    def lister(self):
+        if not os.path.isdir(self.dossier):
+            return []
+        return sorted(
+            os.path.splitext(f)[0]
+            for sous_dossier in os.listdir(self.dossier) if os.path.isdir(os.path.join(self.dossier, sous_dossier))
+            for f in os.listdir(os.path.join(self.dossier, sous_dossier)) if f.endswith('.json')
+        )
+
+    def contient(self, cle):
+        return os.path.exists(self._chemin(cle, 'json'))
+
+    def manifeste(self, cle):
+        with open(self._chemin(cle, 'json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def charger(self, cle):
+        with np.load(self._chemin(cle, 'npz'), allow_pickle=False) as donnees:
+            return donnees['etats']
+
+    def enregistrer(self, manifeste, etats):
+        cle = empreinte(manifeste)
+        os.makedirs(os.path.dirname(self._chemin(cle, 'json')), exist_ok=True)
+        # Le manifeste, écrit en dernier, signale un résultat complet
+        tampon = io.BytesIO()
+        np.savez(tampon, etats=np.asarray(etats, dtype=float))
+        ecriture_atomique(self._chemin(cle, 'npz'), tampon.getvalue())
+        ecriture_atomique(self._chemin(cle, 'json'), json.dumps(manifeste, indent=4, ensure_ascii=False))
+        return cle
+
+    def executer(self, manifeste):
+        """
+        Returns:
+            tuple: (empreinte, tableau (jours, 5) des compartiments), relu depuis le dépôt si le
+            manifeste y est déjà et que sa révision est connue.
+        """
+        cle = empreinte(manifeste)
+        if manifeste['revision'] is not None and self.contient(cle):
+            return cle, self.charger(cle)
+        params = VirusParams.from_dict(manifeste['virus'])
+        etats = MOTEURS[manifeste['moteur']][1](params, manifeste['configuration'], manifeste['graine'])
+        return self.enregistrer(manifeste, etats), etats
+
+def _aplatir(valeur, prefixe=''):
+    if isinstance(valeur, dict):
+        aplati = {}
+        for cle, sous_valeur in valeur.items():
+            aplati.update(_aplatir(sous_valeur, f"{prefixe}{cle}."))
+        return aplati
+    return {prefixe[:-1]: valeur}
+
+def comparer_executions(depot, cle_a, cle_b):
+    """
+    Différences entre deux exécutions du dépôt.
+
+    Returns:
+        dict: 'manifeste' ({champ: (valeur a, valeur b)} des champs différents) et 'resultats'
+        ({compartiment: écart absolu maximal}, None si les horizons diffèrent).
+    """
+    a, b = _aplatir(depot.manifeste(cle_a)), _aplatir(depot.manifeste(cle_b))
+    manifeste = {champ: (a.get(champ), b.get(champ)) for champ in sorted(a.keys() | b.keys()) if a.get(champ) != b.get(champ)}
+    etats_a, etats_b = depot.charger(cle_a), depot.charger(cle_b)
+    resultats = None
+    if etats_a.shape == etats_b.shape:
+        ecarts = np.abs(etats_a - etats_b).max(axis=0) if len(etats_a) else np.zeros(5)
+        resultats = dict(zip(COMPARTIMENTS, map(float, ecarts)))
+    return {'manifeste': manifeste, 'resultats': resultats}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exécutions reproductibles et dépôt de résultats par empreinte.")
+    parser.add_argument('--depot', default=RESULTATS_DIR, help="Dossier du dépôt")
+    commandes = parser.add_subparsers(dest='commande', required=True)
+    executer = commandes.add_parser('executer', help="Exécute un virus sauvegardé (ou relit son résultat)")
+    executer.add_argument('virus', help="Nom du virus sauvegardé")
+    executer.add_argument('--moteur', choices=sorted(MOTEURS), default='seir')
+    executer.add_argument('--graine', type=int)
+    executer.add_argument('--configuration', type=json.loads, default=None, help="Réglages du moteur (JSON)")
+    commandes.add_parser('liste', help="Liste les exécutions du dépôt")
+    diff = commandes.add_parser('diff', help="Compare deux exécutions")
+    diff.add_argument('a', help="Empreinte (ou préfixe) de la première exécution")
+    diff.add_argument('b', help="Empreinte (ou préfixe) de la seconde exécution")
+    args = parser.parse_args(argv)
+
+    depot = DepotResultats(args.depot)
+    if args.commande == 'executer':
+        manifeste = manifeste_execution(VirusParams.from_dict(load_virus(args.virus)), args.moteur, args.configuration, args.graine)
+        deja = manifeste['revision'] is not None and depot.contient(empreinte(manifeste))
+        cle, etats = depot.executer(manifeste)
+        print(f"{cle} ({'relu depuis le dépôt' if deja else 'calculé'}): {len(etats)} jours, {etats[-1, 4]:.1f} morts")
+    elif args.commande == 'liste':
+        for cle in depot.lister():
+            manifeste = depot.manifeste(cle)
+            print(f"{cle[:12]}  {manifeste['moteur']:<7} graine={manifeste['graine']}  {manifeste['revision']}")
+    else:
+        try:
+            cle_a, cle_b = depot.resoudre(args.a), depot.resoudre(args.b)
+        except KeyError as e:
+            parser.error(e.args[0])
+        differences = comparer_executions(depot, cle_a, cle_b)
+        for champ, (valeur_a, valeur_b) in differences['manifeste'].items():
+            print(f"{champ}: {valeur_a!r} -> {valeur_b!r}")
+        if differences['resultats'] is None:
+            print("Résultats: horizons différents")
+        else:
+            for compartiment, ecart in differences['resultats'].items():
+                print(f"Écart maximal {compartiment}: {ecart:.6g}")
+
+if __name__ == '__main__':
+    main()
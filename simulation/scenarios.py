@@ -0,0 +1,37 @@
+# simulation/scenarios.py
+import numpy as np
+
+from .differential_equations import grille_temps, simulate_seir_batch
+
+class CacheScenarios:
+    """
+    Trajectoires journalières de plusieurs virus, résolues en un seul appel vectorisé
+    (simulate_seir_batch) et conservées par VirusParams: redemander un scénario déjà
+    résolu ne coûte aucune intégration.
+    """
+
+    def __init__(self):
+        self.trajectoires = {}
+
+    def obtenir(self, scenarios):
+        """
+        Args:
+            scenarios (iterable): VirusParams à résoudre.
+
+        Returns:
+            list: Tableaux (nombre_jours, 5) des compartiments sain, contaminé, infecté, rétabli, mort,
+            dans l'ordre des scénarios.
+        """
+        scenarios = list(scenarios)
+        manquants = list(dict.fromkeys(p for p in scenarios if p not in self.trajectoires))
+        if manquants:
+            # Une seule intégration sur l'horizon le plus long, chaque scénario étant tronqué au sien
+            taux = np.array([p.taux for p in manquants]).T
+            t = grille_temps(max(p.nombre_jours for p in manquants))
+            resultats = simulate_seir_batch(np.array([p.etat_initial for p in manquants]), *taux, t)
+            for params, trajectoire in zip(manquants, resultats):
+                self.trajectoires[params] = trajectoire[:params.nombre_jours]
+        return [self.trajectoires[p] for p in scenarios]
+
+    def vider(self):
+        self.trajectoires.clear()
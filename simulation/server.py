@@ -0,0 +1,350 @@
+# simulation/server.py
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+from .parameters import VirusParams
+
+# Sorties disponibles: trajectoire journalière complète ou caractéristiques de l'épidémie
+SORTIES = ('trajectoire', 'resume')
+# États d'une tâche; les trois derniers sont définitifs
+EN_ATTENTE, EN_COURS, TERMINE, ANNULE, ERREUR = 'en_attente', 'en_cours', 'terminé', 'annulé', 'erreur'
+DEFINITIFS = (TERMINE, ANNULE, ERREUR)
+# Effet d'un DELETE (champ 'annulation' de la réponse)
+RETIREE, ANNULEE, ABANDONNEE, SANS_EFFET = 'demande_retirée', 'annulée', 'abandonnée', 'sans_effet'
+
+TAILLE_FILE = 64
+# Nombre de tâches définitives conservées (pour la coalescence et la récupération des résultats)
+TACHES_CONSERVEES = 1024
+TAILLE_MAX_CORPS = 1 << 20
+
+STATUTS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           409: 'Conflict', 413: 'Payload Too Large', 503: 'Service Unavailable'}
+
+def _executer(parametres, sortie):
+    # Exécuté dans un processus du pool: le moteur n'est importé que dans les workers
+    from .differential_equations import caracteriser_epidemie, grille_temps, resoudre_seir
+
+    params = VirusParams.from_dict(parametres)
+    if sortie == 'resume':
+        return caracteriser_epidemie(params)
+    trajectoire = resoudre_seir(params.etat_initial, *params.taux, params.nombre_jours - 1)
+    etats = trajectoire.evaluer(grille_temps(params.nombre_jours))
+    noms = ('sain', 'contaminé', 'infecté', 'rétabli', 'mort')
+    return {nom: etats[:, i].tolist() for i, nom in enumerate(noms)}
+
+class ErreurRequete(Exception):
+    # Erreur renvoyée au client avec un code HTTP
+    def __init__(self, statut, message):
+        super().__init__(message)
+        self.statut = statut
+
+class Tache:
+    """
+    Une simulation demandée au serveur. Les requêtes identiques (même virus, même sortie)
+    partagent la même tâche.
+    """
+
+    def __init__(self, identifiant, cle, params, sortie):
+        self.id = identifiant
+        self.cle = cle
+        self.params = params
+        self.sortie = sortie
+        self.etat = EN_ATTENTE
+        self.resultat = None
+        self.erreur = None
+        self.soumise = time.time()
+        self.debut = None
+        self.fin = None
+        self.demandes = 1
+        self.changement = asyncio.Condition()
+
+    async def changer(self, etat, resultat=None, erreur=None):
+        async with self.changement:
+            self.etat = etat
+            self.resultat = resultat
+            self.erreur = erreur
+            if etat == EN_COURS:
+                self.debut = time.time()
+            elif etat in DEFINITIFS:
+                self.fin = time.time()
+            self.changement.notify_all()
+
+    def description(self):
+        return {
+            'id': self.id,
+            'etat': self.etat,
+            'sortie': self.sortie,
+            'virus': self.params.to_dict(),
+            'demandes': self.demandes,
+            'soumise': self.soumise,
+            'debut': self.debut,
+            'fin': self.fin,
+            'erreur': self.erreur,
+        }
+
+class ServeurSimulation:
+    """
+    Serveur HTTP/JSON local (asyncio, bibliothèque standard) de simulations.
+
+    Routes:
+        POST   /taches                 Soumet {"virus": {...}, "sortie": "trajectoire" | "resume"}.
+        GET    /taches                 Liste les tâches connues.
+        GET    /taches/<id>            État d'une tâche.
+        GET    /taches/<id>/flux       Changements d'état en JSON Lines, jusqu'à l'état définitif.
+        GET    /taches/<id>/resultat   Résultat d'une tâche terminée.
+        DELETE /taches/<id>            Retire une demande de la tâche (voir annuler).
+
+    Les tâches passent par une file bornée (503 quand elle est pleine) consommée par autant
+    de workers asyncio que de processus dans le pool. Une soumission identique à une tâche
+    en attente, en cours ou terminée renvoie cette tâche au lieu d'en créer une nouvelle, et
+    la tâche n'est annulée que lorsque toutes ses demandes ont été retirées.
+    """
+
+    def __init__(self, hote='127.0.0.1', port=8765, n_workers=None, taille_file=TAILLE_FILE):
+        self.hote = hote
+        self.port = port
+        self.n_workers = n_workers or os.cpu_count()
+        self.file = asyncio.Queue(maxsize=taille_file)
+        self.taches = OrderedDict()
+        self.par_cle = {}
+        self._compteur = itertools.count(1)
+        self._executor = None
+        self._serveur = None
+        self._workers = []
+
+    async def demarrer(self):
+        # 'spawn': des processus forkés hériteraient des sockets des clients déjà connectés, et les
+        # connexions /flux ne seraient jamais fermées de leur point de vue
+        contexte = multiprocessing.get_context('spawn')
+        self._executor = ProcessPoolExecutor(max_workers=self.n_workers, mp_context=contexte)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.n_workers)]
+        self._serveur = await asyncio.start_server(self._connexion, self.hote, self.port)
+        # Port effectif (utile avec port=0)
+        self.port = self._serveur.sockets[0].getsockname()[1]
+        return self
+
+    async def arreter(self):
+        if self._serveur is not None:
+            self._serveur.close()
+            await self._serveur.wait_closed()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def servir(self):
+        await self.demarrer()
+        try:
+            await self._serveur.serve_forever()
+        finally:
+            await self.arreter()
+
+    # Tâches
+
+    @staticmethod
+    def cle(params, sortie):
+        canonique = json.dumps([sortie, params.to_dict()], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonique.encode('utf-8')).hexdigest()
+
+    def soumettre(self, params, sortie='trajectoire'):
+        """
+        Returns:
+            tuple: (tâche, nouvelle) où nouvelle est False si la demande a été coalescée.
+
+        Raises:
+            ErreurRequete: 503 si la file est pleine.
+        """
+        cle = self.cle(params, sortie)
+        existante = self.par_cle.get(cle)
+        if existante is not None and existante.etat not in (ANNULE, ERREUR):
+            existante.demandes += 1
+            return existante, False
+        tache = Tache(str(next(self._compteur)), cle, params, sortie)
+        try:
+            self.file.put_nowait(tache)
+        except asyncio.QueueFull:
+            raise ErreurRequete(503, "File de simulations pleine, réessayez plus tard.") from None
+        self.taches[tache.id] = tache
+        self.par_cle[cle] = tache
+        self._purger()
+        return tache, True
+
+    def _purger(self):
+        # Oublie les plus anciennes tâches définitives au-delà de TACHES_CONSERVEES
+        definitives = [t for t in self.taches.values() if t.etat in DEFINITIFS]
+        for tache in definitives[:max(0, len(definitives) - TACHES_CONSERVEES)]:
+            del self.taches[tache.id]
+            if self.par_cle.get(tache.cle) is tache:
+                del self.par_cle[tache.cle]
+
+    async def annuler(self, tache):
+        """
+        Retire une demande de la tâche, annulée au retrait de la dernière. Un processus du pool
+        ne pouvant être interrompu, une tâche en cours est abandonnée: le calcul continue jusqu'à
+        son terme, mais son résultat est ignoré.
+
+        Returns:
+            str: RETIREE (d'autres demandes restent), ANNULEE (la tâche attendait dans la file),
+                ABANDONNEE (la tâche était en cours) ou SANS_EFFET (tâche déjà définitive).
+        """
+        if tache.etat in DEFINITIFS:
+            return SANS_EFFET
+        tache.demandes -= 1
+        if tache.demandes > 0:
+            return RETIREE
+        en_cours = tache.etat == EN_COURS
+        await tache.changer(ANNULE)
+        return ABANDONNEE if en_cours else ANNULEE
+
+    async def _worker(self):
+        boucle = asyncio.get_running_loop()
+        while True:
+            tache = await self.file.get()
+            try:
+                # Annulée pendant l'attente dans la file
+                if tache.etat != EN_ATTENTE:
+                    continue
+                await tache.changer(EN_COURS)
+                try:
+                    resultat = await boucle.run_in_executor(self._executor, _executer, tache.params.to_dict(), tache.sortie)
+                except Exception as e:
+                    if tache.etat == EN_COURS:
+                        await tache.changer(ERREUR, erreur=str(e))
+                else:
+                    if tache.etat == EN_COURS:
+                        await tache.changer(TERMINE, resultat=resultat)
+            finally:
+                self.file.task_done()
+
+    # HTTP
+
+    async def _connexion(self, lecteur, ecrivain):
+        try:
+            try:
+                methode, chemin, corps = await self._lire_requete(lecteur)
+                await self._router(methode, chemin, corps, ecrivain)
+            except ErreurRequete as e:
+                await self._repondre(ecrivain, e.statut, {'erreur': str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            ecrivain.close()
+
+    @staticmethod
+    async def _lire_requete(lecteur):
+        ligne = (await lecteur.readline()).decode('latin-1').split()
+        if len(ligne) != 3:
+            raise ErreurRequete(400, "Ligne de requête invalide.")
+        methode, cible, _ = ligne
+        entetes = {}
+        while True:
+            entete = (await lecteur.readline()).decode('latin-1').strip()
+            if not entete:
+                break
+            nom, _, valeur = entete.partition(':')
+            entetes[nom.strip().lower()] = valeur.strip()
+        try:
+            longueur = int(entetes.get('content-length', 0) or 0)
+        except ValueError:
+            raise ErreurRequete(400, "En-tête Content-Length invalide.") from None
+        if longueur < 0:
+            raise ErreurRequete(400, "En-tête Content-Length invalide.")
+        if longueur > TAILLE_MAX_CORPS:
+            raise ErreurRequete(413, "Corps de requête trop volumineux.")
+        corps = await lecteur.readexactly(longueur) if longueur else b''
+        return methode.upper(), urlsplit(cible).path.rstrip('/') or '/', corps
+
+    @staticmethod
+    async def _repondre(ecrivain, statut, contenu):
+        donnees = json.dumps(contenu, ensure_ascii=False).encode('utf-8')
+        ecrivain.write(
+            f"HTTP/1.1 {statut} {STATUTS[statut]}\r\nContent-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(donnees)}\r\nConnection: close\r\n\r\n".encode('latin-1') + donnees
+        )
+        await ecrivain.drain()
+
+    def _tache(self, identifiant):
+        tache = self.taches.get(identifiant)
+        if tache is None:
+            raise ErreurRequete(404, f"Tâche inconnue: {identifiant}")
+        return tache
+
+    async def _router(self, methode, chemin, corps, ecrivain):
+        morceaux = chemin.strip('/').split('/')
+        if morceaux[0] != 'taches' or len(morceaux) > 3:
+            raise ErreurRequete(404, f"Route inconnue: {chemin}")
+        if len(morceaux) == 1:
+            if methode == 'GET':
+                return await self._repondre(ecrivain, 200, [t.description() for t in self.taches.values()])
+            if methode == 'POST':
+                tache, nouvelle = self.soumettre(*self._lire_soumission(corps))
+                return await self._repondre(ecrivain, 202 if nouvelle else 200, tache.description())
+            raise ErreurRequete(405, f"Méthode non autorisée: {methode}")
+        tache = self._tache(morceaux[1])
+        action = morceaux[2] if len(morceaux) == 3 else None
+        if action is None and methode == 'GET':
+            return await self._repondre(ecrivain, 200, tache.description())
+        if action is None and methode == 'DELETE':
+            annulation = await self.annuler(tache)
+            return await self._repondre(ecrivain, 200, {**tache.description(), 'annulation': annulation})
+        if action == 'resultat' and methode == 'GET':
+            if tache.etat != TERMINE:
+                raise ErreurRequete(409, f"Tâche {tache.id} non terminée ({tache.etat}).")
+            return await self._repondre(ecrivain, 200, {'id': tache.id, 'resultat': tache.resultat})
+        if action == 'flux' and methode == 'GET':
+            return await self._diffuser(tache, ecrivain)
+        raise ErreurRequete(404 if action not in (None, 'resultat', 'flux') else 405, f"Route inconnue: {methode} {chemin}")
+
+    @staticmethod
+    def _lire_soumission(corps):
+        try:
+            demande = json.loads(corps or b'{}')
+            sortie = demande.get('sortie', 'trajectoire')
+            if sortie not in SORTIES:
+                raise ValueError(f"Sortie inconnue: {sortie}")
+            return VirusParams.from_dict(demande['virus']), sortie
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ErreurRequete(400, f"Demande invalide: {e}") from None
+
+    @staticmethod
+    async def _diffuser(tache, ecrivain):
+        # Une ligne JSON par changement d'état, la connexion étant fermée à l'état définitif
+        ecrivain.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson; charset=utf-8\r\nConnection: close\r\n\r\n"
+        )
+        async with tache.changement:
+            while True:
+                ligne = {'id': tache.id, 'etat': tache.etat, 'temps': time.time()}
+                ecrivain.write(json.dumps(ligne, ensure_ascii=False).encode('utf-8') + b"\n")
+                await ecrivain.drain()
+                if tache.etat in DEFINITIFS:
+                    return
+                etat = tache.etat
+                await tache.changement.wait_for(lambda: tache.etat != etat)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur HTTP/JSON local de simulations SEIR.")
+    parser.add_argument('--hote', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="Nombre de processus de simulation")
+    parser.add_argument('--file', type=int, default=TAILLE_FILE, help="Taille maximale de la file de tâches")
+    args = parser.parse_args(argv)
+
+    print(f"Serveur de simulation sur http://{args.hote}:{args.port}/taches")
+    try:
+        asyncio.run(ServeurSimulation(args.hote, args.port, args.jobs, args.file).servir())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# simulation/shared_buffer.py
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Colonnes d'une ligne: sain, contaminé, infecté, rétabli, mort
+COLONNES = 5
+# En-tête: curseur d'écriture, curseur de lecture, indicateur de fin, capacité (int64 chacun)
+_ECRIT, _LU, _TERMINE, _CAPACITE = 0, 1, 2, 3
+_TAILLE_ENTETE = 4 * 8
+
+class TamponCirculaire:
+    """
+    Tampon circulaire (capacité, 5) de float64 en mémoire partagée, pour un seul écrivain
+    (le processus de simulation) et un seul lecteur (l'interface).
+
+    Les curseurs sont des compteurs int64 croissants stockés en tête du segment: l'écrivain
+    copie les lignes puis publie son curseur, le lecteur lit des vues sans copie puis publie
+    le sien. Une écriture alignée de 8 octets étant atomique sur les architectures visées
+    (x86-64, ARM64), aucun verrou n'est nécessaire. L'écrivain attend quand le tampon est
+    plein: c'est la contre-pression quand l'interface prend du retard.
+    """
+
+    def __init__(self, capacite=4096, nom=None):
+        creer = nom is None
+        taille = _TAILLE_ENTETE + capacite * COLONNES * 8
+        self.memoire = shared_memory.SharedMemory(name=nom, create=creer, size=taille if creer else 0)
+        self.entete = np.ndarray((4,), dtype=np.int64, buffer=self.memoire.buf)
+        if creer:
+            self.entete[:] = (0, 0, 0, capacite)
+        # La taille du segment peut être arrondie à la page: la capacité fait foi
+        self.capacite = int(self.entete[_CAPACITE])
+        self.donnees = np.ndarray((self.capacite, COLONNES), dtype=np.float64,
+                                  buffer=self.memoire.buf, offset=_TAILLE_ENTETE)
+        self.proprietaire = creer
+
+    @property
+    def nom(self):
+        return self.memoire.name
+
+    @property
+    def disponibles(self):
+        return int(self.entete[_ECRIT] - self.entete[_LU])
+
+    @property
+    def termine(self):
+        return bool(self.entete[_TERMINE])
+
+    def ecrire(self, lignes, attente=0.001, delai=None):
+        """
+        Copie des lignes (n, 5) dans le tampon, en attendant que le lecteur libère de la place.
+
+        Raises:
+            TimeoutError: Si `delai` (secondes) s'écoule sans place disponible.
+        """
+        lignes = np.asarray(lignes, dtype=np.float64).reshape(-1, COLONNES)
+        limite = None if delai is None else time.monotonic() + delai
+        debut = 0
+        while debut < len(lignes):
+            ecrit = int(self.entete[_ECRIT])
+            libre = self.capacite - (ecrit - int(self.entete[_LU]))
+            if libre == 0:
+                if limite is not None and time.monotonic() > limite:
+                    raise TimeoutError("Le lecteur du tampon ne suit pas.")
+                time.sleep(attente)
+                continue
+            position = ecrit % self.capacite
+            n = min(libre, len(lignes) - debut, self.capacite - position)
+            self.donnees[position:position + n] = lignes[debut:debut + n]
+            # Publication après la copie des données
+            self.entete[_ECRIT] = ecrit + n
+            debut += n
+
+    def lire(self):
+        """
+        Vues (sans copie) sur les lignes disponibles: une ou deux tranches selon le repli
+        du tampon. Les vues restent valides jusqu'à l'appel de liberer().
+        """
+        lu = int(self.entete[_LU])
+        n = int(self.entete[_ECRIT]) - lu
+        position = lu % self.capacite
+        premiere = min(n, self.capacite - position)
+        vues = [self.donnees[position:position + premiere]]
+        if n > premiere:
+            vues.append(self.donnees[:n - premiere])
+        return [vue for vue in vues if len(vue)]
+
+    def liberer(self, n):
+        self.entete[_LU] += n
+
+    def terminer(self):
+        self.entete[_TERMINE] = 1
+
+    def fermer(self):
+        # Les vues NumPy doivent être relâchées avant de fermer le segment
+        self.entete = None
+        self.donnees = None
+        self.memoire.close()
+        if self.proprietaire:
+            self.memoire.unlink()
+
+def executer_dans_tampon(nom_tampon, params, discretisation=None):
+    """
+    Cible du processus de simulation: intègre le virus (VirusParams) bloc par bloc de
+    `discretisation` jours, chaque bloc repartant de l'état final du précédent, et écrit chaque
+    bloc de la trajectoire journalière dans le tampon dès qu'il est calculé. L'interface affiche
+    donc les premiers jours sans attendre la fin de l'horizon, et la contre-pression du tampon
+    ralentit le calcul lui-même.
+    """
+    from scipy.integrate import solve_ivp
+
+    from .differential_equations import ATOL, CUMULS, RTOL, grille_temps, seir_model_morts
+
+    tampon = TamponCirculaire(nom=nom_tampon)
+    try:
+        t = grille_temps(params.nombre_jours)
+        y = np.concatenate((np.asarray(params.etat_initial, dtype=float), np.zeros(len(CUMULS))))
+        taille_bloc = discretisation or params.discretisation
+        for debut in range(0, len(t), taille_bloc):
+            jours = t[debut:debut + taille_bloc]
+            origine = t[max(debut - 1, 0)]
+            if jours[-1] > origine:
+                morceau = solve_ivp(seir_model_morts, (origine, jours[-1]), y, method='LSODA', t_eval=jours,
+                                    rtol=RTOL, atol=ATOL, args=params.taux)
+                if morceau.status < 0:
+                    raise RuntimeError(f"Échec de l'intégration: {morceau.message}")
+                etats = morceau.y.T
+            else:
+                # Bloc réduit au jour 0: l'état initial
+                etats = y[None, :]
+            y = etats[-1]
+            tampon.ecrire(etats[:, :COLONNES])
+        tampon.terminer()
+    finally:
+        tampon.fermer()
@@ -1,15 +1,221 @@
 # utils/file_management.py
 import json
 import os
+import sqlite3
+import stat
+import tempfile
 
 VIRUS_DIR = 'virus'
+# Spécifications de modèles compartimentaux (voir simulation.model_compiler)
+MODELES_DIR = os.path.join(VIRUS_DIR, 'modeles')
+# Dépôt des résultats d'exécutions, rangés par empreinte de manifeste (voir simulation.runs)
+RESULTATS_DIR = 'resultats'
+
+# Extensions reconnues pour les archives mono-fichier
+ARCHIVE_JSONL = ('.jsonl',)
+ARCHIVE_SQLITE = ('.sqlite', '.sqlite3', '.db')
+
+def _umask():
+    # os.umask ne se lit qu'en le remplaçant: lu une fois au chargement du module
+    masque = os.umask(0)
+    os.umask(masque)
+    return masque
+
+_UMASK = _umask()
+
+def _mode_cible(path):
+    # Droits du fichier remplacé s'il existe, sinon ceux d'un open() ordinaire (0o666 moins l'umask)
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+def _fichier_temporaire(path, contenu):
+    # Écrit le contenu dans un fichier temporaire du dossier de la cible `path` (même système de
+    # fichiers, pour que os.replace soit atomique). Le suffixe .tmp l'exclut de list_viruses.
+    # mkstemp crée le fichier en 0o600: il reçoit les droits qu'aurait la cible, que os.replace conserve.
+    # contenu: texte, octets, ou fonction écrivant dans le fichier ouvert en binaire.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.', suffix='.tmp')
+    try:
+        os.chmod(tmp_path, _mode_cible(path))
+        if isinstance(contenu, str):
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(contenu)
+        else:
+            with os.fdopen(fd, 'wb') as f:
+                if callable(contenu):
+                    contenu(f)
+                else:
+                    f.write(contenu)
+    except BaseException:
+        _supprimer_silencieusement(tmp_path)
+        raise
+    return tmp_path
+
+def _supprimer_silencieusement(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _fsync_fichier(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _fsync_dossier(dossier):
+    # Rend durable le renommage (POSIX uniquement, sans effet sous Windows)
+    if os.name != 'posix':
+        return
+    fd = os.open(dossier, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def ecriture_atomique(path, contenu):
+    """
+    Écrit un fichier de façon atomique: fichier temporaire, fsync puis os.replace.
+    Un arrêt brutal laisse soit l'ancien fichier, soit le nouveau, jamais un fichier tronqué.
+
+    Args:
+        path (str): Fichier cible.
+        contenu (str, bytes ou callable): Texte, octets, ou fonction recevant le fichier
+            temporaire ouvert en binaire (pour écrire de gros tableaux sans les copier en mémoire).
+    """
+    dossier = os.path.dirname(path) or '.'
+    tmp_path = _fichier_temporaire(path, contenu)
+    try:
+        _fsync_fichier(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        _supprimer_silencieusement(tmp_path)
+        raise
+    _fsync_dossier(dossier)
+
+def _serialiser(parameters):
+    return json.dumps(parameters, indent=4)
 
 def save_virus(name, parameters):
     if not os.path.exists(VIRUS_DIR):
         os.makedirs(VIRUS_DIR)
     virus_path = os.path.join(VIRUS_DIR, f"{name}.json")
-    with open(virus_path, 'w') as f:
-        json.dump(parameters, f, indent=4)
+    ecriture_atomique(virus_path, _serialiser(parameters))
+
+def save_many(viruses, archive=None):
+    """
+    Sauvegarde un lot de virus en groupant les écritures.
+
+    Args:
+        viruses (dict | iterable): Dictionnaire {nom: paramètres} ou itérable de couples (nom, paramètres).
+        archive (str, optional): Chemin d'une archive mono-fichier (.jsonl ou .sqlite/.db).
+            Si absent, un fichier JSON par virus est écrit dans VIRUS_DIR.
+
+    Returns:
+        list: Noms des virus sauvegardés.
+    """
+    items = list(viruses.items() if isinstance(viruses, dict) else viruses)
+    if archive is not None:
+        return save_archive(archive, items)
+    if not items:
+        return []
+    if not os.path.exists(VIRUS_DIR):
+        os.makedirs(VIRUS_DIR)
+    # 1) tous les fichiers temporaires, 2) leur synchronisation disque (et non os.sync, qui
+    # viderait tous les systèmes de fichiers de la machine), 3) les renommages atomiques,
+    # 4) un seul fsync du dossier
+    temporaires = []
+    try:
+        for name, parameters in items:
+            virus_path = os.path.join(VIRUS_DIR, f"{name}.json")
+            temporaires.append((_fichier_temporaire(virus_path, _serialiser(parameters)), virus_path))
+        for tmp_path, _ in temporaires:
+            _fsync_fichier(tmp_path)
+        while temporaires:
+            tmp_path, virus_path = temporaires.pop(0)
+            os.replace(tmp_path, virus_path)
+    finally:
+        for tmp_path, _ in temporaires:
+            _supprimer_silencieusement(tmp_path)
+    _fsync_dossier(VIRUS_DIR)
+    return [name for name, _ in items]
+
+def _format_archive(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ARCHIVE_JSONL:
+        return 'jsonl'
+    if extension in ARCHIVE_SQLITE:
+        return 'sqlite'
+    raise ValueError(f"Format d'archive non reconnu pour '{path}' (attendu: .jsonl, .sqlite ou .db).")
+
+def _connexion_sqlite(path):
+    connexion = sqlite3.connect(path)
+    connexion.execute("CREATE TABLE IF NOT EXISTS virus (nom TEXT PRIMARY KEY, parametres TEXT NOT NULL)")
+    return connexion
+
+def save_archive(path, viruses):
+    """
+    Ajoute ou remplace des virus dans une archive mono-fichier.
+    JSON Lines: l'archive est réécrite atomiquement. SQLite: une seule transaction.
+    """
+    items = list(viruses.items() if isinstance(viruses, dict) else viruses)
+    dossier = os.path.dirname(path)
+    if dossier and not os.path.exists(dossier):
+        os.makedirs(dossier)
+    if _format_archive(path) == 'jsonl':
+        contenu = load_archive(path) if os.path.exists(path) else {}
+        contenu.update(items)
+        lignes = (json.dumps({'nom': name, 'parametres': parameters}) for name, parameters in contenu.items())
+        ecriture_atomique(path, ''.join(ligne + '\n' for ligne in lignes))
+    else:
+        connexion = _connexion_sqlite(path)
+        try:
+            with connexion:
+                connexion.executemany(
+                    "INSERT OR REPLACE INTO virus (nom, parametres) VALUES (?, ?)",
+                    ((name, json.dumps(parameters)) for name, parameters in items)
+                )
+        finally:
+            connexion.close()
+    return [name for name, _ in items]
+
+def load_archive(path, name=None):
+    """
+    Charge le contenu d'une archive mono-fichier.
+
+    Returns:
+        dict: {nom: paramètres}, ou les paramètres du seul virus `name` s'il est précisé.
+
+    Raises:
+        FileNotFoundError: Si l'archive ou le virus demandé n'existe pas.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"L'archive '{path}' n'existe pas.")
+    if _format_archive(path) == 'jsonl':
+        viruses = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for ligne in f:
+                if ligne.strip():
+                    entree = json.loads(ligne)
+                    viruses[entree['nom']] = entree['parametres']
+    else:
+        connexion = _connexion_sqlite(path)
+        try:
+            if name is not None:
+                ligne = connexion.execute("SELECT parametres FROM virus WHERE nom = ?", (name,)).fetchone()
+                if ligne is None:
+                    raise FileNotFoundError(f"Le virus '{name}' n'existe pas dans l'archive '{path}'.")
+                return json.loads(ligne[0])
+            viruses = {nom: json.loads(parametres) for nom, parametres in connexion.execute("SELECT nom, parametres FROM virus")}
+        finally:
+            connexion.close()
+    if name is not None:
+        if name not in viruses:
+            raise FileNotFoundError(f"Le virus '{name}' n'existe pas dans l'archive '{path}'.")
+        return viruses[name]
+    return viruses
 
 def load_virus(name):
     virus_path = os.path.join(VIRUS_DIR, f"{name}.json")
@@ -25,3 +231,20 @@ def list_viruses():
     files = os.listdir(VIRUS_DIR)
     virus_names = [os.path.splitext(f)[0] for f in files if f.endswith('.json')]
     return virus_names
+
+def save_model(name, spec):
+    if not os.path.exists(MODELES_DIR):
+        os.makedirs(MODELES_DIR)
+    ecriture_atomique(os.path.join(MODELES_DIR, f"{name}.json"), json.dumps(spec, indent=4, ensure_ascii=False))
+
+def load_model(name):
+    model_path = os.path.join(MODELES_DIR, f"{name}.json")
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Le fichier du modèle '{name}' n'existe pas.")
+    with open(model_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def list_models():
+    if not os.path.exists(MODELES_DIR):
+        return []
+    return [os.path.splitext(f)[0] for f in os.listdir(MODELES_DIR) if f.endswith('.json')]